@@ -11,8 +11,12 @@ This script:
 
 import os
 import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Make ``src`` importable when run as ``python scripts/<name>.py`` without an install.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
 # Load environment variables
 load_dotenv()
 
@@ -85,18 +89,11 @@ def test_connection():
     print_header("2. Testing COS Connection")
 
     try:
-        import ibm_boto3
-        from ibm_botocore.client import Config
+        from src.integrations.clients import get_registry
 
         print_info("Creating COS client...")
 
-        cos_client = ibm_boto3.client(
-            "s3",
-            aws_access_key_id=os.getenv("COS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("COS_SECRET_ACCESS_KEY"),
-            endpoint_url=os.getenv("COS_ENDPOINT"),
-            config=Config(signature_version="s3v4")
-        )
+        cos_client = get_registry().cos_client()
 
         print_success("COS client created")
 
@@ -129,17 +126,24 @@ def test_bucket_access(cos_client):
     try:
         print_info(f"Checking bucket: {bucket_name}")
 
-        # Try to list objects
-        response = cos_client.list_objects_v2(Bucket=bucket_name, MaxKeys=10)
-
-        if "Contents" in response:
-            object_count = len(response["Contents"])
-            print_success(f"Bucket accessible! Contains {object_count} object(s)")
-
-            for obj in response["Contents"]:
-                key = obj["Key"]
-                size = obj["Size"]
-                print_info(f"  - {key} ({size:,} bytes)")
+        # List every object (all pages, top-level prefixes in parallel)
+        from src.integrations.cos_listing import iter_bucket
+
+        object_count = 0
+        total_bytes = 0
+        preview_limit = 10
+        for obj in iter_bucket(cos_client, bucket_name):
+            object_count += 1
+            total_bytes += obj["Size"]
+            if object_count <= preview_limit:
+                print_info(f"  - {obj['Key']} ({obj['Size']:,} bytes)")
+
+        if object_count:
+            if object_count > preview_limit:
+                print_info(f"  ... and {object_count - preview_limit:,} more")
+            print_success(
+                f"Bucket accessible! Contains {object_count:,} object(s), {total_bytes:,} bytes"
+            )
         else:
             print_warning("Bucket is empty (no objects found)")
             print_success("But bucket is accessible!")
@@ -16,6 +16,9 @@ from pathlib import Path
 import requests
 from dotenv import load_dotenv
 
+# Make ``src`` importable when run as ``python scripts/<name>.py`` without an install.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
 # Load environment variables
 load_dotenv()
 
@@ -108,29 +111,16 @@ def test_api_key() -> tuple[bool, str]:
         return False, ""
 
     try:
-        print_info("Requesting access token from IBM Cloud IAM...")
-        response = requests.post(
-            "https://iam.cloud.ibm.com/identity/token",
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-            data=f"grant_type=urn:ibm:params:oauth:grant-type:apikey&apikey={api_key}",
-            timeout=30,
-        )
+        from src.integrations.clients import get_registry
 
-        if response.status_code == 200:
-            token_data = response.json()
-            access_token = token_data.get("access_token", "")
-            if access_token:
-                print_success(f"Access token obtained: {access_token[:20]}...")
-                print_info(f"Token type: {token_data.get('token_type')}")
-                print_info(f"Expires in: {token_data.get('expires_in')} seconds")
-                return True, access_token
-            else:
-                print_error("No access token in response")
-                return False, ""
-        else:
-            print_error(f"Failed to obtain token: {response.status_code}")
-            print_error(f"Response: {response.text}")
-            return False, ""
+        print_info("Requesting access token from IBM Cloud IAM...")
+        # Cached and refreshed in the background; later stages reuse this token.
+        token_data = get_registry().token_manager().token_info()
+        access_token = token_data.get("access_token", "")
+        print_success(f"Access token obtained: {access_token[:20]}...")
+        print_info(f"Token type: {token_data.get('token_type')}")
+        print_info(f"Expires in: {token_data.get('expires_in')} seconds")
+        return True, access_token
 
     except Exception as e:
         print_error(f"Error validating API key: {e}")
@@ -211,8 +201,10 @@ def test_text_extraction_api(access_token: str) -> bool:
         print_info(f"Testing endpoint: {endpoint}")
         print_info("Note: We're just checking endpoint accessibility, not uploading files")
 
+        from src.integrations.clients import get_registry
+
         # Just check if endpoint exists (GET should return 405 Method Not Allowed)
-        response = requests.get(
+        response = get_registry().http_client().get(
             endpoint,
             headers={"Authorization": f"Bearer {access_token}"},
             params={"version": "2024-10-18"},
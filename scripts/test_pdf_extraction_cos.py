@@ -2,19 +2,26 @@
 """Test watsonx.ai Text Extraction API with Cloud Object Storage.
 
 This script demonstrates the complete PDF extraction pipeline:
-1. PDF stored in COS bucket
-2. watsonx.ai Text Extraction job submitted
-3. Job monitored until completion
+1. PDFs stored in COS bucket
+2. watsonx.ai Text Extraction jobs submitted
+3. Jobs monitored until completion
 4. Results retrieved from COS
+
+Every matching PDF is submitted as its own job and all jobs run concurrently:
+
+    python scripts/test_pdf_extraction_cos.py --prefix financials/ --concurrency 8
 """
 
-import json
+import argparse
 import os
 import sys
 import time
 from pathlib import Path
 from dotenv import load_dotenv
 
+# Make ``src`` importable when run as ``python scripts/<name>.py`` without an install.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
 # Load environment variables
 load_dotenv()
 
@@ -59,31 +66,18 @@ def initialize_clients():
     print_header("1. Initializing Clients")
 
     try:
-        from ibm_watsonx_ai import Credentials
-        from ibm_watsonx_ai.foundation_models.extractions import TextExtractionsV2
-        import ibm_boto3
-        from ibm_botocore.client import Config
+        from src.integrations.clients import get_registry
+
+        registry = get_registry()
 
         # watsonx.ai client
         print_info("Creating watsonx.ai client...")
-        extraction_client = TextExtractionsV2(
-            credentials=Credentials(
-                api_key=os.getenv("WATSONX_API_KEY"),
-                url=os.getenv("WATSONX_URL")
-            ),
-            project_id=os.getenv("WATSONX_PROJECT_ID")
-        )
+        extraction_client = registry.extraction_client()
         print_success("watsonx.ai client created")
 
-        # COS client
+        # COS client (shared, pooled connections)
         print_info("Creating COS client...")
-        cos_client = ibm_boto3.client(
-            "s3",
-            aws_access_key_id=os.getenv("COS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("COS_SECRET_ACCESS_KEY"),
-            endpoint_url=os.getenv("COS_ENDPOINT"),
-            config=Config(signature_version="s3v4")
-        )
+        cos_client = registry.cos_client()
         print_success("COS client created")
 
         return extraction_client, cos_client
@@ -93,208 +87,189 @@ def initialize_clients():
         return None, None
 
 
-def run_extraction_job(extraction_client, input_path: str, output_path: str):
-    """Run text extraction job with COS."""
-    print_header("2. Submitting Text Extraction Job")
-
-    try:
-        # Document reference (input from COS)
-        document_reference = {
-            "type": "connection_asset",
-            "connection": {
-                "endpoint_url": os.getenv("COS_ENDPOINT"),
-                "access_key_id": os.getenv("COS_ACCESS_KEY_ID"),
-                "secret_access_key": os.getenv("COS_SECRET_ACCESS_KEY")
-            },
-            "location": {
-                "bucket": os.getenv("COS_BUCKET_NAME"),
-                "path": input_path
-            }
-        }
-
-        # Results reference (output to COS)
-        results_reference = {
-            "type": "connection_asset",
-            "connection": {
-                "endpoint_url": os.getenv("COS_ENDPOINT"),
-                "access_key_id": os.getenv("COS_ACCESS_KEY_ID"),
-                "secret_access_key": os.getenv("COS_SECRET_ACCESS_KEY")
-            },
-            "location": {
-                "bucket": os.getenv("COS_BUCKET_NAME"),
-                "path": output_path
-            }
-        }
-
-        # Extraction steps (configuration)
-        steps = {
-            "ocr": {
-                "enabled": True,
-                "languages": ["en", "es"]  # English and Spanish
-            },
-            "table_processing": {
-                "enabled": True
-            }
-        }
-
-        print_info(f"Input: {os.getenv('COS_BUCKET_NAME')}/{input_path}")
-        print_info(f"Output: {os.getenv('COS_BUCKET_NAME')}/{output_path}")
-        print_info("Configuration: OCR (en, es) + Table Processing")
-
-        print_info("\nSubmitting job...")
-
-        # Submit extraction job
-        job_details = extraction_client.run_job(
-            document_reference=document_reference,
-            results_reference=results_reference,
-            steps=steps,
-            results_format="markdown"
-        )
-
-        job_id = job_details["metadata"]["id"]
-        job_state = job_details["entity"]["status"]["state"]
+def build_runner(extraction_client, cos_client, args, on_complete=None, on_line=None):
+    """Create the batch runner shared by the remote and local-first paths."""
+    from src.integrations.text_extraction import COSConnection
+    from src.orchestration.batch_extraction import BatchExtractionRunner
+    from src.utils.extraction_cache import ExtractionCache
 
-        print_success(f"Job submitted successfully!")
-        print_info(f"Job ID: {job_id}")
-        print_info(f"Initial state: {job_state}")
+    return BatchExtractionRunner(
+        extraction_client,
+        cos_client,
+        COSConnection.from_env(),
+        output_dir=args.output_dir,
+        max_concurrency=args.concurrency,
+        timeout=args.timeout,
+        on_complete=on_complete,
+        cache=None if args.no_cache else ExtractionCache(),
+        on_line=on_line,
+    )
 
-        return job_id
 
-    except Exception as e:
-        print_error(f"Failed to submit extraction job: {e}")
-        print_info(f"Error type: {type(e).__name__}")
-        print_info(f"Error details: {str(e)}")
-        return None
+def run_local_extraction(extraction_client, cos_client, sources: dict, args):
+    """Extract local PDFs with PyMuPDF, sending only pages that need OCR to watsonx."""
+    from src.integrations.local_extraction import BatchRemoteExtractor, LocalExtractor
 
+    print_header("2. Running Local-First Text Extraction")
+    print_info(f"Documents: {len(sources)} (pages needing OCR go to watsonx.ai)")
 
-def monitor_job(extraction_client, job_id: str, timeout: int = 300):
-    """Monitor extraction job until completion."""
-    print_header("3. Monitoring Job Progress")
+    runner = build_runner(extraction_client, cos_client, args)
+    extractor = LocalExtractor(remote=BatchRemoteExtractor(runner))
 
     start_time = time.time()
-    check_interval = 5  # seconds
-
-    try:
-        while True:
-            elapsed = int(time.time() - start_time)
-
-            if elapsed > timeout:
-                print_error(f"Job timeout after {timeout} seconds")
-                return False
+    results = extractor.extract_many(sources.values())
+    completed = []
+    for key, result in zip(sources, results, strict=True):
+        local_path = args.output_dir / Path(key).with_suffix(".md")
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        local_path.write_text(result.markdown, encoding="utf-8")
+        pages = len(result.pages)
+        local_pages = pages - len(result.remote_pages)
+        if result.errors:
+            print_warning(f"{key}: {'; '.join(result.errors)}")
+        print_success(f"{key} → {local_path} ({local_pages}/{pages} pages extracted locally)")
+        completed.append((key, local_path))
+
+    total = sum(len(result.pages) for result in results)
+    remote = sum(len(result.remote_pages) for result in results)
+    elapsed = time.time() - start_time
+    print_info(f"\n{total - remote}/{total} pages never left the machine ({elapsed:.1f}s)")
+    return completed
+
+
+def run_sharded_extraction(extraction_client, cos_client, sources: dict, args):
+    """Split large PDFs into page-range shards and extract all shards in parallel."""
+    from src.orchestration.sharding import ShardedExtractor
+
+    print_header("2. Running Sharded Text Extraction")
+    print_info(f"Documents: {len(sources)} ({args.shard_pages} pages per shard)")
+
+    runner = build_runner(extraction_client, cos_client, args)
+    extractor = ShardedExtractor(runner, pages_per_shard=args.shard_pages)
 
-            # Get job status
-            details = extraction_client.get_job_details(job_id)
-            job_state = details["entity"]["status"]["state"]
-            running_time = details["entity"]["status"].get("running_at", "")
+    start_time = time.time()
+    documents = extractor.extract(sources)
+    for document in documents:
+        if document.succeeded:
+            print_success(
+                f"{document.input_key} → {document.local_path} "
+                f"({document.page_count} pages in {len(document.ranges)} shard(s), "
+                f"{document.chars:,} chars, {document.duration or 0:.0f}s)"
+            )
+        else:
+            print_error(f"{document.input_key}: {document.error}")
+    elapsed = time.time() - start_time
+    print_info(f"\n{len(documents)} document(s) extracted in {elapsed:.0f} seconds")
+    return [(d.input_key, d.local_path) for d in documents if d.succeeded]
 
-            print_info(f"[{elapsed}s] Job state: {job_state}")
 
-            if job_state == "completed":
-                print_success(f"\n✅ Job completed in {elapsed} seconds!")
-                return True
+def run_batch_extraction(
+    extraction_client, cos_client, input_keys: list[str], args, sources=None, reports=None
+):
+    """Extract all inputs concurrently, reporting each job as it finishes.
 
-            elif job_state == "failed":
-                failure_reason = details["entity"]["status"].get("failure", {})
-                print_error(f"\n❌ Job failed!")
-                print_error(f"Reason: {failure_reason}")
-                return False
+    Quality is scored inline while each result streams to disk; ``reports`` (if
+    given) receives one ``QualityReport`` per successfully extracted input key.
+    """
+    from src.utils.quality import QualityAccumulator
 
-            elif job_state in ["queued", "running"]:
-                # Job still processing
-                time.sleep(check_interval)
-                continue
+    print_header("2. Running Batch Text Extraction")
 
-            else:
-                print_warning(f"Unknown job state: {job_state}")
-                time.sleep(check_interval)
+    print_info(f"Documents: {len(input_keys)} (max {args.concurrency} jobs in flight)")
+    print_info("Configuration: OCR (en, es) + Table Processing")
 
-    except KeyboardInterrupt:
-        print_warning("\n⚠️  Monitoring interrupted by user")
-        return False
-    except Exception as e:
-        print_error(f"Error monitoring job: {e}")
-        return False
+    accumulators = {key: QualityAccumulator() for key in input_keys}
 
+    def score(task, line):
+        accumulators[task.input_key].feed(line)
 
-def retrieve_results(cos_client, output_path: str, save_path: Path):
-    """Retrieve extraction results from COS."""
-    print_header("4. Retrieving Results from COS")
+    def report(task):
+        if task.succeeded:
+            quality = accumulators[task.input_key].report()
+            if reports is not None:
+                reports[task.input_key] = quality
+            print_success(
+                f"{task.input_key} → {task.local_path} "
+                f"({task.chars:,} chars, {task.duration or 0:.0f}s, quality {quality.grade})"
+            )
+        else:
+            print_error(f"{task.input_key}: {task.error}")
 
-    bucket_name = os.getenv("COS_BUCKET_NAME")
+    runner = build_runner(extraction_client, cos_client, args, on_complete=report, on_line=score)
 
+    start_time = time.time()
     try:
-        print_info(f"Downloading from: {bucket_name}/{output_path}")
-
-        response = cos_client.get_object(Bucket=bucket_name, Key=output_path)
-        result_content = response["Body"].read().decode("utf-8")
-
-        print_success(f"Results downloaded ({len(result_content):,} chars)")
-
-        # Save to local file
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(save_path, "w", encoding="utf-8") as f:
-            f.write(result_content)
-
-        print_success(f"Results saved to: {save_path}")
-        print_info(f"File size: {save_path.stat().st_size / 1024:.2f} KB")
+        tasks = runner.run(input_keys, sources)
+    except KeyboardInterrupt:
+        print_warning("\n⚠️  Batch interrupted by user")
+        return []
+
+    elapsed = time.time() - start_time
+    succeeded = sum(task.succeeded for task in tasks)
+    print_info(f"\n{succeeded}/{len(tasks)} documents extracted in {elapsed:.0f} seconds")
+    if runner.cache is not None:
+        stats = runner.cache.stats
+        print_info(f"Extraction cache: {stats.hits} hit(s), {stats.misses} miss(es)")
+    if runner.latency.get("count"):
+        print_info(
+            f"Job time-to-completion: p50 {runner.latency['p50']:.1f}s, "
+            f"p95 {runner.latency['p95']:.1f}s"
+        )
+    return tasks
 
-        return result_content
 
-    except Exception as e:
-        print_error(f"Failed to retrieve results: {e}")
-        return None
+def analyze_results(path: Path, report=None):
+    """Analyze extraction quality, streaming the markdown from disk.
 
+    ``report`` is a ``QualityReport`` already built while the result downloaded;
+    without it the file is scanned once here.
+    """
+    from src.utils.markdown_stream import read_lines
+    from src.utils.quality import assess_file
 
-def analyze_results(results: str):
-    """Analyze extraction quality."""
-    print_header("5. Analyzing Extraction Quality")
+    print_header("3. Analyzing Extraction Quality")
 
-    if not results:
+    if not path.exists() or not path.stat().st_size:
         print_error("No results to analyze")
         return
 
     try:
-        # Try to parse as JSON
-        try:
-            result_data = json.loads(results)
-            print_info("Results format: JSON")
-        except json.JSONDecodeError:
-            result_data = results
-            print_info("Results format: Text/Markdown")
+        if report is None:
+            report = assess_file(path)
+        print_info("Results format: Markdown")
 
         # Basic metrics
-        content_str = str(result_data)
-        print_info(f"Total characters: {len(content_str):,}")
-        print_info(f"Total words (approx): {len(content_str.split()):,}")
-
-        # Check for financial indicators
-        financial_keywords = [
-            "ingreso", "revenue", "costo", "cost", "ganancia", "profit",
-            "activo", "asset", "pasivo", "liability",
-            "CLP", "millones", "million", "M$", "MM$",
-            "Carozzi", "estado", "financiero", "financial", "statement"
-        ]
-
-        found_keywords = [kw for kw in financial_keywords if kw.lower() in content_str.lower()]
-        print_info(f"Financial keywords found: {len(found_keywords)}/{len(financial_keywords)}")
+        print_info(f"Total characters: {report.chars:,}")
+        print_info(f"Total words (approx): {report.words:,}")
+        print_info(f"Tables: {report.tables:,} ({report.table_rows:,} rows)")
 
+        # Financial indicators (one pass over the text for all terms)
+        found_keywords = report.found
+        print_info(f"Financial keywords found: {len(found_keywords)}/{report.total_terms}")
         if found_keywords:
             print_success(f"Found: {', '.join(found_keywords[:8])}")
+        if report.weak_pages:
+            print_warning(f"Pages graded POOR: {', '.join(map(str, report.weak_pages))}")
 
         # Show preview
         preview_length = 500
+        preview = ""
+        for line in read_lines(path):
+            preview += line + "\n"
+            if len(preview) >= preview_length:
+                break
         print_info(f"\nPreview (first {preview_length} chars):")
         print("-" * 60)
-        print(content_str[:preview_length])
-        if len(content_str) > preview_length:
+        print(preview[:preview_length])
+        if report.chars > preview_length:
             print("...")
         print("-" * 60)
 
         # Overall assessment
-        if len(content_str) > 1000 and len(found_keywords) > 5:
+        if report.grade == "EXCELLENT":
             print_success("\n✅ Extraction quality: EXCELLENT")
             print_success("Ready for Document Field Extractor!")
-        elif len(content_str) > 500 and len(found_keywords) > 3:
+        elif report.grade == "GOOD":
             print_info("\n⚠️  Extraction quality: GOOD")
             print_info("Contains financial data, may need refinement")
         else:
@@ -305,57 +280,115 @@ def analyze_results(results: str):
         print_error(f"Error analyzing results: {e}")
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--prefix", help="Extract every PDF under this COS prefix (e.g. financials/)")
+    source.add_argument(
+        "--glob",
+        help="Extract already-uploaded local PDFs matching this glob (e.g. 'data/demo/*/*.pdf')",
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Max jobs in flight")
+    parser.add_argument("--timeout", type=int, default=300, help="Per-job timeout in seconds")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-extract even if an identical PDF was already extracted",
+    )
+    parser.add_argument(
+        "--local-first",
+        action="store_true",
+        help="With --glob: extract text layers locally and OCR only the pages that need it",
+    )
+    parser.add_argument(
+        "--shard-pages",
+        type=int,
+        help="With --glob: split PDFs of 20+ pages into shards of about this many pages",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path("data/processed/extractions"),
+        help="Where extracted markdown is saved",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main test function."""
-    print_header("watsonx.ai Text Extraction with Cloud Object Storage")
+    args = parse_args(argv)
+
+    from src.orchestration.batch_extraction import discover_cos_inputs, local_sources
 
-    # Configuration
-    input_pdf = "financials/EEFF_Anual_2023.pdf"  # Path in COS
-    output_results = "extractions/EEFF_2023_markdown.json"  # Path in COS
-    local_save_path = Path("data/processed/extractions/EEFF_2023_extraction.json")
+    print_header("watsonx.ai Text Extraction with Cloud Object Storage")
 
     # Step 1: Initialize clients
     extraction_client, cos_client = initialize_clients()
     if not extraction_client or not cos_client:
         return 1
 
-    # Step 2: Submit extraction job
-    job_id = run_extraction_job(extraction_client, input_pdf, output_results)
-    if not job_id:
+    # Resolve inputs (default: the 2023 annual report)
+    sources = None
+    if args.prefix is not None:
+        input_keys = discover_cos_inputs(cos_client, os.getenv("COS_BUCKET_NAME"), args.prefix)
+    elif args.glob:
+        sources = local_sources(args.glob)
+        input_keys = list(sources)
+    else:
+        input_keys = ["financials/EEFF_Anual_2023.pdf"]
+
+    if not input_keys:
+        print_error("No PDF files matched")
         return 1
 
-    # Step 3: Monitor job
-    job_completed = monitor_job(extraction_client, job_id, timeout=300)
-    if not job_completed:
-        print_error("\nJob did not complete successfully")
-        return 1
+    reports = {}
 
-    # Step 4: Retrieve results
-    results = retrieve_results(cos_client, output_results, local_save_path)
-    if not results:
+    # Step 2-3: Extract (locally first, in page shards, or one remote job per document)
+    if (args.local_first or args.shard_pages) and not sources:
+        print_error("--local-first and --shard-pages need local PDFs (use --glob)")
+        return 1
+    if args.local_first:
+        completed = run_local_extraction(extraction_client, cos_client, sources, args)
+        total = len(sources)
+    elif args.shard_pages:
+        completed = run_sharded_extraction(extraction_client, cos_client, sources, args)
+        total = len(sources)
+    else:
+        tasks = run_batch_extraction(
+            extraction_client, cos_client, input_keys, args, sources, reports
+        )
+        completed = [(task.input_key, task.local_path) for task in tasks if task.succeeded]
+        total = len(tasks)
+    if not completed:
+        print_error("\nNo extraction job completed successfully")
         return 1
 
-    # Step 5: Analyze results
-    analyze_results(results)
+    # Step 4: Analyze results
+    for input_key, local_path in completed:
+        print_info(f"\n{input_key}")
+        analyze_results(local_path, reports.get(input_key))
 
     # Summary
     print_header("Test Summary")
-    print_success("🎉 Text Extraction Pipeline Completed Successfully!")
+    if len(completed) == total:
+        print_success("🎉 Text Extraction Pipeline Completed Successfully!")
+    else:
+        print_warning(f"{total - len(completed)} of {total} documents failed")
 
     print_info("\nWhat we accomplished:")
-    print_info("  ✅ PDF stored in Cloud Object Storage")
-    print_info("  ✅ Text extraction job submitted to watsonx.ai")
-    print_info("  ✅ Job monitored to completion")
-    print_info("  ✅ Results retrieved from COS")
+    print_info("  ✅ PDFs stored in Cloud Object Storage")
+    print_info("  ✅ Text extraction jobs submitted to watsonx.ai concurrently")
+    print_info("  ✅ Jobs monitored together to completion")
+    print_info("  ✅ Results retrieved from COS as each job finished")
     print_info("  ✅ Extraction quality analyzed")
 
     print_info("\nNext steps:")
-    print_info("  1. Process remaining EEFF PDFs (2015-2022)")
-    print_info("  2. Extract contract PDFs")
+    print_info("  1. Process remaining EEFF PDFs: --prefix financials/")
+    print_info("  2. Extract contract PDFs: --prefix contracts/")
     print_info("  3. Configure Document Field Extractor for structured data")
-    print_info("  4. Build automated batch processing pipeline")
 
-    return 0
+    return 0 if len(completed) == total else 1
 
 
 if __name__ == "__main__":
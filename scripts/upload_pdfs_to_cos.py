@@ -2,14 +2,24 @@
 """Upload Carozzi PDFs to IBM Cloud Object Storage.
 
 This script uploads all PDFs from data/demo/ to COS bucket for
-watsonx.ai Text Extraction processing.
+watsonx.ai Text Extraction processing. Large files are streamed in parts and
+an interrupted upload resumes from the parts already stored.
+
+With --sync only new or changed files are uploaded (compared by size and ETag
+against one bucket listing):
+
+    python scripts/upload_pdfs_to_cos.py --sync
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
+# Make ``src`` importable when run as ``python scripts/<name>.py`` without an install.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
 # Load environment variables
 load_dotenv()
 
@@ -47,46 +57,58 @@ def print_info(text: str):
 def create_cos_client():
     """Create COS client."""
     try:
-        import ibm_boto3
-        from ibm_botocore.client import Config
-
-        return ibm_boto3.client(
-            "s3",
-            aws_access_key_id=os.getenv("COS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("COS_SECRET_ACCESS_KEY"),
-            endpoint_url=os.getenv("COS_ENDPOINT"),
-            config=Config(signature_version="s3v4")
-        )
+        from src.integrations.clients import get_registry
+
+        return get_registry().cos_client()
     except Exception as e:
         print_error(f"Failed to create COS client: {e}")
         return None
 
 
-def upload_pdf(cos_client, pdf_path: Path, cos_key: str):
-    """Upload single PDF to COS."""
-    bucket_name = os.getenv("COS_BUCKET_NAME")
-
-    try:
-        file_size_mb = pdf_path.stat().st_size / 1024 / 1024
-        print_info(f"Uploading: {pdf_path.name} ({file_size_mb:.2f} MB)")
-
-        with open(pdf_path, "rb") as f:
-            cos_client.put_object(
-                Bucket=bucket_name,
-                Key=cos_key,
-                Body=f.read()
-            )
-
-        print_success(f"  ✓ Uploaded to: {bucket_name}/{cos_key}")
-        return True
-
-    except Exception as e:
-        print_error(f"  ✗ Upload failed: {e}")
-        return False
-
-
-def main():
+def report_upload(result):
+    """Print the outcome of one upload."""
+    size_mb = result.size / 1024 / 1024
+    if result.succeeded:
+        resumed = f", resumed {result.resumed_parts} part(s)" if result.resumed_parts else ""
+        print_success(
+            f"  ✓ {result.path.name} ({size_mb:.2f} MB, {result.parts} part(s){resumed}) "
+            f"→ {result.key}"
+        )
+    else:
+        print_error(f"  ✗ {result.path.name} upload failed: {result.error}")
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sync", action="store_true", help="Upload only files missing or changed in COS"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="With --sync, show what would be uploaded"
+    )
+    return parser.parse_args(argv)
+
+
+def sync_pdfs(uploader, items, dry_run: bool):
+    """Upload only new or changed PDFs, returning the sync report."""
+    from src.integrations.cos_sync import COSSync
+
+    report = COSSync(uploader).sync(items, dry_run=dry_run)
+    print_info(
+        f"Compared against bucket listing ({report.listing_calls} call(s)): "
+        f"{len(report.plan.upload)} to upload, {len(report.plan.unchanged)} unchanged"
+    )
+    for path, _, reason in report.plan.upload:
+        print_info(f"  {'would upload' if dry_run else 'uploading'} {path.name} ({reason})")
+    for result in report.results:
+        report_upload(result)
+    return report
+
+
+def main(argv=None):
     """Upload all PDFs to COS."""
+    args = parse_args(argv)
     print_header("Upload PDFs to Cloud Object Storage")
 
     # Create COS client
@@ -116,22 +138,34 @@ def main():
 
     print_info(f"Found {len(all_pdfs)} PDF file(s) to upload\n")
 
-    # Upload each PDF
-    uploaded_count = 0
-    failed_count = 0
-
-    for category, pdf_path in all_pdfs:
-        cos_key = f"{category}/{pdf_path.name}"
+    # Upload all PDFs (streamed in parts, several files at once)
+    from src.integrations.cos_upload import MultipartUploader
+
+    uploader = MultipartUploader(cos_client, bucket_name)
+    items = [(pdf_path, f"{category}/{pdf_path.name}") for category, pdf_path in all_pdfs]
+    if args.sync:
+        report = sync_pdfs(uploader, items, args.dry_run)
+        if args.dry_run:
+            print_header("Dry Run Summary")
+            if report.plan.upload:
+                print_info(f"{len(report.plan.upload)} PDF(s) would be uploaded (listed above)")
+                print_info("Run without --dry-run to upload them")
+            else:
+                print_success("🎉 Bucket in sync, nothing to upload")
+            return 0
+        results = report.results
+    else:
+        results = uploader.upload_files(items, on_complete=report_upload)
 
-        if upload_pdf(cos_client, pdf_path, cos_key):
-            uploaded_count += 1
-        else:
-            failed_count += 1
+    uploaded_count = sum(result.succeeded for result in results)
+    failed_count = len(results) - uploaded_count
 
     # Summary
     print_header("Upload Summary")
 
-    if uploaded_count == len(all_pdfs):
+    if args.sync and failed_count == 0:
+        print_success(f"🎉 Bucket in sync ({uploaded_count} PDF(s) uploaded)")
+    elif uploaded_count == len(all_pdfs):
         print_success(f"🎉 All {uploaded_count} PDFs uploaded successfully!")
     else:
         print_info(f"Uploaded: {uploaded_count}/{len(all_pdfs)}")
@@ -141,16 +175,25 @@ def main():
     # List uploaded files
     print_info("\nVerifying uploads...")
     try:
-        response = cos_client.list_objects_v2(Bucket=bucket_name)
-
-        if "Contents" in response:
-            print_success(f"Bucket now contains {len(response['Contents'])} objects:")
-            for obj in response["Contents"]:
-                key = obj["Key"]
-                size_mb = obj["Size"] / 1024 / 1024
-                print_info(f"  - {key} ({size_mb:.2f} MB)")
+        from src.integrations.cos_listing import iter_objects_parallel
+
+        expected = {key for _, key in items}
+        prefixes = sorted({key.split("/", 1)[0] + "/" for key in expected})
+        found = {
+            obj["Key"]: obj["Size"]
+            for obj in iter_objects_parallel(cos_client, bucket_name, prefixes)
+            if obj["Key"] in expected
+        }
+
+        for key in sorted(found):
+            print_info(f"  - {key} ({found[key] / 1024 / 1024:.2f} MB)")
+        missing = expected - found.keys()
+        if missing:
+            print_error(f"{len(missing)} uploaded file(s) not found in bucket:")
+            for key in sorted(missing):
+                print_error(f"  - {key}")
         else:
-            print_error("Bucket appears empty after upload")
+            print_success(f"All {len(found)} PDFs present in bucket")
 
     except Exception as e:
         print_error(f"Could not verify uploads: {e}")
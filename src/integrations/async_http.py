@@ -0,0 +1,244 @@
+"""Shared async HTTP layer: pooled httpx client with retries, breakers and hedging.
+
+One ``AsyncHTTP`` instance per event loop replaces one-shot ``requests`` calls,
+so FRED, watsonx and notification calls can fan out concurrently over warm
+connections. On top of ``httpx.AsyncClient`` (HTTP/2 when ``h2`` is
+installed) it adds:
+
+- a concurrency limit per host, so one slow API cannot take the whole pool;
+- retries with full-jitter exponential backoff (``Retry-After`` is honoured);
+- a circuit breaker per host that fails fast while the host is down or
+  throttling (5xx and 429 responses count as failures);
+- optional hedging of GETs: if the first attempt is slow, a second is sent
+  and whichever answers first wins.
+
+Only idempotent methods are retried on failure responses; others are retried
+only when the request never left: the connection could not be made in time,
+or no pooled connection became free.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Transport errors raised before any byte of the request was sent.
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised without sending when a host's circuit breaker is open."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how long to wait between attempts."""
+
+    attempts: int = 3
+    backoff: float = 0.2
+    max_backoff: float = 10.0
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+    def delay(self, attempt: int, rng: random.Random, retry_after: str | None = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (0-based)."""
+        if retry_after is not None:
+            try:
+                return min(self.max_backoff, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        return rng.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+class CircuitBreaker:
+    """Open after ``failure_threshold`` consecutive failures; probe after ``reset_timeout``."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """Whether a request may be sent (one probe at a time when half open)."""
+        state = self.state
+        if state == HALF_OPEN:
+            # Re-arm so concurrent callers keep failing fast until the probe returns.
+            self.opened_at = self.clock()
+            return True
+        return state == CLOSED
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = self.clock()
+
+
+class AsyncHTTP:
+    """Pooled async HTTP client; use ``async with AsyncHTTP() as http``."""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        per_host: int = 10,
+        timeout: float = 30.0,
+        retry: RetryPolicy | None = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        hedge_after: float | None = None,
+        http2: bool | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        seed: int | None = None,
+    ) -> None:
+        self.per_host = per_host
+        self.retry = retry or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hedge_after = hedge_after
+        self.clock = clock
+        self.sleep = sleep
+        self.retries = 0
+        self.hedges = 0
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE if http2 is None else http2,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+            transport=transport,
+        )
+        self._rng = random.Random(seed)
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    async def __aenter__(self) -> "AsyncHTTP":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(
+                self.failure_threshold, self.reset_timeout, self.clock
+            )
+        return self._breakers[host]
+
+    async def request(
+        self, method: str, url: str, idempotent: bool | None = None, **kwargs: Any
+    ) -> httpx.Response:
+        """Send with per-host limits, retries and the host's circuit breaker.
+
+        Returns the last response (possibly an error status) once retries are
+        exhausted; raises transport errors and ``CircuitOpenError``.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        host = httpx.URL(url).host
+        breaker = self.breaker(host)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"circuit open for {host}")
+            last = attempt == self.retry.attempts - 1
+            try:
+                async with self._semaphore(host):
+                    response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                if last or not (idempotent or isinstance(e, NOT_SENT_ERRORS)):
+                    raise
+                logger.debug("%s %s failed (%s); retrying", method, url, e)
+                await self._backoff(attempt)
+                attempt += 1
+                continue
+            if response.status_code >= 500 or response.status_code == 429:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if response.status_code not in self.retry.retry_statuses or last or not idempotent:
+                return response
+            logger.debug("%s %s returned %d; retrying", method, url, response.status_code)
+            await response.aclose()
+            await self._backoff(attempt, response.headers.get("Retry-After"))
+            attempt += 1
+
+    async def get(
+        self, url: str, hedge_after: float | None = None, **kwargs: Any
+    ) -> httpx.Response:
+        """GET, hedged with a second attempt after ``hedge_after`` seconds if set."""
+        delay = self.hedge_after if hedge_after is None else hedge_after
+        if delay is None:
+            return await self.request("GET", url, **kwargs)
+        return await self._hedged(url, delay, **kwargs)
+
+    async def get_many(self, urls: Iterable[str], **kwargs: Any) -> list[httpx.Response]:
+        """GET several URLs concurrently."""
+        return list(await asyncio.gather(*(self.get(url, **kwargs) for url in urls)))
+
+    async def _hedged(self, url: str, delay: float, **kwargs: Any) -> httpx.Response:
+        tasks = {asyncio.create_task(self.request("GET", url, **kwargs))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges += 1
+                tasks.add(asyncio.create_task(self.request("GET", url, **kwargs)))
+            error: BaseException | None = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._semaphores[host]
+
+    async def _backoff(self, attempt: int, retry_after: str | None = None) -> None:
+        self.retries += 1
+        await self.sleep(self.retry.delay(attempt, self._rng, retry_after))
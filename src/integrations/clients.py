@@ -0,0 +1,233 @@
+"""Shared, thread-safe watsonx and COS clients with IAM token caching.
+
+Every pipeline stage gets its clients from one ``ClientRegistry`` instead of
+building its own, so TLS connections stay warm and the COS connection pool is
+shared. ``IAMTokenManager`` caches the IBM Cloud IAM bearer token until shortly
+before it expires and refreshes it on a background timer, so callers almost
+never wait on ``iam.cloud.ibm.com``.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Mapping
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+IAM_TOKEN_URL = "https://iam.cloud.ibm.com/identity/token"
+IAM_GRANT_TYPE = "urn:ibm:params:oauth:grant-type:apikey"
+DEFAULT_WATSONX_URL = "https://us-south.ml.cloud.ibm.com"
+COS_MAX_POOL_CONNECTIONS = 32
+
+
+class IAMTokenManager:
+    """Cache an IAM bearer token and refresh it before it expires.
+
+    ``get_token()`` only blocks on the network when no valid token is cached;
+    concurrent callers share a single request. With ``background_refresh`` a
+    daemon timer fetches the next token ``refresh_margin`` seconds before expiry.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        http_client: httpx.Client | None = None,
+        token_url: str = IAM_TOKEN_URL,
+        refresh_margin: float = 60.0,
+        background_refresh: bool = True,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.api_key = api_key
+        self.token_url = token_url
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+        self.clock = clock
+        self.fetch_count = 0
+        self._http = http_client or httpx.Client(timeout=30.0)
+        self._owns_http = http_client is None
+        self._lock = threading.Lock()
+        self._token: dict[str, Any] | None = None
+        self._timer: threading.Timer | None = None
+        self._closed = False
+
+    def get_token(self) -> str:
+        """Return a bearer token valid for at least ``refresh_margin`` seconds."""
+        with self._lock:
+            if not self._is_fresh():
+                self._refresh_locked()
+            assert self._token is not None
+            return str(self._token["access_token"])
+
+    def token_info(self) -> dict[str, Any]:
+        """Full IAM response of the current token (``token_type``, ``expires_in``, ...)."""
+        self.get_token()
+        assert self._token is not None
+        return dict(self._token)
+
+    def authorization_header(self) -> dict[str, str]:
+        """``Authorization`` header for watsonx REST calls."""
+        return {"Authorization": f"Bearer {self.get_token()}"}
+
+    def close(self) -> None:
+        """Stop background refreshes and release the HTTP client if owned."""
+        with self._lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self._owns_http:
+            self._http.close()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._token is not None
+            and self.clock() < self._token["expiration"] - self.refresh_margin
+        )
+
+    def _refresh_locked(self) -> None:
+        response = self._http.post(
+            self.token_url,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            data={"grant_type": IAM_GRANT_TYPE, "apikey": self.api_key},
+        )
+        response.raise_for_status()
+        token = response.json()
+        if "access_token" not in token:
+            raise ValueError("IAM response did not contain an access token")
+        # Prefer the absolute expiration; fall back to expires_in from now.
+        token.setdefault("expiration", self.clock() + float(token.get("expires_in", 3600)))
+        self._token = token
+        self.fetch_count += 1
+        self._schedule_refresh()
+
+    def _schedule_refresh(self) -> None:
+        if not self.background_refresh or self._closed or self._token is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        delay = max(1.0, self._token["expiration"] - self.refresh_margin - self.clock())
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._refresh_locked()
+            except Exception as e:
+                logger.warning("Background IAM token refresh failed: %s", e)
+                # Retry soon; get_token() will also refresh on demand if needed.
+                self._timer = threading.Timer(10.0, self._background_refresh)
+                self._timer.daemon = True
+                self._timer.start()
+
+
+def _build_cos_client(env: Mapping[str, str]) -> Any:
+    import ibm_boto3
+    from ibm_botocore.client import Config
+
+    return ibm_boto3.client(
+        "s3",
+        aws_access_key_id=env.get("COS_ACCESS_KEY_ID"),
+        aws_secret_access_key=env.get("COS_SECRET_ACCESS_KEY"),
+        endpoint_url=env.get("COS_ENDPOINT"),
+        config=Config(signature_version="s3v4", max_pool_connections=COS_MAX_POOL_CONNECTIONS),
+    )
+
+
+def _build_extraction_client(env: Mapping[str, str]) -> Any:
+    from ibm_watsonx_ai import Credentials
+    from ibm_watsonx_ai.foundation_models.extractions import TextExtractionsV2
+
+    return TextExtractionsV2(
+        credentials=Credentials(
+            api_key=env.get("WATSONX_API_KEY"),
+            url=env.get("WATSONX_URL", DEFAULT_WATSONX_URL),
+        ),
+        project_id=env.get("WATSONX_PROJECT_ID"),
+    )
+
+
+class ClientRegistry:
+    """Lazily create and hand out one shared instance of each client.
+
+    Creation is guarded by a lock, so concurrent first calls still build a single
+    client. The ``*_factory`` arguments exist for tests and alternative
+    endpoints; by default the ``ibm_boto3`` and ``ibm_watsonx_ai`` SDKs are used.
+    """
+
+    def __init__(
+        self,
+        env: Mapping[str, str] | None = None,
+        cos_factory: Callable[[Mapping[str, str]], Any] = _build_cos_client,
+        extraction_factory: Callable[[Mapping[str, str]], Any] = _build_extraction_client,
+    ) -> None:
+        self.env = env if env is not None else os.environ
+        self._factories: dict[str, Callable[[], Any]] = {
+            "cos": lambda: cos_factory(self.env),
+            "extraction": lambda: extraction_factory(self.env),
+            "http": lambda: httpx.Client(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            ),
+            "iam": lambda: IAMTokenManager(
+                self.env.get("WATSONX_API_KEY", ""), http_client=self.http_client()
+            ),
+        }
+        self._instances: dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def cos_client(self) -> Any:
+        """Shared ``ibm_boto3`` S3 client (thread-safe, pooled connections)."""
+        return self._get("cos")
+
+    def extraction_client(self) -> Any:
+        """Shared ``TextExtractionsV2`` client."""
+        return self._get("extraction")
+
+    def http_client(self) -> httpx.Client:
+        """Shared keep-alive HTTP client for plain REST calls."""
+        client: httpx.Client = self._get("http")
+        return client
+
+    def token_manager(self) -> IAMTokenManager:
+        """Shared IAM token cache for the configured API key."""
+        manager: IAMTokenManager = self._get("iam")
+        return manager
+
+    def close(self) -> None:
+        """Close owned resources and forget all instances."""
+        with self._lock:
+            instances, self._instances = self._instances, {}
+        if "iam" in instances:
+            instances["iam"].close()
+        if "http" in instances:
+            instances["http"].close()
+
+    def _get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+            return self._instances[name]
+
+
+_default_registry: ClientRegistry | None = None
+_default_lock = threading.Lock()
+
+
+def get_registry() -> ClientRegistry:
+    """Process-wide registry configured from the environment."""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = ClientRegistry()
+        return _default_registry
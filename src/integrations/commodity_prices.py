@@ -0,0 +1,313 @@
+"""FRED commodity price client with a local append-only series cache.
+
+ARCHITECTURE.md's ``CommodityPriceAPI`` downloads a series' whole observation
+history on every call to read its last value, while FRED allows about 1000
+calls a day. ``CommodityPriceClient`` instead:
+
+1. Keeps each series in an append-only CSV under ``data/raw/fred``.
+2. Asks FRED only for observations after the last cached date
+   (``observation_start``), and only when the series was not checked within
+   ``max_age``.
+3. Refreshes several series concurrently through ``AsyncHTTP`` (pooled
+   connections, retries, circuit breaker); ``refresh_async`` lets callers
+   that already run an event loop share their own ``AsyncHTTP``.
+4. Spends a token from a ``TokenBucket`` on every request.
+
+Reads (``latest``, ``observations``) are served from the cache. They refresh
+a stale series only when a token is free right away, and a failed refresh is
+logged and leaves the cached observations in place, so a read never waits on
+the rate limit or fails because FRED is down.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from src.integrations.async_http import AsyncHTTP, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+FRED_DAILY_LIMIT = 1000
+DEFAULT_CACHE_DIR = Path("data/raw/fred")
+
+# FRED series behind the commodity event types (IMF primary commodity prices, monthly).
+SERIES: dict[str, str] = {
+    "cocoa_price": "PCOCOUSDM",
+    "wheat_price": "PWHEAMTUSDM",
+    "vegetable_oil_price": "PSOILUSDM",
+    "usd_clp_rate": "CCUSMA02CLM618N",
+}
+
+Observation = tuple[date, float]
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``capacity`` tokens, refilled at ``rate`` per second."""
+
+    def __init__(
+        self,
+        rate: float = FRED_DAILY_LIMIT / 86_400,
+        capacity: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a token; return 0.0 on success, else the seconds until one is available."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        """Take a token, sleeping until one is available."""
+        while (wait := self.try_acquire()) > 0:
+            self.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Take a token without blocking the event loop while waiting."""
+        while (wait := self.try_acquire()) > 0:
+            await asyncio.sleep(wait)
+
+
+class SeriesCache:
+    """One append-only ``date,value`` CSV per series, mirrored in memory."""
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR) -> None:
+        self.root = root
+        self._series: dict[str, list[Observation]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, series_id: str) -> Path:
+        return self.root / f"{series_id}.csv"
+
+    def observations(self, series_id: str) -> list[Observation]:
+        """Cached observations in date order."""
+        with self._lock:
+            return list(self._load(series_id))
+
+    def last_date(self, series_id: str) -> date | None:
+        with self._lock:
+            series = self._load(series_id)
+            return series[-1][0] if series else None
+
+    def append(self, series_id: str, observations: Iterable[Observation]) -> int:
+        """Append observations newer than the last cached one; return how many were added."""
+        with self._lock:
+            series = self._load(series_id)
+            last = series[-1][0] if series else None
+            new = sorted(o for o in observations if last is None or o[0] > last)
+            if not new:
+                return 0
+            path = self.path(series_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            header = "" if path.exists() else "date,value\n"
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(header + "".join(f"{d.isoformat()},{v!r}\n" for d, v in new))
+                f.flush()
+                os.fsync(f.fileno())
+            series.extend(new)
+            return len(new)
+
+    def _load(self, series_id: str) -> list[Observation]:
+        series = self._series.get(series_id)
+        if series is not None:
+            return series
+        series = []
+        try:
+            lines = self.path(series_id).read_text(encoding="utf-8").splitlines()[1:]
+        except FileNotFoundError:
+            lines = []
+        for line in lines:
+            try:
+                day, value = line.split(",")
+                series.append((date.fromisoformat(day), float(value)))
+            except ValueError:
+                logger.warning("Skipping bad line in %s: %r", self.path(series_id), line)
+        self._series[series_id] = series
+        return series
+
+
+class CommodityPriceClient:
+    """Cached, rate-limited reads of FRED observation series.
+
+    ``series`` arguments accept either FRED series IDs or the event type names
+    in ``SERIES``. The synchronous methods run their requests on a private
+    event loop with an ``AsyncHTTP`` of their own (``max_workers`` requests at
+    a time, ``retry``, ``transport``); inside a running loop use
+    ``refresh_async`` instead.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        cache: SeriesCache | None = None,
+        base_url: str = FRED_OBSERVATIONS_URL,
+        bucket: TokenBucket | None = None,
+        max_age: float = 6 * 3600.0,
+        max_workers: int = 4,
+        retry: RetryPolicy | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.api_key = api_key or os.getenv("FRED_API_KEY", "")
+        self.cache = cache or SeriesCache()
+        self.base_url = base_url
+        self.bucket = bucket or TokenBucket()
+        self.max_age = max_age
+        self.max_workers = max_workers
+        self.retry = retry
+        self.transport = transport
+        self.clock = clock
+        self.request_count = 0
+        self.errors: dict[str, str] = {}
+        self._checked: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "CommodityPriceClient":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Nothing to release: connections live only as long as one refresh."""
+
+    @staticmethod
+    def series_id(series: str) -> str:
+        return SERIES.get(series, series)
+
+    def refresh(
+        self, series: Iterable[str], force: bool = False, wait: bool = True
+    ) -> dict[str, int]:
+        """Fetch new observations for every stale series; return counts added per series ID.
+
+        A series whose request fails is logged, recorded in ``errors`` and left
+        out of the result; it is retried once ``max_age`` has passed. With
+        ``wait=False`` a series is skipped instead of waiting for a token.
+        """
+        if not self._stale(series, force):
+            return {}
+        return asyncio.run(self.refresh_async(series, force, wait))
+
+    async def refresh_async(
+        self,
+        series: Iterable[str],
+        force: bool = False,
+        wait: bool = True,
+        http: AsyncHTTP | None = None,
+    ) -> dict[str, int]:
+        """``refresh`` on the running loop, through ``http`` when given."""
+        stale = self._stale(series, force)
+        if not stale:
+            return {}
+        if http is None:
+            async with AsyncHTTP(
+                per_host=self.max_workers, retry=self.retry, transport=self.transport
+            ) as own:
+                return await self.refresh_async(stale, force=True, wait=wait, http=own)
+        results = await asyncio.gather(*(self._refresh_one(s, http, wait) for s in stale))
+        return {s: n for s, n in zip(stale, results, strict=True) if n is not None}
+
+    def observations(self, series: str, since: date | None = None) -> list[Observation]:
+        """Cached observations, optionally from ``since``.
+
+        A stale series is refreshed first if a token is free; otherwise, or if
+        the refresh fails, the cached observations are returned as they are.
+        """
+        series_id = self.series_id(series)
+        self.refresh([series_id], wait=False)
+        observations = self.cache.observations(series_id)
+        if since is not None:
+            observations = [o for o in observations if o[0] >= since]
+        return observations
+
+    def latest(self, series: str) -> Observation:
+        """Most recent observation of a series."""
+        observations = self.observations(series)
+        if not observations:
+            raise LookupError(f"no observations for {self.series_id(series)}")
+        return observations[-1]
+
+    def get_cocoa_price(self) -> float:
+        """Current cocoa price (USD/mt)."""
+        return self.latest("cocoa_price")[1]
+
+    def event_rows(self, series: str, unit: str | None = None) -> list[dict[str, Any]]:
+        """Cached observations as ``external_events`` rows (event type from ``SERIES``)."""
+        series_id = self.series_id(series)
+        event_type = next((k for k, v in SERIES.items() if v == series_id), series_id)
+        return [
+            {
+                "event_date": day,
+                "event_type": event_type,
+                "value": value,
+                "unit": unit,
+                "source": f"FRED:{series_id}",
+            }
+            for day, value in self.observations(series_id)
+        ]
+
+    def _stale(self, series: Iterable[str], force: bool) -> list[str]:
+        ids = list(dict.fromkeys(self.series_id(s) for s in series))
+        now = self.clock()
+        with self._lock:
+            return [
+                s for s in ids if force or now - self._checked.get(s, -float("inf")) >= self.max_age
+            ]
+
+    async def _refresh_one(self, series_id: str, http: AsyncHTTP, wait: bool) -> int | None:
+        last = self.cache.last_date(series_id)
+        params = {"series_id": series_id, "api_key": self.api_key, "file_type": "json"}
+        if last is not None:
+            params["observation_start"] = (last + timedelta(days=1)).isoformat()
+        if wait:
+            await self.bucket.acquire_async()
+        elif self.bucket.try_acquire() > 0:
+            logger.debug("FRED %s: no token free, serving cached observations", series_id)
+            return None
+        with self._lock:
+            self.request_count += 1
+        try:
+            response = await http.get(self.base_url, params=params)
+            response.raise_for_status()
+            observations = [
+                (date.fromisoformat(o["date"]), float(o["value"]))
+                for o in response.json().get("observations", [])
+                # FRED marks missing values with ".".
+                if o.get("value") not in (None, ".")
+            ]
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            logger.warning("FRED %s refresh failed, serving cached observations: %s", series_id, e)
+            with self._lock:
+                self.errors[series_id] = str(e)
+                self._checked[series_id] = self.clock()
+            return None
+        added = self.cache.append(series_id, observations)
+        with self._lock:
+            self.errors.pop(series_id, None)
+            self._checked[series_id] = self.clock()
+        logger.debug("FRED %s: %d new observations", series_id, added)
+        return added
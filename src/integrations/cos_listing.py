@@ -0,0 +1,140 @@
+"""Lazy, paginated listing of Cloud Object Storage buckets.
+
+``list_objects_v2`` returns at most 1000 keys per call; these generators follow
+continuation tokens and yield objects page by page, so callers never silently
+stop at the first page and never hold more than a few pages in memory.
+``iter_objects_parallel`` lists several prefixes at once (e.g. ``contracts/``,
+``financials/``, ``regulations/``, ``generated_reports/``) and yields objects
+as pages arrive from any of them.
+"""
+
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+DEFAULT_PAGE_SIZE = 1000
+
+_DONE = object()
+
+
+def iter_pages(
+    cos_client: Any,
+    bucket: str,
+    prefix: str = "",
+    delimiter: str | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """Yield raw ``list_objects_v2`` responses, following continuation tokens."""
+    kwargs: dict[str, Any] = {"Bucket": bucket, "Prefix": prefix, "MaxKeys": page_size}
+    if delimiter:
+        kwargs["Delimiter"] = delimiter
+    while True:
+        response: dict[str, Any] = cos_client.list_objects_v2(**kwargs)
+        yield response
+        if not response.get("IsTruncated"):
+            return
+        kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+
+def iter_objects(
+    cos_client: Any,
+    bucket: str,
+    prefix: str = "",
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """Yield every object (``Key``, ``Size``, ``ETag``, ...) under ``prefix``."""
+    for page in iter_pages(cos_client, bucket, prefix, page_size=page_size):
+        yield from page.get("Contents", [])
+
+
+def iter_common_prefixes(
+    cos_client: Any,
+    bucket: str,
+    prefix: str = "",
+    delimiter: str = "/",
+) -> Iterator[str]:
+    """Yield the immediate "subdirectories" of ``prefix``."""
+    for page in iter_pages(cos_client, bucket, prefix, delimiter=delimiter):
+        for common in page.get("CommonPrefixes", []):
+            yield common["Prefix"]
+
+
+def iter_objects_parallel(
+    cos_client: Any,
+    bucket: str,
+    prefixes: Iterable[str],
+    max_workers: int = 4,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_buffered_pages: int = 8,
+) -> Iterator[dict[str, Any]]:
+    """List several prefixes concurrently, yielding objects as pages arrive.
+
+    At most ``max_buffered_pages`` pages wait in memory; listing threads block
+    until the consumer catches up. Order across prefixes is not defined.
+    Closing the generator early stops the listing threads.
+    """
+    prefixes = list(dict.fromkeys(prefixes))
+    if not prefixes:
+        return
+    pages: queue.Queue[Any] = queue.Queue(maxsize=max_buffered_pages)
+    stop = threading.Event()
+
+    def offer(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def list_prefix(prefix: str) -> None:
+        if stop.is_set():
+            return
+        try:
+            for page in iter_pages(cos_client, bucket, prefix, page_size=page_size):
+                if not offer(page.get("Contents", [])):
+                    return
+        except Exception as e:
+            offer(e)
+        finally:
+            offer(_DONE)
+
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="cos-list") as pool:
+        for prefix in prefixes:
+            pool.submit(list_prefix, prefix)
+        remaining = len(prefixes)
+        try:
+            while remaining:
+                item = pages.get()
+                if item is _DONE:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield from item
+        finally:
+            stop.set()
+
+
+def iter_bucket(
+    cos_client: Any,
+    bucket: str,
+    prefix: str = "",
+    max_workers: int = 4,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """Yield every object under ``prefix``, fanning out across its subdirectories.
+
+    Objects directly at the ``prefix`` level come first, then the subdirectories
+    found with a ``/`` delimiter are listed in parallel.
+    """
+    subdirectories: list[str] = []
+    for page in iter_pages(cos_client, bucket, prefix, delimiter="/", page_size=page_size):
+        yield from page.get("Contents", [])
+        subdirectories.extend(common["Prefix"] for common in page.get("CommonPrefixes", []))
+    yield from iter_objects_parallel(
+        cos_client, bucket, subdirectories, max_workers=max_workers, page_size=page_size
+    )
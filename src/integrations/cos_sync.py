@@ -0,0 +1,185 @@
+"""rsync-style sync of local PDFs to Cloud Object Storage.
+
+Local files are compared by size and ETag against a remote manifest built from
+one paginated ``list_objects_v2`` pass, and only new or changed files are
+uploaded. ETags are predicted locally: plain MD5 for single-part uploads and the
+S3 multipart form (MD5 of part digests plus ``-<parts>``) for files the
+uploader splits. Local digests are cached by size and mtime in a persistent
+manifest, so an unchanged corpus is not even re-read.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from src.integrations.cos_listing import iter_pages
+from src.integrations.cos_upload import MultipartUploader, UploadResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MANIFEST_PATH = Path("data/processed/.cos_sync_manifest.json")
+
+
+def expected_etag(path: Path, part_size: int, multipart_threshold: int) -> str:
+    """ETag COS will report for ``path`` once uploaded by ``MultipartUploader``."""
+    size = path.stat().st_size
+    whole = hashlib.md5(usedforsecurity=False)
+    part_digests = []
+    with open(path, "rb") as f:
+        while chunk := f.read(part_size):
+            whole.update(chunk)
+            part_digests.append(hashlib.md5(chunk, usedforsecurity=False).digest())
+    if size <= multipart_threshold:
+        return whole.hexdigest()
+    combined = hashlib.md5(b"".join(part_digests), usedforsecurity=False)
+    return f"{combined.hexdigest()}-{len(part_digests)}"
+
+
+def covering_prefixes(keys: Iterable[str]) -> list[str]:
+    """Smallest set of directory prefixes whose listings cover every key."""
+    prefixes = sorted({key.rsplit("/", 1)[0] + "/" if "/" in key else "" for key in keys})
+    covering: list[str] = []
+    for prefix in prefixes:
+        if not any(prefix.startswith(kept) for kept in covering):
+            covering.append(prefix)
+    return covering
+
+
+@dataclass
+class SyncPlan:
+    """Files to upload (with the reason) and files already up to date."""
+
+    upload: list[tuple[Path, str, str]] = field(default_factory=list)
+    unchanged: list[tuple[Path, str]] = field(default_factory=list)
+
+
+@dataclass
+class SyncReport:
+    """Result of a sync run."""
+
+    plan: SyncPlan
+    results: list[UploadResult] = field(default_factory=list)
+    listing_calls: int = 0
+
+    @property
+    def failed(self) -> list[UploadResult]:
+        """Uploads that did not succeed."""
+        return [result for result in self.results if not result.succeeded]
+
+
+class SyncManifest:
+    """Persistent record of local digests and the last seen remote listing."""
+
+    def __init__(self, path: Path = DEFAULT_MANIFEST_PATH) -> None:
+        self.path = Path(path)
+        self.local: dict[str, dict[str, Any]] = {}
+        self.remote: dict[str, dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self.local = data.get("local", {})
+                self.remote = data.get("remote", {})
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning("Ignoring unreadable sync manifest %s: %s", self.path, e)
+
+    def local_etag(self, path: Path, part_size: int, multipart_threshold: int) -> str:
+        """Predicted ETag for ``path``, recomputed only if size, mtime or part size changed."""
+        stat = path.stat()
+        entry_key = str(path.resolve())
+        signature = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "part_size": part_size,
+            "multipart_threshold": multipart_threshold,
+        }
+        entry = self.local.get(entry_key)
+        if entry is not None and all(entry.get(k) == v for k, v in signature.items()):
+            return str(entry["etag"])
+        etag = expected_etag(path, part_size, multipart_threshold)
+        self.local[entry_key] = {**signature, "etag": etag}
+        return etag
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"local": self.local, "remote": self.remote}), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class COSSync:
+    """Upload only the files whose remote copy is missing or differs."""
+
+    def __init__(self, uploader: MultipartUploader, manifest: SyncManifest | None = None) -> None:
+        self.uploader = uploader
+        self.manifest = manifest if manifest is not None else SyncManifest()
+
+    def refresh_remote(self, prefixes: Iterable[str]) -> int:
+        """Rebuild the remote manifest for ``prefixes``; returns the number of listing calls."""
+        calls = 0
+        for prefix in dict.fromkeys(prefixes):
+            for key in [k for k in self.manifest.remote if k.startswith(prefix)]:
+                del self.manifest.remote[key]
+            for page in iter_pages(self.uploader.cos_client, self.uploader.bucket, prefix):
+                calls += 1
+                for obj in page.get("Contents", []):
+                    self.manifest.remote[obj["Key"]] = {
+                        "size": obj["Size"],
+                        "etag": obj["ETag"].strip('"'),
+                    }
+        return calls
+
+    def plan(self, items: Iterable[tuple[Path, str]]) -> SyncPlan:
+        """Compare local files against the remote manifest."""
+        plan = SyncPlan()
+        for path, key in items:
+            path = Path(path)
+            remote = self.manifest.remote.get(key)
+            if remote is None:
+                plan.upload.append((path, key, "new"))
+            elif remote["size"] != path.stat().st_size:
+                plan.upload.append((path, key, "size changed"))
+            elif remote["etag"] != self.manifest.local_etag(
+                path, self.uploader.part_size, self.uploader.multipart_threshold
+            ):
+                plan.upload.append((path, key, "content changed"))
+            else:
+                plan.unchanged.append((path, key))
+        return plan
+
+    def sync(
+        self,
+        items: Iterable[tuple[Path, str]],
+        refresh: bool = True,
+        dry_run: bool = False,
+    ) -> SyncReport:
+        """Upload new or changed files.
+
+        With ``refresh=False`` the persisted remote manifest is trusted and no
+        listing call is made at all.
+        """
+        items = [(Path(path), key) for path, key in items]
+        calls = 0
+        if refresh:
+            calls = self.refresh_remote(covering_prefixes(key for _, key in items))
+        report = SyncReport(self.plan(items), listing_calls=calls)
+
+        if not dry_run and report.plan.upload:
+            report.results = self.uploader.upload_files(
+                (path, key) for path, key, _ in report.plan.upload
+            )
+            for result in report.results:
+                if result.succeeded:
+                    # Record the local digest too, so the next run needs no re-read.
+                    local_etag = self.manifest.local_etag(
+                        result.path, self.uploader.part_size, self.uploader.multipart_threshold
+                    )
+                    etag = (result.etag or "").strip('"') or local_etag
+                    self.manifest.remote[result.key] = {"size": result.size, "etag": etag}
+        self.manifest.save()
+        return report
@@ -0,0 +1,241 @@
+"""Streaming, resumable multipart uploads to Cloud Object Storage.
+
+Files above the multipart threshold are split into fixed-size parts that are
+read and uploaded by a bounded worker pool, so at most ``max_workers`` parts are
+held in memory regardless of file size. Several files upload at once and share
+that pool. Progress is checkpointed per part, which lets an interrupted upload
+resume from the parts COS already holds instead of starting over.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# COS/S3 require every part except the last to be at least 5 MiB.
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_STATE_DIR = Path("data/processed/.upload_state")
+
+
+@dataclass
+class UploadResult:
+    """Outcome of uploading one file."""
+
+    path: Path
+    key: str
+    size: int
+    parts: int = 0
+    resumed_parts: int = 0
+    etag: str | None = None
+    error: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the object was written to COS."""
+        return self.error is None
+
+
+class MultipartUploader:
+    """Upload files to one bucket with bounded memory and parallelism.
+
+    ``part_size`` should stay at or above ``MIN_PART_SIZE`` against real COS;
+    smaller values are accepted for local stand-ins.
+    """
+
+    def __init__(
+        self,
+        cos_client: Any,
+        bucket: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_workers: int = 4,
+        max_files: int = 2,
+        multipart_threshold: int | None = None,
+        state_dir: Path = DEFAULT_STATE_DIR,
+    ) -> None:
+        if part_size < 1:
+            raise ValueError("part_size must be positive")
+        self.cos_client = cos_client
+        self.bucket = bucket
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self.max_files = max_files
+        self.multipart_threshold = part_size if multipart_threshold is None else multipart_threshold
+        self.state_dir = Path(state_dir)
+        self._state_lock = threading.Lock()
+
+    def upload_files(
+        self,
+        items: Iterable[tuple[Path, str]],
+        on_complete: Callable[[UploadResult], None] | None = None,
+    ) -> list[UploadResult]:
+        """Upload ``(path, key)`` pairs concurrently, returning results in input order."""
+        with (
+            ThreadPoolExecutor(self.max_workers, thread_name_prefix="cos-part") as part_pool,
+            ThreadPoolExecutor(self.max_files, thread_name_prefix="cos-file") as file_pool,
+        ):
+            futures = [
+                file_pool.submit(self._upload_reporting, Path(path), key, part_pool, on_complete)
+                for path, key in items
+            ]
+            return [future.result() for future in futures]
+
+    def upload_file(self, path: Path, key: str) -> UploadResult:
+        """Upload a single file, resuming a previous attempt when possible."""
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="cos-part") as part_pool:
+            return self._upload(Path(path), key, part_pool)
+
+    def abort(self, key: str) -> None:
+        """Abort a checkpointed multipart upload and forget its progress."""
+        state = self._read_state(key)
+        if state is not None:
+            self.cos_client.abort_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=state["upload_id"]
+            )
+            self._state_path(key).unlink(missing_ok=True)
+
+    def _upload_reporting(
+        self,
+        path: Path,
+        key: str,
+        part_pool: ThreadPoolExecutor,
+        on_complete: Callable[[UploadResult], None] | None,
+    ) -> UploadResult:
+        result = self._upload(path, key, part_pool)
+        if on_complete is not None:
+            on_complete(result)
+        return result
+
+    def _upload(self, path: Path, key: str, part_pool: ThreadPoolExecutor) -> UploadResult:
+        stat = path.stat()
+        result = UploadResult(path, key, stat.st_size)
+        try:
+            if stat.st_size <= self.multipart_threshold:
+                with open(path, "rb") as f:
+                    response = self.cos_client.put_object(Bucket=self.bucket, Key=key, Body=f)
+                result.parts = 1
+                result.etag = response.get("ETag")
+            else:
+                self._upload_multipart(path, key, stat, part_pool, result)
+        except Exception as e:
+            result.error = str(e)
+            logger.warning("Upload of %s to %s failed: %s", path, key, e)
+        return result
+
+    def _upload_multipart(
+        self,
+        path: Path,
+        key: str,
+        stat: os.stat_result,
+        part_pool: ThreadPoolExecutor,
+        result: UploadResult,
+    ) -> None:
+        part_count = -(-stat.st_size // self.part_size)
+        state = self._resume_state(key, stat)
+        if state is None:
+            response = self.cos_client.create_multipart_upload(Bucket=self.bucket, Key=key)
+            state = {
+                "bucket": self.bucket,
+                "key": key,
+                "upload_id": response["UploadId"],
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "part_size": self.part_size,
+                "parts": {},
+            }
+            self._write_state(key, state)
+
+        done: dict[str, str] = state["parts"]
+        result.parts = part_count
+        result.resumed_parts = len(done)
+        futures: list[Future[None]] = [
+            part_pool.submit(self._upload_part, path, key, state, number)
+            for number in range(1, part_count + 1)
+            if str(number) not in done
+        ]
+        for future in futures:
+            future.result()
+
+        parts = [{"PartNumber": n, "ETag": done[str(n)]} for n in range(1, part_count + 1)]
+        response = self.cos_client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=state["upload_id"],
+            MultipartUpload={"Parts": parts},
+        )
+        result.etag = response.get("ETag")
+        self._state_path(key).unlink(missing_ok=True)
+
+    def _upload_part(self, path: Path, key: str, state: dict[str, Any], number: int) -> None:
+        # Each worker reads only its own part, bounding memory to max_workers parts.
+        with open(path, "rb") as f:
+            f.seek((number - 1) * self.part_size)
+            body = f.read(self.part_size)
+        response = self.cos_client.upload_part(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=state["upload_id"],
+            PartNumber=number,
+            Body=body,
+        )
+        with self._state_lock:
+            state["parts"][str(number)] = response["ETag"]
+            self._write_state(key, state)
+
+    def _resume_state(self, key: str, stat: os.stat_result) -> dict[str, Any] | None:
+        """Return checkpointed state if it matches the file and COS still has the upload."""
+        state = self._read_state(key)
+        if state is None:
+            return None
+        if (state["size"], state["mtime_ns"], state["part_size"], state["bucket"]) != (
+            stat.st_size,
+            stat.st_mtime_ns,
+            self.part_size,
+            self.bucket,
+        ):
+            logger.info("Discarding stale upload checkpoint for %s", key)
+            return None
+        try:
+            state["parts"] = self._list_parts(key, state["upload_id"])
+        except Exception as e:
+            logger.info("Upload %s for %s is gone (%s); starting over", state["upload_id"], key, e)
+            return None
+        return state
+
+    def _list_parts(self, key: str, upload_id: str) -> dict[str, str]:
+        parts: dict[str, str] = {}
+        kwargs: dict[str, Any] = {"Bucket": self.bucket, "Key": key, "UploadId": upload_id}
+        while True:
+            response = self.cos_client.list_parts(**kwargs)
+            for part in response.get("Parts", []):
+                parts[str(part["PartNumber"])] = part["ETag"]
+            if not response.get("IsTruncated"):
+                return parts
+            kwargs["PartNumberMarker"] = response["NextPartNumberMarker"]
+
+    def _state_path(self, key: str) -> Path:
+        digest = hashlib.sha256(f"{self.bucket}/{key}".encode()).hexdigest()[:32]
+        return self.state_dir / f"{digest}.json"
+
+    def _read_state(self, key: str) -> dict[str, Any] | None:
+        path = self._state_path(key)
+        try:
+            state: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        return state
+
+    def _write_state(self, key: str, state: dict[str, Any]) -> None:
+        path = self._state_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, path)
@@ -0,0 +1,229 @@
+"""Asyncio tracker multiplexing status polls for text extraction jobs.
+
+One event loop task polls every in-flight job instead of each job sleeping in
+its own fixed-interval loop. Poll timing adapts to observed job durations: a
+new job is first checked around the time a typical job finishes, and jobs that
+run long are re-checked with exponential backoff. Each tracked job exposes an
+``asyncio.Future`` resolving to its final status.
+"""
+
+import asyncio
+import contextlib
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from src.integrations.text_extraction import TERMINAL_STATES, get_job_status
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionJobError(Exception):
+    """Raised through a job's future when it ends in a non-completed state."""
+
+    def __init__(self, job_id: str, state: str, failure: Any = None) -> None:
+        super().__init__(f"Job {job_id} {state}: {failure or 'no details'}")
+        self.job_id = job_id
+        self.state = state
+        self.failure = failure
+
+
+def percentile(values: Iterable[float], q: float) -> float | None:
+    """Linearly interpolated percentile (``q`` in [0, 1]) or None when empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * q
+    lower, upper = math.floor(position), math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+@dataclass
+class _TrackedJob:
+    job_id: str
+    future: "asyncio.Future[dict[str, Any]]"
+    started_at: float
+    next_poll_at: float
+    state: str = "submitted"
+    polls: int = 0
+    overdue_polls: int = 0
+    errors: int = 0
+
+
+class ExtractionJobTracker:
+    """Poll all in-flight extraction jobs from a single event loop task.
+
+    ``track()`` must be called from a running event loop. Status lookups use the
+    synchronous SDK client, so they run in worker threads and are issued
+    concurrently for every job that is due.
+    """
+
+    def __init__(
+        self,
+        extraction_client: Any,
+        min_interval: float = 1.0,
+        max_interval: float = 15.0,
+        backoff: float = 1.5,
+        timeout: float = 900.0,
+        seed_durations: Iterable[float] = (),
+        history_size: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if min_interval > max_interval:
+            raise ValueError("min_interval must not exceed max_interval")
+        self.extraction_client = extraction_client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.clock = clock
+        self.poll_count = 0
+        self._durations: deque[float] = deque(seed_durations, maxlen=history_size)
+        self._jobs: dict[str, _TrackedJob] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._poller: asyncio.Task[None] | None = None
+
+    def track(
+        self,
+        job_id: str,
+        callback: Callable[["asyncio.Future[dict[str, Any]]"], None] | None = None,
+    ) -> "asyncio.Future[dict[str, Any]]":
+        """Start tracking a submitted job and return a future for its final status.
+
+        The future resolves to the job's ``entity.status`` block on completion,
+        or raises ``ExtractionJobError`` / ``TimeoutError``.
+        """
+        if job_id in self._jobs:
+            return self._jobs[job_id].future
+
+        loop = asyncio.get_running_loop()
+        now = self.clock()
+        future: asyncio.Future[dict[str, Any]] = loop.create_future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        job = _TrackedJob(job_id, future, started_at=now, next_poll_at=now)
+        job.next_poll_at = now + self._next_delay(job, now)
+        self._jobs[job_id] = job
+
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._poller is None or self._poller.done():
+            self._poller = loop.create_task(self._poll_loop())
+        return future
+
+    async def wait(self, job_id: str) -> dict[str, Any]:
+        """Track a job and wait for its final status."""
+        return await self.track(job_id)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of jobs still being polled."""
+        return len(self._jobs)
+
+    @property
+    def durations(self) -> list[float]:
+        """Recently observed submit-to-completion times, in seconds."""
+        return list(self._durations)
+
+    def latency_stats(self) -> dict[str, float | int | None]:
+        """Time-to-completion statistics over the recent completed jobs."""
+        durations = self.durations
+        return {
+            "count": len(durations),
+            "p50": percentile(durations, 0.50),
+            "p95": percentile(durations, 0.95),
+            "max": max(durations, default=None),
+        }
+
+    async def aclose(self) -> None:
+        """Stop polling and cancel futures of jobs that are still in flight."""
+        for job in self._jobs.values():
+            job.future.cancel()
+        self._jobs.clear()
+        if self._poller is not None:
+            self._poller.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._poller
+            self._poller = None
+
+    def _next_delay(self, job: _TrackedJob, now: float) -> float:
+        """Seconds until the next status check for ``job``.
+
+        Before any job has finished this is plain exponential backoff. Once
+        durations are known, a job is left alone until it reaches the median
+        duration, then re-checked with backoff from the minimum interval.
+        """
+        elapsed = now - job.started_at
+        expected = percentile(self._durations, 0.50)
+        if expected is not None and elapsed < expected:
+            delay = expected - elapsed
+        else:
+            attempts = job.overdue_polls if expected is not None else job.polls
+            delay = self.min_interval * self.backoff**attempts
+        return min(self.max_interval, max(self.min_interval, delay))
+
+    async def _poll_loop(self) -> None:
+        assert self._wakeup is not None
+        while self._jobs:
+            now = self.clock()
+            due = [job for job in self._jobs.values() if job.next_poll_at <= now]
+            if not due:
+                wake_at = min(job.next_poll_at for job in self._jobs.values())
+                self._wakeup.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wake_at - now)
+                continue
+
+            results = await asyncio.gather(
+                *(
+                    asyncio.to_thread(get_job_status, self.extraction_client, job.job_id)
+                    for job in due
+                ),
+                return_exceptions=True,
+            )
+            self.poll_count += len(due)
+            now = self.clock()
+            for job, result in zip(due, results, strict=True):
+                if job.future.done():
+                    self._jobs.pop(job.job_id, None)
+                else:
+                    self._handle(job, result, now)
+
+    def _handle(self, job: _TrackedJob, result: dict[str, Any] | BaseException, now: float) -> None:
+        job.polls += 1
+        if isinstance(result, BaseException):
+            job.errors += 1
+            logger.warning("Status check for job %s failed: %s", job.job_id, result)
+        else:
+            job.state = result["state"]
+            if job.state == "completed":
+                self._durations.append(now - job.started_at)
+                self._resolve(job, result)
+                return
+            if job.state in TERMINAL_STATES:
+                self._resolve(job, ExtractionJobError(job.job_id, job.state, result.get("failure")))
+                return
+
+        if now - job.started_at > self.timeout:
+            self._resolve(
+                job, TimeoutError(f"Job {job.job_id} timed out after {self.timeout:.0f}s")
+            )
+            return
+        expected = percentile(self._durations, 0.50)
+        if expected is not None and now - job.started_at >= expected:
+            job.overdue_polls += 1
+        job.next_poll_at = now + self._next_delay(job, now)
+
+    def _resolve(self, job: _TrackedJob, outcome: dict[str, Any] | BaseException) -> None:
+        self._jobs.pop(job.job_id, None)
+        if job.future.done():
+            return
+        if isinstance(outcome, BaseException):
+            job.future.set_exception(outcome)
+        else:
+            job.future.set_result(outcome)
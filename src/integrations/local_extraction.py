@@ -0,0 +1,259 @@
+"""Local PyMuPDF extraction with watsonx fallback for pages that need OCR.
+
+Born-digital PDFs (most EEFF filings) carry a clean text layer that PyMuPDF
+reads in milliseconds. Each page is scored on how usable its text layer is;
+pages above ``min_quality`` are converted to markdown locally (text blocks plus
+tables found by ``Page.find_tables``). Only the remaining pages are copied into
+small sub-PDFs, one per contiguous run, and sent to a remote extractor such as
+``BatchRemoteExtractor``. Local and remote markdown are merged in page order.
+"""
+
+import logging
+import tempfile
+import unicodedata
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pymupdf
+
+from src.utils.extraction_cache import sha256_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_QUALITY = 0.6
+DEFAULT_MIN_CHARS = 40
+DEFAULT_OCR_PREFIX = "ocr_pages/"
+
+# Letters, digits, punctuation and math/currency symbols; excludes U+FFFD (So),
+# private-use (Co) and control (Cc) code points left by broken font encodings.
+_VALID_CATEGORIES = frozenset(
+    ["Lu", "Ll", "Lt", "Lm", "Lo", "Nd", "Nl", "No", "Pc", "Pd", "Ps", "Pe", "Pi", "Pf", "Po"]
+    + ["Sm", "Sc", "Sk"]
+)
+
+# Takes sub-PDF paths and returns their markdown, or None where extraction failed.
+RemoteExtractor = Callable[[Sequence[Path]], list[str | None]]
+
+
+@dataclass
+class PageExtraction:
+    """Markdown and text-layer assessment of one page (``number`` is 1-based)."""
+
+    number: int
+    markdown: str
+    score: float
+    needs_ocr: bool
+    source: str = "local"
+
+
+@dataclass
+class LocalExtractionResult:
+    """Merged markdown for one PDF and where each page came from."""
+
+    path: Path
+    pages: list[PageExtraction]
+    markdown: str = ""
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def remote_pages(self) -> list[int]:
+        """Pages whose markdown came from the remote extractor."""
+        return [page.number for page in self.pages if page.source == "remote"]
+
+    @property
+    def local_ratio(self) -> float:
+        """Fraction of pages that never left the machine."""
+        if not self.pages:
+            return 1.0
+        return 1 - len(self.remote_pages) / len(self.pages)
+
+
+def text_quality(
+    text: str, image_coverage: float = 0.0, min_chars: int = DEFAULT_MIN_CHARS
+) -> float:
+    """Score a page's text layer from 0 (unusable) to 1 (clean).
+
+    Combines text density (characters relative to ``min_chars``) with the share
+    of well-formed glyphs; replacement characters and private-use or control
+    code points, typical of broken font encodings, count against it. A page
+    mostly covered by images with little text is treated as a scan.
+    """
+    stripped = "".join(text.split())
+    if not stripped:
+        return 0.0
+    valid = sum(1 for ch in stripped if unicodedata.category(ch) in _VALID_CATEGORIES)
+    score = (valid / len(stripped)) * min(1.0, len(stripped) / min_chars)
+    if image_coverage > 0.5 and len(stripped) < 10 * min_chars:
+        score = min(score, 1.0 - image_coverage)
+    return score
+
+
+def image_coverage(page: Any) -> float:
+    """Fraction of the page area covered by images, capped at 1."""
+    page_area = abs(page.rect)
+    if not page_area:
+        return 0.0
+    covered = sum(abs(pymupdf.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+    return float(min(1.0, covered / page_area))
+
+
+def page_markdown(page: Any, tables: bool = True) -> str:
+    """Markdown for a page's text layer, with tables rendered as pipe tables."""
+    items: list[tuple[float, float, str]] = []
+    table_boxes = []
+    if tables:
+        for table in page.find_tables().tables:
+            box = pymupdf.Rect(table.bbox)
+            table_boxes.append(box)
+            items.append((box.y0, box.x0, table.to_markdown().strip()))
+    for x0, y0, x1, y1, text, _, block_type in page.get_text("blocks"):
+        if block_type != 0:
+            continue
+        center = pymupdf.Point((x0 + x1) / 2, (y0 + y1) / 2)
+        if any(center in box for box in table_boxes):
+            continue
+        paragraph = " ".join(text.split())
+        if paragraph:
+            items.append((y0, x0, paragraph))
+    items.sort(key=lambda item: (round(item[0], 1), item[1]))
+    return "\n\n".join(text for _, _, text in items)
+
+
+def write_page_range(pdf_path: Path, pages: tuple[int, int], target: Path) -> Path:
+    """Copy 1-based inclusive ``pages`` of ``pdf_path`` into a new PDF at ``target``.
+
+    The file ID is not regenerated, so identical ranges produce identical bytes
+    and hit the extraction cache.
+    """
+    with pymupdf.open(pdf_path) as source, pymupdf.open() as sub:
+        sub.insert_pdf(source, from_page=pages[0] - 1, to_page=pages[1] - 1)
+        sub.save(target, garbage=3, no_new_id=True)
+    return target
+
+
+def ocr_runs(pages: Iterable[PageExtraction]) -> list[tuple[int, int]]:
+    """Group pages that need OCR into contiguous ``(first, last)`` runs."""
+    runs: list[tuple[int, int]] = []
+    for page in pages:
+        if not page.needs_ocr:
+            continue
+        if runs and runs[-1][1] == page.number - 1:
+            runs[-1] = (runs[-1][0], page.number)
+        else:
+            runs.append((page.number, page.number))
+    return runs
+
+
+class LocalExtractor:
+    """Extract PDFs locally, falling back to a remote extractor page run by page run.
+
+    Without a ``remote`` extractor, low-quality pages keep whatever local text
+    they have and stay flagged ``needs_ocr``.
+    """
+
+    def __init__(
+        self,
+        remote: RemoteExtractor | None = None,
+        min_quality: float = DEFAULT_MIN_QUALITY,
+        min_chars: int = DEFAULT_MIN_CHARS,
+        tables: bool = True,
+        page_markers: bool = False,
+        work_dir: Path | None = None,
+    ) -> None:
+        self.remote = remote
+        self.min_quality = min_quality
+        self.min_chars = min_chars
+        self.tables = tables
+        self.page_markers = page_markers
+        self.work_dir = work_dir
+
+    def analyze(self, pdf_path: Path) -> list[PageExtraction]:
+        """Score and locally extract every page of ``pdf_path``."""
+        pages = []
+        with pymupdf.open(pdf_path) as doc:
+            for page in doc:
+                score = text_quality(page.get_text(), image_coverage(page), self.min_chars)
+                needs_ocr = score < self.min_quality
+                markdown = page_markdown(page, tables=self.tables and not needs_ocr)
+                pages.append(PageExtraction(page.number + 1, markdown, score, needs_ocr))
+        return pages
+
+    def extract(self, pdf_path: Path) -> LocalExtractionResult:
+        """Extract one PDF; see ``extract_many``."""
+        return self.extract_many([pdf_path])[0]
+
+    def extract_many(self, pdf_paths: Iterable[Path]) -> list[LocalExtractionResult]:
+        """Extract several PDFs, sending all of their OCR runs in one remote batch."""
+        results = [
+            LocalExtractionResult(Path(path), self.analyze(Path(path))) for path in pdf_paths
+        ]
+        runs = [(result, run) for result in results for run in ocr_runs(result.pages)]
+
+        if runs and self.remote is not None:
+            with tempfile.TemporaryDirectory(dir=self.work_dir) as tmp:
+                sub_pdfs = [
+                    write_page_range(
+                        result.path,
+                        run,
+                        Path(tmp) / f"{i:04d}_{result.path.stem}_p{run[0]}-{run[1]}.pdf",
+                    )
+                    for i, (result, run) in enumerate(runs)
+                ]
+                try:
+                    remote_markdown = self.remote(sub_pdfs)
+                except Exception as e:
+                    logger.warning("Remote extraction of %d page run(s) failed: %s", len(runs), e)
+                    remote_markdown = [None] * len(runs)
+            for (result, (first, last)), markdown in zip(runs, remote_markdown, strict=True):
+                if markdown is None:
+                    result.errors.append(f"pages {first}-{last}: remote extraction failed")
+                    continue
+                run_pages = result.pages[first - 1 : last]
+                # The whole run's markdown is attached to its first page.
+                for page in run_pages:
+                    page.markdown, page.source, page.needs_ocr = "", "remote", False
+                run_pages[0].markdown = markdown.strip()
+
+        for result in results:
+            result.markdown = self.merge(result.pages)
+        return results
+
+    def merge(self, pages: Sequence[PageExtraction]) -> str:
+        """Join page markdown in page order."""
+        parts = []
+        for page in pages:
+            if self.page_markers:
+                parts.append(f"<!-- page {page.number} -->")
+            if page.markdown:
+                parts.append(page.markdown)
+        return "\n\n".join(parts) + "\n" if parts else ""
+
+
+class BatchRemoteExtractor:
+    """Remote extractor that runs sub-PDFs through a ``BatchExtractionRunner``.
+
+    Each sub-PDF is extracted as its own job under ``prefix`` (uploaded only on a
+    cache miss), so the runner's concurrency cap, job tracking and cache all apply.
+    Keys are ``<prefix><sha256[:16]>/p<first>-<last>.pdf``: sub-PDFs of
+    different documents or concurrent runs never share a key just because
+    their names match.
+    """
+
+    def __init__(self, runner: Any, prefix: str = DEFAULT_OCR_PREFIX) -> None:
+        self.runner = runner
+        self.prefix = prefix
+
+    def key(self, path: Path) -> str:
+        # LocalExtractor names sub-PDFs ``NNNN_<stem>_p<first>-<last>.pdf``.
+        page_range = path.name.rsplit("_", 1)[-1]
+        return f"{self.prefix}{sha256_file(path)[:16]}/{page_range}"
+
+    def __call__(self, pdf_paths: Sequence[Path]) -> list[str | None]:
+        sources = {self.key(path): path for path in pdf_paths}
+        tasks = self.runner.run(list(sources), sources, upload=True)
+        return [
+            task.local_path.read_text(encoding="utf-8") if task.succeeded else None
+            for task in tasks
+        ]
@@ -0,0 +1,253 @@
+"""Chilean RUT validation with local check digits and batched, cached lookups.
+
+The compliance check validates a supplier RUT on every contract. The
+registry lookup behind it is a paid third-party service in production (there
+is no public SII API, see ARCHITECTURE.md), so ``RUTValidator`` keeps calls to
+a minimum:
+
+1. The mod-11 check digit is verified locally; malformed RUTs never reach the
+   network.
+2. Results are cached with a TTL; "not found" answers are cached too, with a
+   shorter TTL.
+3. Concurrent requests for the same RUT share one pending lookup.
+4. Lookups arriving within ``batch_delay`` are sent as one batch call.
+"""
+
+import asyncio
+import functools
+import logging
+import re
+import time
+from collections.abc import Awaitable, Callable, Iterable, Mapping, Sequence
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# A batch lookup maps canonical RUTs to registry records; absent RUTs were not found.
+RUTLookup = Callable[[Sequence[str]], Awaitable[Mapping[str, dict[str, Any]]]]
+
+# Test registry from ARCHITECTURE.md. "10.123.456-K" is listed there but its
+# check digit should be 8, so local validation rejects it before any lookup.
+DEMO_REGISTRY: dict[str, dict[str, Any]] = {
+    "12.345.678-5": {"name": "Cocoa Import Ltd", "status": "active"},
+    "10.123.456-K": {"name": "Ghana Supply Corp", "status": "active"},
+}
+
+_RUT_PATTERN = re.compile(r"^(\d{1,3}(?:\.?\d{3})*)-?([\dkK])$")
+
+
+def check_digit(body: int) -> str:
+    """Mod-11 check digit (``0``-``9`` or ``K``) for a RUT body."""
+    total, factor = 0, 2
+    while body:
+        body, digit = divmod(body, 10)
+        total += digit * factor
+        factor = factor + 1 if factor < 7 else 2
+    remainder = 11 - total % 11
+    return {11: "0", 10: "K"}.get(remainder, str(remainder))
+
+
+def parse_rut(rut: str) -> tuple[int, str] | None:
+    """(body, check digit) of a RUT in any usual format, or None if malformed."""
+    match = _RUT_PATTERN.match(rut.strip().replace(" ", ""))
+    if match is None:
+        return None
+    return int(match.group(1).replace(".", "")), match.group(2).upper()
+
+
+def format_rut(body: int, digit: str) -> str:
+    """Canonical ``12.345.678-5`` form."""
+    return f"{body:,}".replace(",", ".") + f"-{digit}"
+
+
+def validate_rut_format(rut: str) -> tuple[str | None, str | None]:
+    """(canonical RUT, error); exactly one of them is None."""
+    parsed = parse_rut(rut)
+    if parsed is None:
+        return None, "malformed RUT"
+    body, digit = parsed
+    if check_digit(body) != digit:
+        return None, "invalid check digit"
+    return format_rut(body, digit), None
+
+
+def is_valid_rut(rut: str) -> bool:
+    """Whether ``rut`` is well formed with a correct check digit."""
+    return validate_rut_format(rut)[1] is None
+
+
+async def demo_lookup(ruts: Sequence[str]) -> dict[str, dict[str, Any]]:
+    """Batch lookup against ``DEMO_REGISTRY``."""
+    return {rut: DEMO_REGISTRY[rut] for rut in ruts if rut in DEMO_REGISTRY}
+
+
+class RUTValidator:
+    """Validate RUTs locally, then against a registry with caching and batching.
+
+    Results have the shape of ``ChileanGovernmentAPI.validate_rut``:
+    ``{"valid": True, "rut": ..., "data": {...}}`` or
+    ``{"valid": False, "rut": ..., "error": ...}``. Lookup failures raise and
+    are not cached.
+    """
+
+    def __init__(
+        self,
+        lookup: RUTLookup = demo_lookup,
+        ttl: float = 24 * 3600.0,
+        negative_ttl: float = 3600.0,
+        batch_size: int = 50,
+        batch_delay: float = 0.01,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        self.lookup = lookup
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.clock = clock
+        self.lookup_calls = 0
+        self.looked_up = 0
+        self.cache_hits = 0
+        self._cache: dict[str, tuple[float, dict[str, Any]]] = {}
+        # Pending lookups belong to the loop they were queued on; see _bind_loop.
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self._waiters: dict[str, int] = {}
+        self._queue: list[str] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def validate(self, rut: str) -> dict[str, Any]:
+        """Validate one RUT."""
+        canonical, error = validate_rut_format(rut)
+        if canonical is None:
+            return {"valid": False, "rut": rut, "error": error}
+        cached = self._cache.get(canonical)
+        if cached is not None:
+            expires, result = cached
+            if expires > self.clock():
+                self.cache_hits += 1
+                return dict(result)
+            del self._cache[canonical]
+        loop = self._bind_loop()
+        future = self._pending.get(canonical)
+        if future is None:
+            future = loop.create_future()
+            self._pending[canonical] = future
+            self._enqueue(canonical)
+        self._waiters[canonical] = self._waiters.get(canonical, 0) + 1
+        try:
+            return dict(await asyncio.shield(future))
+        finally:
+            self._leave(canonical, future)
+
+    async def validate_many(self, ruts: Iterable[str]) -> list[dict[str, Any]]:
+        """Validate several RUTs; lookups needed for them go out in shared batches."""
+        return list(await asyncio.gather(*(self.validate(rut) for rut in ruts)))
+
+    def invalidate(self, rut: str | None = None) -> None:
+        """Drop one cached result, or all of them."""
+        if rut is None:
+            self._cache.clear()
+            return
+        canonical, _ = validate_rut_format(rut)
+        self._cache.pop(canonical or rut, None)
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, dropping lookup state left behind by a previous loop.
+
+        Callers such as ``GuardrailsEngine.validate_sync`` run every call in a
+        fresh ``asyncio.run`` loop; futures and timers of a closed loop can
+        never complete.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if self._pending or self._queue:
+                logger.debug("Dropping %d RUT lookups of a previous loop", len(self._pending))
+            self._loop = loop
+            self._pending, self._waiters, self._queue = {}, {}, []
+            self._flush_handle = None
+            self._tasks = set()
+        return loop
+
+    def _leave(self, rut: str, future: asyncio.Future[dict[str, Any]]) -> None:
+        """Unregister a waiter; the last one to give up unqueues a lookup not yet sent."""
+        if self._pending.get(rut) is not future:
+            return
+        remaining = self._waiters.get(rut, 1) - 1
+        if remaining > 0:
+            self._waiters[rut] = remaining
+            return
+        self._waiters.pop(rut, None)
+        if future.done() or rut not in self._queue:
+            # Resolved, or already in a lookup that will resolve it.
+            return
+        self._queue.remove(rut)
+        del self._pending[rut]
+        future.cancel()
+        if not self._queue and self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _enqueue(self, rut: str) -> None:
+        self._queue.append(rut)
+        if len(self._queue) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.batch_delay, self._flush)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._queue:
+            batch, self._queue = self._queue[: self.batch_size], self._queue[self.batch_size :]
+            futures = {rut: self._pending[rut] for rut in batch}
+            task = asyncio.get_running_loop().create_task(self._lookup(futures))
+            self._tasks.add(task)
+            task.add_done_callback(functools.partial(self._lookup_done, futures))
+
+    def _lookup_done(
+        self, futures: dict[str, asyncio.Future[dict[str, Any]]], task: asyncio.Task[None]
+    ) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            # Possibly before the lookup even started: waiters must not be left on
+            # futures nobody will resolve.
+            for rut, future in futures.items():
+                self._settle(rut, future)
+                if not future.done():
+                    future.cancel()
+
+    def _settle(self, rut: str, future: asyncio.Future[dict[str, Any]]) -> None:
+        if self._pending.get(rut) is future:
+            del self._pending[rut]
+
+    async def _lookup(self, futures: dict[str, asyncio.Future[dict[str, Any]]]) -> None:
+        batch = list(futures)
+        self.lookup_calls += 1
+        self.looked_up += len(batch)
+        try:
+            records = await self.lookup(batch)
+        except Exception as e:
+            logger.warning("RUT lookup for %d RUTs failed: %s", len(batch), e)
+            for rut, future in futures.items():
+                self._settle(rut, future)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        now = self.clock()
+        for rut, future in futures.items():
+            record = records.get(rut)
+            if record is not None:
+                result = {"valid": True, "rut": rut, "data": record}
+                self._cache[rut] = (now + self.ttl, result)
+            else:
+                result = {"valid": False, "rut": rut, "error": "RUT not found"}
+                self._cache[rut] = (now + self.negative_ttl, result)
+            self._settle(rut, future)
+            if not future.done():
+                future.set_result(result)
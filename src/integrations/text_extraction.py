@@ -0,0 +1,79 @@
+"""watsonx.ai Text Extraction job helpers.
+
+Thin, client-agnostic wrappers around ``TextExtractionsV2`` job submission and
+status lookup, shared by the extraction scripts and the batch runner. Clients
+are passed in rather than created here so callers control pooling and tests can
+use stand-ins.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any
+
+# Extraction steps used across the pipeline: OCR in English and Spanish plus
+# table processing (Carozzi EEFF PDFs are bilingual and table-heavy).
+DEFAULT_STEPS: dict[str, Any] = {
+    "ocr": {"enabled": True, "languages": ["en", "es"]},
+    "table_processing": {"enabled": True},
+}
+DEFAULT_RESULTS_FORMAT = "markdown"
+
+PENDING_STATES = frozenset({"submitted", "queued", "running"})
+TERMINAL_STATES = frozenset({"completed", "failed", "canceled"})
+
+
+@dataclass(frozen=True)
+class COSConnection:
+    """Cloud Object Storage location passed to extraction jobs."""
+
+    endpoint_url: str
+    access_key_id: str
+    secret_access_key: str
+    bucket: str
+
+    @classmethod
+    def from_env(cls) -> "COSConnection":
+        """Build connection details from the ``COS_*`` environment variables."""
+        return cls(
+            endpoint_url=os.getenv("COS_ENDPOINT", ""),
+            access_key_id=os.getenv("COS_ACCESS_KEY_ID", ""),
+            secret_access_key=os.getenv("COS_SECRET_ACCESS_KEY", ""),
+            bucket=os.getenv("COS_BUCKET_NAME", ""),
+        )
+
+    def reference(self, path: str) -> dict[str, Any]:
+        """Return a ``connection_asset`` reference for an object in the bucket."""
+        return {
+            "type": "connection_asset",
+            "connection": {
+                "endpoint_url": self.endpoint_url,
+                "access_key_id": self.access_key_id,
+                "secret_access_key": self.secret_access_key,
+            },
+            "location": {"bucket": self.bucket, "path": path},
+        }
+
+
+def submit_extraction_job(
+    extraction_client: Any,
+    connection: COSConnection,
+    input_path: str,
+    output_path: str,
+    steps: dict[str, Any] | None = None,
+    results_format: str = DEFAULT_RESULTS_FORMAT,
+) -> str:
+    """Submit a text extraction job reading and writing COS, returning its job ID."""
+    job_details = extraction_client.run_job(
+        document_reference=connection.reference(input_path),
+        results_reference=connection.reference(output_path),
+        steps=steps if steps is not None else DEFAULT_STEPS,
+        results_format=results_format,
+    )
+    return str(job_details["metadata"]["id"])
+
+
+def get_job_status(extraction_client: Any, job_id: str) -> dict[str, Any]:
+    """Return the ``entity.status`` block of a job (always contains ``state``)."""
+    details = extraction_client.get_job_details(job_id)
+    status: dict[str, Any] = details["entity"]["status"]
+    return status
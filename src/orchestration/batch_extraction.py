@@ -0,0 +1,360 @@
+"""Concurrent batch runner for watsonx.ai Text Extraction jobs.
+
+Submits every input PDF as its own extraction job (bounded by a concurrency
+cap), tracks all in-flight jobs through one ``ExtractionJobTracker`` and
+downloads each result from COS as soon as its job completes. With an
+``ExtractionCache`` attached, documents already extracted with the same
+configuration are served locally and never submitted. Total wall time approaches the
+slowest job instead of the sum of all jobs.
+"""
+
+import asyncio
+import glob
+import itertools
+import logging
+import re
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+from src.integrations.cos_listing import iter_objects
+from src.integrations.cos_upload import MultipartUploader
+from src.integrations.job_tracker import ExtractionJobError, ExtractionJobTracker
+from src.integrations.text_extraction import (
+    DEFAULT_RESULTS_FORMAT,
+    DEFAULT_STEPS,
+    COSConnection,
+    submit_extraction_job,
+)
+from src.utils.extraction_cache import (
+    ExtractionCache,
+    cache_key,
+    iter_chunks,
+    sha256_file,
+    sha256_stream,
+)
+from src.utils.markdown_stream import iter_lines, tee_lines
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = Path("data/processed/extractions")
+DEFAULT_OUTPUT_PREFIX = "extractions/"
+_WILDCARD = re.compile(r"[*?[]")
+
+
+@dataclass
+class ExtractionTask:
+    """State of one document moving through the batch."""
+
+    input_key: str
+    output_key: str
+    local_path: Path
+    job_id: str | None = None
+    state: str = "pending"
+    error: str | None = None
+    submitted_at: float | None = None
+    finished_at: float | None = None
+    chars: int = 0
+    source_path: Path | None = None
+    cache_key: str | None = None
+    upload: bool = False
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the result was extracted (or served from cache) and saved locally."""
+        return self.state in ("downloaded", "cached")
+
+    @property
+    def duration(self) -> float | None:
+        """Seconds from submission to completion, if both are known."""
+        if self.submitted_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.submitted_at
+
+
+def output_key_for(input_key: str, output_prefix: str = DEFAULT_OUTPUT_PREFIX) -> str:
+    """Map ``financials/EEFF_Anual_2023.pdf`` to ``extractions/financials/EEFF_Anual_2023.md``."""
+    return output_prefix + str(PurePosixPath(input_key).with_suffix(".md"))
+
+
+def discover_cos_inputs(
+    cos_client: Any, bucket: str, prefix: str = "", suffix: str = ".pdf"
+) -> list[str]:
+    """List PDF keys under a COS prefix, across all result pages."""
+    return sorted(
+        obj["Key"]
+        for obj in iter_objects(cos_client, bucket, prefix)
+        if obj["Key"].lower().endswith(suffix)
+    )
+
+
+def discover_local_inputs(pattern: str) -> list[str]:
+    """Map local PDFs matching a glob to their COS keys.
+
+    Keys are paths relative to the glob's root (the directory before the first
+    wildcard), which is the layout of ``scripts/upload_pdfs_to_cos.py``:
+    ``data/demo/*/*.pdf`` and ``data/demo/**/*.pdf`` resolve to
+    ``financials/...`` and ``contracts/...``. When only the file name has a
+    wildcard the directory name is kept, so ``data/demo/financials/*.pdf``
+    resolves to ``financials/*.pdf`` too. Distinct files never share a key.
+    """
+    return list(local_sources(pattern))
+
+
+def local_sources(pattern: str) -> dict[str, Path]:
+    """Like ``discover_local_inputs`` but keeps each key's local file path."""
+    base = _key_base(pattern)
+    paths = sorted(Path(p) for p in glob.glob(pattern, recursive=True))
+    return {path.relative_to(base).as_posix(): path for path in paths if path.is_file()}
+
+
+def _key_base(pattern: str) -> Path:
+    """Directory that keys of files matching ``pattern`` are relative to."""
+    parts = Path(pattern).parts
+    literal = list(itertools.takewhile(lambda part: not _WILDCARD.search(part), parts))
+    if len(literal) >= len(parts) - 1:
+        # Wildcards (if any) only in the file name: keep the directory name in the key.
+        return Path(*parts[:-1]).parent
+    return Path(*literal)
+
+
+class BatchExtractionRunner:
+    """Run many extraction jobs concurrently and collect their markdown results."""
+
+    def __init__(
+        self,
+        extraction_client: Any,
+        cos_client: Any,
+        connection: COSConnection,
+        output_dir: Path = DEFAULT_OUTPUT_DIR,
+        output_prefix: str = DEFAULT_OUTPUT_PREFIX,
+        max_concurrency: int = 4,
+        min_poll_interval: float = 1.0,
+        max_poll_interval: float = 15.0,
+        timeout: float = 900.0,
+        steps: dict[str, Any] | None = None,
+        results_format: str = DEFAULT_RESULTS_FORMAT,
+        on_complete: Callable[[ExtractionTask], None] | None = None,
+        cache: ExtractionCache | None = None,
+        on_line: Callable[[ExtractionTask, str], None] | None = None,
+        uploader: MultipartUploader | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.extraction_client = extraction_client
+        self.cos_client = cos_client
+        self.connection = connection
+        self.output_dir = Path(output_dir)
+        self.output_prefix = output_prefix
+        self.max_concurrency = max_concurrency
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+        self.steps = steps
+        self.results_format = results_format
+        self.on_complete = on_complete
+        self.cache = cache
+        # Sees each result line as it is saved (streamed from COS or read from the
+        # cache), e.g. to feed a streaming parser; called from worker threads.
+        self.on_line = on_line
+        # Local sources go up in bounded-memory, resumable parts.
+        self.uploader = uploader or MultipartUploader(cos_client, connection.bucket)
+        # Completion times carry over between runs to seed the adaptive poller.
+        self.latency_history: list[float] = []
+        self.latency: dict[str, float | int | None] = {}
+
+    def plan(
+        self,
+        input_keys: Iterable[str],
+        sources: Mapping[str, Path] | None = None,
+        upload: bool = False,
+    ) -> list[ExtractionTask]:
+        """Create one task per unique input key, preserving order.
+
+        ``sources`` maps input keys to local copies of the PDFs; when present the
+        cache key is computed from the local file instead of reading it from COS.
+        With ``upload`` those local copies are written to their keys right
+        before submission, so cache hits never upload anything.
+        """
+        sources = sources or {}
+        tasks = []
+        for input_key in dict.fromkeys(input_keys):
+            output_key = output_key_for(input_key, self.output_prefix)
+            local_path = self.output_dir / PurePosixPath(input_key).with_suffix(".md")
+            tasks.append(
+                ExtractionTask(
+                    input_key,
+                    output_key,
+                    local_path,
+                    source_path=sources.get(input_key),
+                    upload=upload and input_key in sources,
+                )
+            )
+        return tasks
+
+    def run(
+        self,
+        input_keys: Iterable[str],
+        sources: Mapping[str, Path] | None = None,
+        upload: bool = False,
+    ) -> list[ExtractionTask]:
+        """Extract every input, returning tasks in input order once all have finished.
+
+        Synchronous entry point; use ``run_async`` from inside an event loop.
+        """
+        return asyncio.run(self.run_async(input_keys, sources, upload))
+
+    async def run_async(
+        self,
+        input_keys: Iterable[str],
+        sources: Mapping[str, Path] | None = None,
+        upload: bool = False,
+    ) -> list[ExtractionTask]:
+        """Async variant of ``run``."""
+        tasks = self.plan(input_keys, sources, upload)
+        tracker = ExtractionJobTracker(
+            self.extraction_client,
+            min_interval=self.min_poll_interval,
+            max_interval=self.max_poll_interval,
+            timeout=self.timeout,
+            seed_durations=self.latency_history,
+        )
+        slots = asyncio.Semaphore(self.max_concurrency)
+        try:
+            await asyncio.gather(*(self._process(task, tracker, slots) for task in tasks))
+        finally:
+            await tracker.aclose()
+            if self.cache is not None:
+                self.cache.flush()
+        self.latency_history = tracker.durations
+        self.latency = tracker.latency_stats()
+        return tasks
+
+    async def _process(
+        self, task: ExtractionTask, tracker: ExtractionJobTracker, slots: asyncio.Semaphore
+    ) -> None:
+        if self.cache is not None:
+            try:
+                task.cache_key = await asyncio.to_thread(self._cache_key, task)
+                content = await asyncio.to_thread(self.cache.get, task.cache_key)
+            except Exception as e:
+                logger.warning("Cache lookup for %s failed: %s", task.input_key, e)
+                content = None
+            if content is not None:
+                try:
+                    task.chars = await asyncio.to_thread(self._restore, task, content)
+                except Exception as e:
+                    self._finish(task, "failed", f"restoring cached result failed: {e}")
+                    return
+                self._finish(task, "cached")
+                return
+
+        # A slot is held while the job runs remotely; downloads don't count against the cap.
+        async with slots:
+            if task.upload:
+                task.state = "uploading"
+                try:
+                    await asyncio.to_thread(self._upload, task)
+                except Exception as e:
+                    self._finish(task, "failed", f"upload failed: {e}")
+                    return
+            task.state = "submitting"
+            try:
+                task.job_id = await asyncio.to_thread(self._submit, task)
+            except Exception as e:
+                self._finish(task, "failed", f"submission failed: {e}")
+                return
+            task.state = "queued"
+            task.submitted_at = time.monotonic()
+            logger.info("Submitted %s as job %s", task.input_key, task.job_id)
+
+            try:
+                await tracker.track(task.job_id)
+            except ExtractionJobError as e:
+                self._finish(task, e.state, str(e.failure or "unknown failure"))
+                return
+            except TimeoutError as e:
+                self._finish(task, "failed", str(e))
+                return
+            task.state = "completed"
+            task.finished_at = time.monotonic()
+            logger.info("Job %s (%s) completed", task.job_id, task.input_key)
+
+        try:
+            task.chars = await asyncio.to_thread(self._download, task)
+        except Exception as e:
+            self._finish(task, "failed", f"download failed: {e}")
+            return
+        if self.cache is not None and task.cache_key is not None:
+            await asyncio.to_thread(self.cache.put_file, task.cache_key, task.local_path)
+        self._finish(task, "downloaded")
+
+    def _cache_key(self, task: ExtractionTask) -> str:
+        """Hash the source PDF: locally if available, else streamed from COS.
+
+        A COS object is only streamed when the cache has no digest for its
+        current ETag and size, which one ``head_object`` call tells.
+        """
+        assert self.cache is not None
+        if task.source_path is not None:
+            pdf_sha256 = sha256_file(task.source_path)
+        else:
+            bucket = self.connection.bucket
+            head = self.cos_client.head_object(Bucket=bucket, Key=task.input_key)
+            source, etag, size = f"{bucket}/{task.input_key}", head["ETag"], head["ContentLength"]
+            cached = self.cache.digest(source, etag, size)
+            if cached is None:
+                response = self.cos_client.get_object(Bucket=bucket, Key=task.input_key)
+                cached = sha256_stream(iter_chunks(response["Body"]))
+                self.cache.remember_digest(source, etag, size, cached)
+            pdf_sha256 = cached
+        steps = self.steps if self.steps is not None else DEFAULT_STEPS
+        return cache_key(pdf_sha256, steps, self.results_format)
+
+    def _upload(self, task: ExtractionTask) -> None:
+        assert task.source_path is not None
+        result = self.uploader.upload_file(task.source_path, task.input_key)
+        if not result.succeeded:
+            raise OSError(result.error)
+
+    def _submit(self, task: ExtractionTask) -> str:
+        return submit_extraction_job(
+            self.extraction_client,
+            self.connection,
+            task.input_key,
+            task.output_key,
+            steps=self.steps,
+            results_format=self.results_format,
+        )
+
+    def _download(self, task: ExtractionTask) -> int:
+        """Stream the result to disk, returning its length in characters."""
+        response = self.cos_client.get_object(Bucket=self.connection.bucket, Key=task.output_key)
+        return self._feed_lines(task, tee_lines(response["Body"], task.local_path))
+
+    def _restore(self, task: ExtractionTask, content: str) -> int:
+        """Save a cached result locally, returning its length as ``_download`` counts it."""
+        task.local_path.parent.mkdir(parents=True, exist_ok=True)
+        task.local_path.write_text(content, encoding="utf-8")
+        return self._feed_lines(task, iter_lines([content]))
+
+    def _feed_lines(self, task: ExtractionTask, lines: Iterable[str]) -> int:
+        """Pass each line to ``on_line``; count characters with one newline per line."""
+        chars = 0
+        for line in lines:
+            chars += len(line) + 1
+            if self.on_line is not None:
+                self.on_line(task, line)
+        return chars
+
+    def _finish(self, task: ExtractionTask, state: str, error: str | None = None) -> None:
+        task.state = state
+        task.error = error
+        if task.finished_at is None:
+            task.finished_at = time.monotonic()
+        if error:
+            logger.warning("Extraction of %s failed: %s", task.input_key, error)
+        if self.on_complete is not None:
+            self.on_complete(task)
@@ -0,0 +1,221 @@
+"""Incremental supplier concentration index for the risk guardrail.
+
+Keeps running spend totals per commodity and per (commodity, supplier) over
+the active contracts, updated as contracts are added, amended, removed or
+expire. A supplier's share of a commodity, with or without a proposed
+contract, is then two dictionary lookups instead of a sum over every
+contract. Expiry uses a heap with lazy deletion, so amended contracts leave
+stale entries behind that are skipped when popped.
+
+Only the contracts are persisted (JSON); totals are rebuilt on load, which
+also clears any floating-point drift from long runs of increments.
+"""
+
+import heapq
+import json
+import logging
+import math
+import os
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import asdict, dataclass, replace
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+FloatArray = NDArray[np.float64]
+
+DEFAULT_INDEX_PATH = Path("data/processed/concentration_index.json")
+
+
+@dataclass(frozen=True)
+class ActiveContract:
+    """A contract counted in the totals; ``expires`` is the first day it no longer counts."""
+
+    contract_id: str
+    commodity: str
+    supplier: str
+    amount: float
+    expires: date | None = None
+
+
+def _share(supplier_total: float, commodity_total: float) -> float:
+    return 100.0 * supplier_total / commodity_total if commodity_total > 0 else 0.0
+
+
+class ConcentrationIndex:
+    """Per-commodity and per-supplier spend totals over active contracts."""
+
+    def __init__(self, contracts: Iterable[ActiveContract] = ()) -> None:
+        self.contracts: dict[str, ActiveContract] = {}
+        self.commodity_totals: dict[str, float] = defaultdict(float)
+        self.supplier_totals: dict[tuple[str, str], float] = defaultdict(float)
+        self._expiries: list[tuple[date, str]] = []
+        for contract in contracts:
+            self.add(contract)
+
+    def __len__(self) -> int:
+        return len(self.contracts)
+
+    def add(self, contract: ActiveContract) -> None:
+        """Count a new contract."""
+        if contract.contract_id in self.contracts:
+            raise ValueError(f"contract {contract.contract_id} already indexed; use amend()")
+        self._check(contract)
+        self.contracts[contract.contract_id] = contract
+        self._apply(contract, contract.amount)
+        if contract.expires is not None:
+            heapq.heappush(self._expiries, (contract.expires, contract.contract_id))
+
+    def remove(self, contract_id: str) -> ActiveContract:
+        """Stop counting a contract (cancelled or terminated early)."""
+        contract = self.contracts.pop(contract_id)
+        self._apply(contract, -contract.amount)
+        return contract
+
+    def amend(self, contract_id: str, **changes: Any) -> ActiveContract:
+        """Change fields of a counted contract (amount, supplier, commodity, expires)."""
+        amended = replace(self.contracts[contract_id], **changes)
+        # Validate before removing, so a rejected amendment keeps the old contract counted.
+        self._check(amended)
+        self.remove(contract_id)
+        self.add(amended)
+        return amended
+
+    def expire(self, as_of: date) -> list[ActiveContract]:
+        """Remove contracts whose expiry is on or before ``as_of``."""
+        expired = []
+        while self._expiries and self._expiries[0][0] <= as_of:
+            expires, contract_id = heapq.heappop(self._expiries)
+            contract = self.contracts.get(contract_id)
+            # Stale entry left by an amendment or removal.
+            if contract is None or contract.expires != expires:
+                continue
+            expired.append(self.remove(contract_id))
+        return expired
+
+    def share(self, commodity: str, supplier: str) -> float:
+        """Current supplier share of the commodity's active spend, in percent."""
+        return _share(
+            self.supplier_totals.get((commodity, supplier), 0.0),
+            self.commodity_totals.get(commodity, 0.0),
+        )
+
+    def what_if(
+        self, commodity: str, supplier: str, amount: float, replaces: str | None = None
+    ) -> float:
+        """Supplier share (%) if a contract of ``amount`` were approved.
+
+        ``replaces`` names a counted contract the new one supersedes (an
+        amendment), whose amount is taken out first.
+        """
+        supplier_total = self.supplier_totals.get((commodity, supplier), 0.0) + amount
+        commodity_total = self.commodity_totals.get(commodity, 0.0) + amount
+        old = self.contracts.get(replaces) if replaces else None
+        if old is not None and old.commodity == commodity:
+            commodity_total -= old.amount
+            if old.supplier == supplier:
+                supplier_total -= old.amount
+        return _share(supplier_total, commodity_total)
+
+    def what_if_batch(
+        self,
+        lines: Sequence[tuple[str, str, float]],
+        together: bool = False,
+    ) -> FloatArray:
+        """Shares (%) for ``(commodity, supplier, amount)`` RFQ lines.
+
+        Each line is evaluated on its own by default; with ``together`` all
+        lines are assumed awarded, so each share includes the other lines for
+        the same commodity and supplier.
+        """
+        if not lines:
+            return np.zeros(0)
+        commodities, suppliers, amounts = zip(*lines, strict=True)
+        keys = list(zip(commodities, suppliers, strict=True))
+        amount = np.asarray(amounts, dtype=np.float64)
+        supplier_total = np.array([self.supplier_totals.get(key, 0.0) for key in keys])
+        commodity_total = np.array([self.commodity_totals.get(c, 0.0) for c in commodities])
+        if together:
+            pair_ids: dict[tuple[str, str], int] = {}
+            group_ids: dict[str, int] = {}
+            pair = np.array([pair_ids.setdefault(key, len(pair_ids)) for key in keys])
+            group = np.array([group_ids.setdefault(c, len(group_ids)) for c in commodities])
+            supplier_total += np.bincount(pair, amount)[pair]
+            commodity_total += np.bincount(group, amount)[group]
+        else:
+            supplier_total += amount
+            commodity_total += amount
+        shares = np.zeros(len(lines))
+        np.divide(100.0 * supplier_total, commodity_total, out=shares, where=commodity_total > 0)
+        return shares
+
+    def share_for(self, contract: Mapping[str, Any]) -> float | None:
+        """What-if share for a guardrail contract dict, or None when it lacks the fields.
+
+        Uses ``commodity``, ``supplier_rut`` (or ``supplier``), ``value_usd`` and
+        an optional ``contract_id`` for amendments.
+        """
+        commodity = contract.get("commodity")
+        supplier = contract.get("supplier_rut") or contract.get("supplier")
+        amount = contract.get("value_usd")
+        if not commodity or not supplier or amount is None:
+            return None
+        return self.what_if(commodity, supplier, float(amount), contract.get("contract_id"))
+
+    def top_suppliers(self, commodity: str, limit: int = 3) -> list[tuple[str, float]]:
+        """Largest suppliers of a commodity with their shares (%)."""
+        suppliers = [
+            (supplier, self.share(commodity, supplier))
+            for (c, supplier) in self.supplier_totals
+            if c == commodity
+        ]
+        return sorted(suppliers, key=lambda item: -item[1])[:limit]
+
+    def save(self, path: Path = DEFAULT_INDEX_PATH) -> None:
+        """Write the active contracts to ``path`` atomically."""
+        state = [
+            {**asdict(contract), "expires": contract.expires and contract.expires.isoformat()}
+            for contract in self.contracts.values()
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(state, indent=1), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_INDEX_PATH) -> "ConcentrationIndex":
+        """Restore a saved index; a missing or unreadable file gives an empty index."""
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return cls()
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Ignoring unreadable concentration index %s: %s", path, e)
+            return cls()
+        return cls(
+            ActiveContract(
+                **{**entry, "expires": entry["expires"] and date.fromisoformat(entry["expires"])}
+            )
+            for entry in state
+        )
+
+    @staticmethod
+    def _check(contract: ActiveContract) -> None:
+        # NaN or inf would poison the running totals, and NaN passes ``< 0``.
+        if not math.isfinite(contract.amount):
+            raise ValueError(f"non-finite amount for contract {contract.contract_id}")
+        if contract.amount < 0:
+            raise ValueError(f"negative amount for contract {contract.contract_id}")
+
+    def _apply(self, contract: ActiveContract, amount: float) -> None:
+        key = (contract.commodity, contract.supplier)
+        self.commodity_totals[contract.commodity] += amount
+        self.supplier_totals[key] += amount
+        if amount < 0 and abs(self.supplier_totals[key]) < 1e-9:
+            del self.supplier_totals[key]
@@ -0,0 +1,373 @@
+"""Asyncio guardrails engine for contract validation.
+
+Runs the guardrail checks from ARCHITECTURE.md ("GUARDRAILS IMPLEMENTATION")
+concurrently, each under its own deadline. Results are collected as they
+finish; the first hard failure (``block``) cancels the checks still running, so
+a board-level block never waits for the predictive model. Every check's
+latency is recorded in the report and in rolling per-check statistics.
+
+Checks are plain callables taking the contract dict and returning a
+``CheckOutcome``. Synchronous checks run inline on the event loop, except
+those marked ``blocking`` (I/O, heavy models), which get a worker thread so
+they cannot stall the deadlines of the others. The approval tiers
+and concentration limit come from the compiled policy in ``rules.py``.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any
+
+from src.integrations.job_tracker import percentile
+from src.integrations.rut import RUTValidator, validate_rut_format
+from src.orchestration.concentration import ConcentrationIndex
+from src.orchestration.rules import BLOCK, ESCALATE, PASS, RulesEngine, default_engine
+from src.predictive.impact import predict_impact
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = "timeout"
+ERROR = "error"
+CANCELLED = "cancelled"
+
+# Most severe first; the report decision is the most severe check decision.
+DECISIONS = (BLOCK, ESCALATE, PASS)
+
+STRESS_PRICE_CHANGE_PCT = 30.0
+PREDICTIVE_ESCALATION_PP = -3.0
+
+
+@dataclass
+class CheckOutcome:
+    """What a check decided; ``approvers`` are needed to proceed when escalating."""
+
+    status: str
+    reason: str | None = None
+    approvers: tuple[str, ...] = ()
+    details: dict[str, Any] = field(default_factory=dict)
+
+
+CheckFunction = Callable[[Mapping[str, Any]], CheckOutcome | Awaitable[CheckOutcome]]
+
+
+@dataclass
+class Check:
+    """A named check with its deadline.
+
+    A check that times out or raises escalates when ``required``; optional
+    checks (like the predictive run) are recorded but do not affect the decision.
+    A synchronous check is only held to its deadline when it is ``blocking``
+    and so runs in a worker thread.
+    """
+
+    name: str
+    function: CheckFunction
+    timeout: float
+    required: bool = True
+    blocking: bool = False
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one check in one validation, with its latency."""
+
+    name: str
+    status: str
+    latency_ms: float
+    reason: str | None = None
+    approvers: tuple[str, ...] = ()
+    details: dict[str, Any] = field(default_factory=dict)
+    required: bool = True
+
+    @property
+    def decision(self) -> str:
+        """``pass``, ``escalate`` or ``block`` as far as this check is concerned."""
+        if self.status in DECISIONS:
+            return self.status
+        if self.status == CANCELLED or not self.required:
+            return PASS
+        return ESCALATE
+
+
+@dataclass
+class GuardrailReport:
+    """Results of every check and the combined decision."""
+
+    results: dict[str, CheckResult]
+    latency_ms: float
+    short_circuited: bool = False
+
+    @property
+    def decision(self) -> str:
+        """The most severe decision of any check."""
+        decisions = {result.decision for result in self.results.values()}
+        return next((d for d in DECISIONS if d in decisions), PASS)
+
+    @property
+    def approved(self) -> bool:
+        """Whether the contract can proceed without a human."""
+        return self.decision == PASS
+
+    @property
+    def approvers(self) -> list[str]:
+        """Approvers required by escalating or blocking checks, without duplicates."""
+        approvers: dict[str, None] = {}
+        for result in self.results.values():
+            if result.decision != PASS:
+                approvers.update(dict.fromkeys(result.approvers))
+        return list(approvers)
+
+    @property
+    def reasons(self) -> list[str]:
+        """Why the contract was escalated or blocked."""
+        return [
+            f"{result.name}: {result.reason or result.status}"
+            for result in self.results.values()
+            if result.decision != PASS
+        ]
+
+    def to_dict(self) -> dict[str, Any]:
+        """The ``validate_contract`` response shape, plus latencies."""
+        response: dict[str, Any] = {
+            name: {
+                "status": result.status,
+                "reason": result.reason,
+                "latency_ms": round(result.latency_ms, 3),
+                **result.details,
+            }
+            for name, result in self.results.items()
+        }
+        response["decision"] = self.decision
+        response["latency_ms"] = round(self.latency_ms, 3)
+        if not self.approved:
+            response["escalation"] = {
+                "required": True,
+                "reason": "; ".join(self.reasons),
+                "approvers": self.approvers,
+            }
+        return response
+
+
+def approval_tier(
+    value_usd: float, rules: RulesEngine | None = None
+) -> tuple[str, str, tuple[str, ...]]:
+    """(tier, status, approvers) for a contract value."""
+    match = (rules or default_engine()).evaluate_rule("approval_tier", {"value_usd": value_usd})
+    if match.band is None:
+        raise ValueError(f"invalid contract value {value_usd!r}")
+    return match.band, match.status, match.approvers
+
+
+def check_financial_threshold(
+    contract: Mapping[str, Any], rules: RulesEngine | None = None
+) -> CheckOutcome:
+    """Approval tier by contract value (``value_usd``)."""
+    match = (rules or default_engine()).evaluate_rule("approval_tier", contract)
+    return CheckOutcome(match.status, match.reason, match.approvers, {"tier": match.band})
+
+
+def check_supplier_concentration(
+    contract: Mapping[str, Any],
+    rules: RulesEngine | None = None,
+    index: ConcentrationIndex | None = None,
+) -> CheckOutcome:
+    """Supplier share of its commodity after this contract.
+
+    Uses ``supplier_share_pct`` when the contract carries it, otherwise the
+    what-if share from ``index``.
+    """
+    if index is not None and contract.get("supplier_share_pct") is None:
+        contract = {**contract, "supplier_share_pct": index.share_for(contract)}
+    match = (rules or default_engine()).evaluate_rule("supplier_concentration", contract)
+    details = {"share_pct": match.value, "band": match.band}
+    return CheckOutcome(match.status, match.reason, match.approvers, details)
+
+
+def check_compliance(contract: Mapping[str, Any]) -> CheckOutcome:
+    """Supplier identification and reported compliance violations."""
+    rut = contract.get("supplier_rut")
+    if not rut:
+        return CheckOutcome(ESCALATE, "missing supplier RUT", ("compliance_officer",))
+    _, error = validate_rut_format(rut)
+    if error:
+        return CheckOutcome(ESCALATE, f"supplier RUT {rut}: {error}", ("compliance_officer",))
+    violations = list(contract.get("compliance_violations") or [])
+    if violations:
+        reason = f"compliance violations: {', '.join(violations)}"
+        return CheckOutcome(ESCALATE, reason, ("compliance_officer",), {"violations": violations})
+    return CheckOutcome(PASS)
+
+
+async def check_supplier_registry(
+    contract: Mapping[str, Any], validator: RUTValidator
+) -> CheckOutcome:
+    """``check_compliance`` plus a registry lookup of the supplier RUT."""
+    outcome = check_compliance(contract)
+    if outcome.status != PASS:
+        return outcome
+    result = await validator.validate(contract["supplier_rut"])
+    if not result["valid"]:
+        reason = f"supplier RUT {result['rut']}: {result['error']}"
+        return CheckOutcome(ESCALATE, reason, ("compliance_officer",))
+    return CheckOutcome(PASS, details={"supplier": result["data"]})
+
+
+def check_predictive(contract: Mapping[str, Any]) -> CheckOutcome:
+    """Margin impact of a commodity price shock on the contract's commodity."""
+    commodity = contract.get("commodity")
+    if not commodity:
+        return CheckOutcome(PASS, details={"prediction": None})
+    change = float(contract.get("stress_price_change_pct", STRESS_PRICE_CHANGE_PCT))
+    try:
+        prediction = predict_impact(commodity, change)
+    except KeyError:
+        return CheckOutcome(PASS, f"no model for {commodity}", details={"prediction": None})
+    details = {"prediction": prediction, "price_change_pct": change}
+    if prediction["margin_impact_pct"] <= PREDICTIVE_ESCALATION_PP:
+        return CheckOutcome(ESCALATE, prediction["recommendation"], ("risk_committee",), details)
+    return CheckOutcome(PASS, details=details)
+
+
+def default_checks(
+    rules: RulesEngine | None = None,
+    index: ConcentrationIndex | None = None,
+    validator: RUTValidator | None = None,
+) -> list[Check]:
+    """The four guardrail checks with sub-second deadlines.
+
+    ``rules`` replaces the repository approval policy for the financial and
+    risk checks; ``index`` supplies supplier shares the contracts do not carry;
+    ``validator`` adds a registry lookup to the compliance check.
+    """
+    compliance: CheckFunction = check_compliance
+    if validator is not None:
+        compliance = partial(check_supplier_registry, validator=validator)
+    return [
+        Check("financial", partial(check_financial_threshold, rules=rules), timeout=0.1),
+        Check("risk", partial(check_supplier_concentration, rules=rules, index=index), timeout=0.2),
+        Check("compliance", compliance, timeout=0.5),
+        Check("predictive", check_predictive, timeout=0.8, required=False),
+    ]
+
+
+class GuardrailsEngine:
+    """Run guardrail checks concurrently with per-check deadlines.
+
+    ``audit`` is called with the contract and the report after every validation.
+    """
+
+    def __init__(
+        self,
+        checks: Iterable[Check] | None = None,
+        audit: Callable[[Mapping[str, Any], GuardrailReport], None] | None = None,
+        history_size: int = 256,
+    ) -> None:
+        self.checks = list(checks) if checks is not None else default_checks()
+        names = [check.name for check in self.checks]
+        if len(set(names)) != len(names):
+            raise ValueError(f"duplicate check names: {names}")
+        self.audit = audit
+        self.latencies: dict[str, deque[float]] = {
+            name: deque(maxlen=history_size) for name in names
+        }
+
+    async def validate(self, contract: Mapping[str, Any]) -> GuardrailReport:
+        """Run every check; cancel the rest as soon as one blocks."""
+        started = time.perf_counter()
+        tasks = {
+            asyncio.create_task(self._run(check, contract), name=check.name): check
+            for check in self.checks
+        }
+        results: dict[str, CheckResult] = {}
+        short_circuited = False
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    results[result.name] = result
+                    if result.decision == BLOCK and pending:
+                        short_circuited = True
+                if short_circuited:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            for task in pending:
+                check = tasks[task]
+                elapsed = (time.perf_counter() - started) * 1000
+                results[check.name] = CheckResult(
+                    check.name,
+                    CANCELLED,
+                    elapsed,
+                    "cancelled after a block",
+                    required=check.required,
+                )
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        report = GuardrailReport(
+            results={check.name: results[check.name] for check in self.checks},
+            latency_ms=(time.perf_counter() - started) * 1000,
+            short_circuited=short_circuited,
+        )
+        if self.audit is not None:
+            self.audit(contract, report)
+        return report
+
+    def validate_sync(self, contract: Mapping[str, Any]) -> GuardrailReport:
+        """Blocking wrapper around ``validate`` for callers without an event loop."""
+        return asyncio.run(self.validate(contract))
+
+    def latency_stats(self) -> dict[str, dict[str, float | int | None]]:
+        """Per-check latency statistics (ms) over recent validations."""
+        return {
+            name: {
+                "count": len(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "max": max(values, default=None),
+            }
+            for name, values in self.latencies.items()
+        }
+
+    async def _run(self, check: Check, contract: Mapping[str, Any]) -> CheckResult:
+        started = time.perf_counter()
+        try:
+            outcome = await asyncio.wait_for(self._call(check, contract), timeout=check.timeout)
+            status, reason = outcome.status, outcome.reason
+        except TimeoutError:
+            outcome, status = None, TIMEOUT
+            reason = f"no result within {check.timeout * 1000:.0f} ms"
+        except Exception as e:
+            logger.warning("Guardrail check %s failed: %s", check.name, e)
+            outcome, status, reason = None, ERROR, f"{type(e).__name__}: {e}"
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.latencies[check.name].append(latency_ms)
+        return CheckResult(
+            name=check.name,
+            status=status,
+            latency_ms=latency_ms,
+            reason=reason,
+            approvers=outcome.approvers if outcome else (),
+            details=outcome.details if outcome else {},
+            required=check.required,
+        )
+
+    @staticmethod
+    async def _call(check: Check, contract: Mapping[str, Any]) -> CheckOutcome:
+        if check.blocking:
+            result = await asyncio.to_thread(check.function, contract)
+        else:
+            result = check.function(contract)
+        if inspect.isawaitable(result):
+            result = await result
+        if not isinstance(result, CheckOutcome):
+            raise TypeError(f"check {check.name} returned {type(result).__name__}")
+        return result
@@ -0,0 +1,284 @@
+"""Compiled approval rules: policy file to interval lookups.
+
+The approval tiers and concentration limits live in a TOML policy
+(``config/approval_policy.toml``). Each rule maps one numeric contract field to
+ordered bands; compiling a rule turns the band bounds into a sorted edge array,
+with exclusive bounds nudged to the next float, so finding a band is a single
+``bisect`` for one contract or one ``np.searchsorted`` for a whole batch.
+
+Contracts the rules cannot decide (a missing field, or a band marked
+``review``) get status ``review``; only those go to the optional ``reviewer``,
+e.g. an LLM call.
+"""
+
+import bisect
+import logging
+import math
+import tomllib
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLICY_PATH = Path(__file__).resolve().parents[2] / "config" / "approval_policy.toml"
+
+PASS = "pass"
+ESCALATE = "escalate"
+BLOCK = "block"
+REVIEW = "review"
+# Least to most severe; a contract's status is its most severe rule status.
+STATUSES = (PASS, REVIEW, ESCALATE, BLOCK)
+
+Reviewer = Callable[[Mapping[str, Any], str], str]
+
+
+class PolicyError(ValueError):
+    """Raised when a policy file is malformed."""
+
+
+@dataclass(frozen=True)
+class Band:
+    """One interval of a rule and what it decides."""
+
+    name: str
+    status: str
+    approvers: tuple[str, ...] = ()
+    reason: str | None = None
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A rule's bands with the float edges where each band after the first starts."""
+
+    name: str
+    field: str
+    bands: tuple[Band, ...]
+    edges: tuple[float, ...]
+    missing: str = REVIEW
+
+    def band_index(self, value: float) -> int:
+        """Index of the band containing ``value``."""
+        return bisect.bisect_right(self.edges, value)
+
+
+@dataclass
+class RuleMatch:
+    """Result of one rule for one contract (``band`` is None when undecided)."""
+
+    rule: str
+    status: str
+    band: str | None = None
+    value: float | None = None
+    approvers: tuple[str, ...] = ()
+    reason: str | None = None
+
+
+@dataclass
+class Decision:
+    """Combined result of every rule for one contract."""
+
+    matches: dict[str, RuleMatch]
+
+    @property
+    def status(self) -> str:
+        """Most severe rule status."""
+        return max((m.status for m in self.matches.values()), key=STATUSES.index, default=PASS)
+
+    @property
+    def approvers(self) -> list[str]:
+        """Approvers of every non-passing rule, without duplicates."""
+        approvers: dict[str, None] = {}
+        for match in self.matches.values():
+            if match.status != PASS:
+                approvers.update(dict.fromkeys(match.approvers))
+        return list(approvers)
+
+    @property
+    def undecided(self) -> list[str]:
+        """Rules that need review."""
+        return [name for name, match in self.matches.items() if match.status == REVIEW]
+
+
+@dataclass
+class BatchDecision:
+    """Rule results for many contracts as arrays (band -1 when undecided)."""
+
+    bands: dict[str, NDArray[np.intp]]
+    status_codes: NDArray[np.intp]
+    band_names: dict[str, tuple[str, ...]] = field(default_factory=dict)
+
+    @property
+    def statuses(self) -> NDArray[np.str_]:
+        """Status per contract."""
+        return np.array(STATUSES)[self.status_codes]
+
+    def band_labels(self, rule: str) -> list[str | None]:
+        """Band name per contract for one rule."""
+        names = self.band_names[rule]
+        return [names[i] if i >= 0 else None for i in self.bands[rule].tolist()]
+
+    def counts(self) -> dict[str, int]:
+        """Contracts per status."""
+        codes = np.bincount(self.status_codes, minlength=len(STATUSES))
+        return {status: int(n) for status, n in zip(STATUSES, codes, strict=True)}
+
+
+def _status(value: Any, where: str) -> str:
+    if value not in STATUSES:
+        raise PolicyError(f"{where}: unknown status {value!r}; expected one of {STATUSES}")
+    return str(value)
+
+
+def compile_rule(spec: Mapping[str, Any]) -> CompiledRule:
+    """Validate one ``[[rules]]`` table and compile its band edges."""
+    name = spec.get("name")
+    if not name or not spec.get("field"):
+        raise PolicyError(f"rule needs a name and a field: {dict(spec)}")
+    raw_bands = spec.get("bands") or []
+    if not raw_bands:
+        raise PolicyError(f"rule {name}: no bands")
+    bands: list[Band] = []
+    edges: list[float] = []
+    for i, raw in enumerate(raw_bands):
+        where = f"rule {name}, band {raw.get('name', i)}"
+        bounds = [key for key in ("from", "above") if key in raw]
+        if i == 0 and bounds:
+            raise PolicyError(f"{where}: the first band has no lower bound")
+        if i > 0:
+            if len(bounds) != 1:
+                raise PolicyError(f"{where}: needs exactly one of 'from' or 'above'")
+            bound = float(raw[bounds[0]])
+            # bisect_right puts a value equal to an edge in the band starting
+            # there, which is right for ``from``; ``above`` starts just past it.
+            edge = bound if bounds[0] == "from" else math.nextafter(bound, math.inf)
+            if edges and edge <= edges[-1]:
+                raise PolicyError(f"{where}: bounds must increase")
+            edges.append(edge)
+        bands.append(
+            Band(
+                name=str(raw.get("name", i)),
+                status=_status(raw.get("status"), where),
+                approvers=tuple(raw.get("approvers", ())),
+                reason=raw.get("reason"),
+            )
+        )
+    return CompiledRule(
+        name=str(name),
+        field=str(spec["field"]),
+        bands=tuple(bands),
+        edges=tuple(edges),
+        missing=_status(spec.get("missing", REVIEW), f"rule {name}"),
+    )
+
+
+class RulesEngine:
+    """Deterministic evaluation of a compiled policy."""
+
+    def __init__(self, rules: Sequence[CompiledRule], reviewer: Reviewer | None = None) -> None:
+        self.rules = {rule.name: rule for rule in rules}
+        if len(self.rules) != len(rules):
+            raise PolicyError("duplicate rule names")
+        self.reviewer = reviewer
+
+    @classmethod
+    def from_policy(
+        cls, policy: Mapping[str, Any], reviewer: Reviewer | None = None
+    ) -> "RulesEngine":
+        """Compile a parsed policy document."""
+        if policy.get("version") != 1:
+            raise PolicyError(f"unsupported policy version {policy.get('version')!r}")
+        return cls([compile_rule(spec) for spec in policy.get("rules", [])], reviewer)
+
+    @classmethod
+    def load(
+        cls, path: Path = DEFAULT_POLICY_PATH, reviewer: Reviewer | None = None
+    ) -> "RulesEngine":
+        """Compile a TOML policy file."""
+        with open(path, "rb") as f:
+            return cls.from_policy(tomllib.load(f), reviewer)
+
+    def evaluate_rule(self, name: str, contract: Mapping[str, Any]) -> RuleMatch:
+        """Apply one rule; undecided results go to the reviewer when there is one."""
+        rule = self.rules[name]
+        value = _to_float(contract.get(rule.field))
+        if math.isnan(value):
+            match = RuleMatch(rule.name, rule.missing, reason=f"{rule.field} not available")
+        else:
+            band = rule.bands[rule.band_index(value)]
+            reason = band.reason.format(value=value) if band.reason else None
+            match = RuleMatch(rule.name, band.status, band.name, value, band.approvers, reason)
+        if match.status == REVIEW and self.reviewer is not None:
+            match.status = _status(self.reviewer(contract, rule.name), f"reviewer for {rule.name}")
+            match.reason = f"{match.reason or rule.name}; decided by reviewer"
+        return match
+
+    def evaluate(self, contract: Mapping[str, Any]) -> Decision:
+        """Apply every rule to one contract."""
+        return Decision({name: self.evaluate_rule(name, contract) for name in self.rules})
+
+    def evaluate_batch(
+        self, contracts: Sequence[Mapping[str, Any]] | Mapping[str, ArrayLike]
+    ) -> BatchDecision:
+        """Apply every rule to many contracts at once (no reviewer calls).
+
+        ``contracts`` is a list of contract dicts or a mapping of field name to
+        column array; missing and non-numeric values are NaN, as in ``evaluate``.
+        """
+        columns = self._columns(contracts)
+        size = len(next(iter(columns.values()))) if columns else len(contracts)
+        status_codes = np.zeros(size, dtype=np.intp)
+        bands: dict[str, NDArray[np.intp]] = {}
+        for rule in self.rules.values():
+            values = columns.get(rule.field, np.full(size, np.nan))
+            index = np.searchsorted(np.asarray(rule.edges), values, side="right")
+            missing = np.isnan(values)
+            band_status = np.array([STATUSES.index(b.status) for b in rule.bands])
+            codes = np.where(
+                missing,
+                STATUSES.index(rule.missing),
+                band_status[np.minimum(index, len(rule.bands) - 1)],
+            )
+            bands[rule.name] = np.where(missing, -1, index)
+            status_codes = np.maximum(status_codes, codes)
+        names = {rule.name: tuple(b.name for b in rule.bands) for rule in self.rules.values()}
+        return BatchDecision(bands, status_codes, names)
+
+    def _columns(
+        self, contracts: Sequence[Mapping[str, Any]] | Mapping[str, ArrayLike]
+    ) -> dict[str, NDArray[np.float64]]:
+        fields = {rule.field for rule in self.rules.values()}
+        if isinstance(contracts, Mapping):
+            return {f: _float_column(contracts[f]) for f in fields if f in contracts}
+        return {f: _float_column([c.get(f) for c in contracts]) for f in fields}
+
+
+def _to_float(raw: Any) -> float:
+    """``raw`` as a float; NaN when it is missing or not a number."""
+    try:
+        return float(raw) if raw is not None else math.nan
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _float_column(values: ArrayLike | Sequence[Any]) -> NDArray[np.float64]:
+    """Values as a float array, converting element by element only when needed."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([_to_float(v) for v in np.asarray(values, dtype=object).ravel()])
+
+
+_DEFAULT_ENGINE: RulesEngine | None = None
+
+
+def default_engine() -> RulesEngine:
+    """Engine for the repository policy file, compiled once."""
+    global _DEFAULT_ENGINE
+    if _DEFAULT_ENGINE is None:
+        _DEFAULT_ENGINE = RulesEngine.load()
+    return _DEFAULT_ENGINE
@@ -0,0 +1,233 @@
+"""Page-range sharding of large PDFs for parallel extraction.
+
+A long document (e.g. a 100-page licitación) submitted as one extraction job
+takes as long as the service needs for every page in sequence. Splitting it
+into page-range shards and running those as independent jobs through
+``BatchExtractionRunner`` bounds latency by the slowest shard instead. Shard
+markdown is reassembled in page order; a table cut by a shard boundary is
+stitched back into a single table.
+"""
+
+import logging
+import re
+import tempfile
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+
+import pymupdf
+
+from src.integrations.local_extraction import write_page_range
+from src.orchestration.batch_extraction import BatchExtractionRunner, ExtractionTask
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGES_PER_SHARD = 10
+DEFAULT_MIN_PAGES_TO_SHARD = 20
+DEFAULT_SHARD_PREFIX = "shards/"
+
+_SEPARATOR_ROW = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$")
+
+
+def shard_ranges(
+    page_count: int,
+    pages_per_shard: int = DEFAULT_PAGES_PER_SHARD,
+    min_pages_to_shard: int = DEFAULT_MIN_PAGES_TO_SHARD,
+) -> list[tuple[int, int]]:
+    """Split ``page_count`` pages into 1-based inclusive ranges of similar size."""
+    if pages_per_shard < 1:
+        raise ValueError("pages_per_shard must be at least 1")
+    if page_count < 1:
+        return []
+    if page_count < min_pages_to_shard:
+        return [(1, page_count)]
+    shard_count = -(-page_count // pages_per_shard)
+    # Spread pages evenly so the last shard is not a straggler of one or two pages.
+    base, extra = divmod(page_count, shard_count)
+    ranges, first = [], 1
+    for i in range(shard_count):
+        last = first + base + (1 if i < extra else 0) - 1
+        ranges.append((first, last))
+        first = last + 1
+    return ranges
+
+
+def _cells(row: str) -> list[str]:
+    return [cell.strip() for cell in row.strip().strip("|").split("|")]
+
+
+def _trailing_table(lines: list[str]) -> int:
+    """Index where a table at the end of ``lines`` starts, or ``len(lines)``."""
+    end = len(lines)
+    while end and not lines[end - 1].strip():
+        end -= 1
+    start = end
+    while start and lines[start - 1].lstrip().startswith("|"):
+        start -= 1
+    return start if start < end else len(lines)
+
+
+def _leading_table(lines: list[str]) -> tuple[int, int]:
+    """``(start, end)`` of a table at the beginning of ``lines``, empty if none."""
+    start = 0
+    while start < len(lines) and not lines[start].strip():
+        start += 1
+    end = start
+    while end < len(lines) and lines[end].lstrip().startswith("|"):
+        end += 1
+    return start, end
+
+
+def stitch_markdown(parts: Sequence[str]) -> str:
+    """Concatenate shard markdown, merging tables split across shard boundaries.
+
+    When one shard ends with a table and the next begins with a table of the
+    same width, the continuation's separator row is dropped, along with its
+    header row if it repeats the previous header; otherwise that row is kept as
+    data, since the service promotes the first continued row to a header.
+    """
+    merged: list[str] = []
+    for part in parts:
+        lines = part.strip("\n").splitlines()
+        if not lines:
+            continue
+        table_start = _trailing_table(merged)
+        head_start, head_end = _leading_table(lines)
+        if table_start < len(merged) and head_end - head_start >= 2:
+            previous, continued = merged[table_start:], lines[head_start:head_end]
+            if len(_cells(previous[0])) == len(_cells(continued[0])) and _SEPARATOR_ROW.match(
+                continued[1].strip()
+            ):
+                while merged and not merged[-1].strip():
+                    merged.pop()
+                rows = continued[2:]
+                if _cells(continued[0]) != _cells(previous[0]):
+                    rows.insert(0, continued[0])
+                merged.extend(rows)
+                lines = lines[head_end:]
+                while lines and not lines[0].strip():
+                    lines.pop(0)
+        if merged and lines:
+            merged.append("")
+        merged.extend(lines)
+    return "\n".join(merged).strip("\n") + "\n" if merged else ""
+
+
+@dataclass
+class ShardedDocument:
+    """A source PDF, its shards and the reassembled result."""
+
+    input_key: str
+    source_path: Path
+    local_path: Path
+    page_count: int
+    ranges: list[tuple[int, int]]
+    tasks: list[ExtractionTask] = field(default_factory=list)
+    chars: int = 0
+    error: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether every shard was extracted and the markdown was assembled."""
+        return self.error is None and bool(self.tasks) and all(t.succeeded for t in self.tasks)
+
+    @property
+    def duration(self) -> float | None:
+        """Wall time of the slowest shard job."""
+        durations = [t.duration for t in self.tasks if t.duration is not None]
+        return max(durations) if durations else None
+
+
+class ShardedExtractor:
+    """Extract local PDFs through a runner, splitting large ones into page shards.
+
+    Every shard of every document goes into one ``runner.run`` call, so all
+    shards compete for the same concurrency slots and share the job tracker.
+    Shards are uploaded under ``prefix`` only when the extraction cache misses;
+    a document that is not split runs as one job under its own input key.
+    """
+
+    def __init__(
+        self,
+        runner: BatchExtractionRunner,
+        pages_per_shard: int = DEFAULT_PAGES_PER_SHARD,
+        min_pages_to_shard: int = DEFAULT_MIN_PAGES_TO_SHARD,
+        prefix: str = DEFAULT_SHARD_PREFIX,
+        work_dir: Path | None = None,
+    ) -> None:
+        self.runner = runner
+        self.pages_per_shard = pages_per_shard
+        self.min_pages_to_shard = min_pages_to_shard
+        self.prefix = prefix
+        self.work_dir = work_dir
+
+    def plan(self, sources: Mapping[str, Path]) -> list[ShardedDocument]:
+        """Count pages and choose shard ranges for every source.
+
+        A source that cannot be opened or has no pages gets no ranges and an
+        ``error``, and is not extracted.
+        """
+        documents = []
+        for input_key, path in sources.items():
+            error = None
+            try:
+                with pymupdf.open(path) as doc:
+                    page_count = doc.page_count
+            except Exception as e:
+                page_count, error = 0, f"could not open PDF: {e}"
+            if error is None and page_count == 0:
+                error = "document has no pages"
+            local_path = self.runner.output_dir / PurePosixPath(input_key).with_suffix(".md")
+            ranges = shard_ranges(page_count, self.pages_per_shard, self.min_pages_to_shard)
+            documents.append(
+                ShardedDocument(input_key, Path(path), local_path, page_count, ranges, error=error)
+            )
+            if error:
+                logger.warning("Skipping %s: %s", input_key, error)
+        return documents
+
+    def shard_key(self, input_key: str, pages: tuple[int, int]) -> str:
+        """COS key of one shard, e.g. ``shards/licitaciones/bases/p0001-0010.pdf``."""
+        stem = PurePosixPath(input_key).with_suffix("")
+        return f"{self.prefix}{stem}/p{pages[0]:04d}-{pages[1]:04d}.pdf"
+
+    def job_key(self, document: ShardedDocument, pages: tuple[int, int]) -> str:
+        """Input key submitted for one range: the document's own key when it has one range."""
+        if len(document.ranges) == 1:
+            return document.input_key
+        return self.shard_key(document.input_key, pages)
+
+    def extract(self, sources: Mapping[str, Path]) -> list[ShardedDocument]:
+        """Extract every source and write its assembled markdown to ``local_path``."""
+        documents = self.plan(sources)
+        with tempfile.TemporaryDirectory(dir=self.work_dir) as tmp:
+            shard_sources: dict[str, Path] = {}
+            for i, document in enumerate(documents):
+                for pages in document.ranges:
+                    key = self.job_key(document, pages)
+                    if len(document.ranges) == 1:
+                        shard_sources[key] = document.source_path
+                    else:
+                        target = Path(tmp) / f"{i:04d}_p{pages[0]:04d}-{pages[1]:04d}.pdf"
+                        shard_sources[key] = write_page_range(document.source_path, pages, target)
+            tasks = {
+                task.input_key: task
+                for task in self.runner.run(list(shard_sources), shard_sources, upload=True)
+            }
+
+        for document in documents:
+            if document.error:
+                continue
+            document.tasks = [tasks[self.job_key(document, p)] for p in document.ranges]
+            failed = [t for t in document.tasks if not t.succeeded]
+            if failed:
+                document.error = "; ".join(f"{t.input_key}: {t.error}" for t in failed)
+                logger.warning("Extraction of %s failed: %s", document.input_key, document.error)
+                continue
+            markdown = stitch_markdown(
+                [t.local_path.read_text(encoding="utf-8") for t in document.tasks]
+            )
+            document.local_path.parent.mkdir(parents=True, exist_ok=True)
+            document.local_path.write_text(markdown, encoding="utf-8")
+            document.chars = len(markdown)
+        return documents
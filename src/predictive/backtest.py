@@ -0,0 +1,333 @@
+"""Rolling-origin backtesting of commodity impact models with cached folds.
+
+Every (series, model, fold) combination is an independent task: fit the model
+on the periods before the fold's origin, predict the next ``horizon`` periods
+and score them. Tasks are keyed by a SHA-256 of the model and the exact data
+slice they see, and their results are kept in a content-addressed
+``ExtractionCache``. When a new quarter lands, the earlier folds hash the same
+and come from the cache; only folds whose data changed are fitted, optionally in
+a process pool, and their results are stored with one index write per run.
+
+A fold's test range is usually a single period, where R² is undefined, so folds
+report MAE and RMSE only; ``BacktestReport.summary`` adds R² over the pooled
+out-of-sample predictions.
+"""
+
+import hashlib
+import json
+import logging
+import math
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from src.predictive.online_correlation import PairStats
+from src.utils.extraction_cache import ExtractionCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path("data/processed/backtest_cache")
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+FloatArray = NDArray[np.float64]
+
+
+@dataclass(frozen=True)
+class Model:
+    """A named model: ``fit(x, y) -> params`` and ``predict(params, x) -> y``.
+
+    Functions must be module-level so folds can be fitted in worker processes.
+    Bump ``version`` when the fitting logic changes to invalidate cached folds.
+    """
+
+    name: str
+    fit: Callable[[FloatArray, FloatArray], list[float]]
+    predict: Callable[[Sequence[float], FloatArray], FloatArray]
+    version: int = 1
+
+
+def _fit_linear(x: FloatArray, y: FloatArray) -> list[float]:
+    stats = PairStats.from_arrays(x, y)
+    return [stats.slope, stats.intercept]
+
+
+def _predict_linear(params: Sequence[float], x: FloatArray) -> FloatArray:
+    return params[0] * x + params[1]
+
+
+def _fit_through_origin(x: FloatArray, y: FloatArray) -> list[float]:
+    denominator = float(x @ x)
+    return [float(x @ y) / denominator if denominator > 0 else 0.0]
+
+
+def _predict_through_origin(params: Sequence[float], x: FloatArray) -> FloatArray:
+    return params[0] * x
+
+
+def _fit_mean(x: FloatArray, y: FloatArray) -> list[float]:  # noqa: ARG001
+    return [float(y.mean())]
+
+
+def _predict_mean(params: Sequence[float], x: FloatArray) -> FloatArray:
+    return np.full(len(x), params[0])
+
+
+MODELS = {
+    # OLS with intercept.
+    "linear": Model("linear", _fit_linear, _predict_linear),
+    # Coefficient only, the form of the hardcoded CORRELATIONS.
+    "coefficient": Model("coefficient", _fit_through_origin, _predict_through_origin),
+    # Naive baseline: the training mean of the metric.
+    "mean": Model("mean", _fit_mean, _predict_mean),
+}
+
+
+@dataclass
+class BacktestSeries:
+    """Per-period commodity price changes (``x``) and metric changes (``y``)."""
+
+    commodity: str
+    metric: str
+    periods: Sequence[str]
+    x: ArrayLike
+    y: ArrayLike
+
+    def __post_init__(self) -> None:
+        self.x = np.asarray(self.x, dtype=np.float64)
+        self.y = np.asarray(self.y, dtype=np.float64)
+        if not len(self.periods) == len(self.x) == len(self.y):
+            raise ValueError(f"{self.commodity}/{self.metric}: periods, x and y differ in length")
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Training and test index ranges of one rolling-origin fold."""
+
+    index: int
+    train: slice
+    test: slice
+
+
+def rolling_origin_folds(
+    length: int,
+    min_train: int,
+    horizon: int = 1,
+    step: int = 1,
+    window: int | None = None,
+) -> list[Fold]:
+    """Folds with origins ``min_train, min_train + step, ...``.
+
+    Training data is every earlier period (expanding) or the last ``window``
+    periods (sliding); the test range is the ``horizon`` periods after the origin.
+    """
+    if min_train < 2 or horizon < 1 or step < 1:
+        raise ValueError("min_train must be >= 2, horizon and step >= 1")
+    folds = []
+    for number, origin in enumerate(range(min_train, length - horizon + 1, step)):
+        start = max(0, origin - window) if window else 0
+        folds.append(Fold(number, slice(start, origin), slice(origin, origin + horizon)))
+    return folds
+
+
+def score(actual: ArrayLike, predicted: ArrayLike) -> dict[str, float]:
+    """MAE, RMSE and R² (NaN when the actual values have no variance)."""
+    actual = np.asarray(actual, dtype=np.float64)
+    errors = actual - np.asarray(predicted, dtype=np.float64)
+    total = float(((actual - actual.mean()) ** 2).sum())
+    return {
+        "mae": float(np.abs(errors).mean()),
+        "rmse": float(np.sqrt((errors**2).mean())),
+        "r2": 1 - float((errors**2).sum()) / total if total > 0 else math.nan,
+    }
+
+
+def fold_key(
+    model: Model, train_x: FloatArray, train_y: FloatArray, test_x: FloatArray, test_y: FloatArray
+) -> str:
+    """Cache key from the model identity and the exact data the fold sees."""
+    digest = hashlib.sha256(f"{model.name}:{model.version}".encode())
+    for array in (train_x, train_y, test_x, test_y):
+        digest.update(len(array).to_bytes(8, "little"))
+        digest.update(np.ascontiguousarray(array, dtype="<f8").tobytes())
+    return digest.hexdigest()
+
+
+def _fit_fold(
+    model: Model, train_x: FloatArray, train_y: FloatArray, test_x: FloatArray, test_y: FloatArray
+) -> dict[str, Any]:
+    """Fit and score one fold; module-level so worker processes can run it."""
+    params = [float(p) for p in model.fit(train_x, train_y)]
+    predictions = model.predict(params, test_x)
+    scores = score(test_y, predictions)
+    return {
+        "params": params,
+        "predictions": [float(p) for p in predictions],
+        "mae": scores["mae"],
+        "rmse": scores["rmse"],
+    }
+
+
+@dataclass
+class FoldResult:
+    """Fitted parameters and out-of-sample errors of one fold."""
+
+    commodity: str
+    metric: str
+    model: str
+    fold: int
+    train_periods: tuple[str, str]
+    test_periods: list[str]
+    params: list[float]
+    predictions: list[float]
+    actuals: list[float]
+    mae: float
+    rmse: float
+    cached: bool = False
+
+
+@dataclass
+class BacktestReport:
+    """All fold results of one run."""
+
+    results: list[FoldResult] = field(default_factory=list)
+
+    @property
+    def computed(self) -> int:
+        """Folds fitted in this run (not served from the cache)."""
+        return sum(not r.cached for r in self.results)
+
+    def summary(self) -> dict[tuple[str, str, str], dict[str, float]]:
+        """Scores per (commodity, metric, model), pooled over all out-of-sample predictions."""
+        pooled: dict[tuple[str, str, str], tuple[list[float], list[float]]] = {}
+        for r in self.results:
+            actuals, predictions = pooled.setdefault((r.commodity, r.metric, r.model), ([], []))
+            actuals.extend(r.actuals)
+            predictions.extend(r.predictions)
+        return {
+            key: {**score(actuals, predictions), "predictions": len(actuals)}
+            for key, (actuals, predictions) in pooled.items()
+        }
+
+    def best_models(self, by: str = "rmse") -> dict[tuple[str, str], str]:
+        """Lowest-error model per (commodity, metric)."""
+        best: dict[tuple[str, str], tuple[float, str]] = {}
+        for (commodity, metric, model), scores in self.summary().items():
+            value = scores[by]
+            if (commodity, metric) not in best or value < best[commodity, metric][0]:
+                best[commodity, metric] = (value, model)
+        return {pair: model for pair, (_, model) in best.items()}
+
+
+@dataclass
+class _Task:
+    series: BacktestSeries
+    model: Model
+    fold: Fold
+    key: str
+    arrays: tuple[FloatArray, FloatArray, FloatArray, FloatArray]
+
+
+class BacktestRunner:
+    """Run every series × model × fold combination, reusing cached folds.
+
+    ``workers`` > 1 fits cache misses in a process pool; ``cache=None`` disables
+    caching.
+    """
+
+    def __init__(
+        self,
+        models: Sequence[Model | str] = tuple(MODELS),
+        min_train: int = 8,
+        horizon: int = 1,
+        step: int = 1,
+        window: int | None = None,
+        cache: ExtractionCache | None = None,
+        workers: int = 1,
+    ) -> None:
+        self.models = [MODELS[m] if isinstance(m, str) else m for m in models]
+        self.min_train = min_train
+        self.horizon = horizon
+        self.step = step
+        self.window = window
+        self.cache = cache
+        self.workers = workers
+
+    def plan(self, series: Sequence[BacktestSeries]) -> list[_Task]:
+        """Every task of a run with its cache key."""
+        tasks = []
+        for s in series:
+            x, y = np.asarray(s.x), np.asarray(s.y)
+            folds = rolling_origin_folds(
+                len(x), self.min_train, self.horizon, self.step, self.window
+            )
+            for model in self.models:
+                for fold in folds:
+                    arrays = (x[fold.train], y[fold.train], x[fold.test], y[fold.test])
+                    tasks.append(_Task(s, model, fold, fold_key(model, *arrays), arrays))
+        return tasks
+
+    def run(self, series: Sequence[BacktestSeries]) -> BacktestReport:
+        """Backtest all series; only folds missing from the cache are fitted."""
+        tasks = self.plan(series)
+        outcomes: dict[int, tuple[dict[str, Any], bool]] = {}
+        misses = []
+        for i, task in enumerate(tasks):
+            cached = self.cache.get(task.key) if self.cache is not None else None
+            if cached is not None:
+                outcomes[i] = (json.loads(cached), True)
+            else:
+                misses.append(i)
+
+        if self.workers > 1 and len(misses) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = {
+                    i: pool.submit(_fit_fold, tasks[i].model, *tasks[i].arrays) for i in misses
+                }
+                fitted = {i: future.result() for i, future in futures.items()}
+        else:
+            fitted = {i: _fit_fold(tasks[i].model, *tasks[i].arrays) for i in misses}
+
+        for i, outcome in fitted.items():
+            outcomes[i] = (outcome, False)
+        if self.cache is not None:
+            self.cache.put_many(
+                {tasks[i].key: json.dumps(outcome) for i, outcome in fitted.items()}
+            )
+            self.cache.flush()
+        logger.info(
+            "Backtest: %d folds, %d fitted, %d cached",
+            len(tasks),
+            len(misses),
+            len(tasks) - len(misses),
+        )
+
+        return BacktestReport([self._result(tasks[i], *outcomes[i]) for i in range(len(tasks))])
+
+    @staticmethod
+    def _result(task: _Task, outcome: dict[str, Any], cached: bool) -> FoldResult:
+        periods = task.series.periods
+        train, test = task.fold.train, task.fold.test
+        return FoldResult(
+            commodity=task.series.commodity,
+            metric=task.series.metric,
+            model=task.model.name,
+            fold=task.fold.index,
+            train_periods=(periods[train.start], periods[train.stop - 1]),
+            test_periods=list(periods[test]),
+            params=outcome["params"],
+            predictions=outcome["predictions"],
+            actuals=[float(v) for v in task.arrays[3]],
+            mae=outcome["mae"],
+            rmse=outcome["rmse"],
+            cached=cached,
+        )
+
+
+def default_cache(root: Path = DEFAULT_CACHE_DIR) -> ExtractionCache:
+    """Fold cache under ``data/processed`` next to the extraction cache."""
+    return ExtractionCache(root, max_bytes=DEFAULT_CACHE_BYTES)
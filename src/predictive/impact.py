@@ -0,0 +1,223 @@
+"""Vectorized commodity impact engine behind ``predict_commodity_impact``.
+
+Implements the linear model from ARCHITECTURE.md ("Predictive Scenario
+Simulation") over NumPy arrays: a price-change grid for many commodities, or
+many combined scenarios ("cocoa +30% AND wheat +15%"), is evaluated in one
+vectorized pass instead of one Python call per point. ``predict_impact`` keeps
+the scalar, single-commodity interface agents call.
+
+Every coefficient is first converted to gross-margin percentage points per 1%
+price change: ``gross_margin`` coefficients are used as-is, while a ``cogs``
+coefficient c (1% price change -> c% COGS change) moves the margin by
+``-c * (100 - margin) / 100`` points. Effects of simultaneous shocks add up.
+"""
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+# MVP correlations (ARCHITECTURE.md, "Correlation Detection").
+CORRELATIONS: dict[str, dict[str, Any]] = {
+    "cocoa_price": {
+        "impact_on": "gross_margin",
+        "coefficient": -0.16,  # 1% cocoa increase -> -0.16 pp margin
+        "confidence": 0.85,
+        "historical_example": "2023: Cocoa +50% → Margin -8%",
+    },
+    "wheat_price": {
+        "impact_on": "cogs",
+        "coefficient": 0.24,  # 1% wheat increase -> +0.24% COGS
+        "confidence": 0.78,
+        "historical_example": "2022: Wheat +20% → COGS +12%",
+    },
+}
+
+SUPPORTED_METRICS = ("gross_margin", "cogs")
+
+# (margin impact upper bound in pp, recommendation), checked in order.
+RECOMMENDATIONS = (
+    (-3.0, "High risk - diversify suppliers, consider hedging"),
+    (-1.0, "Moderate risk - review supplier contracts and monitor prices"),
+    (1.0, "Low risk - no action needed"),
+    (np.inf, "Favorable - consider locking in supply at current prices"),
+)
+
+FloatArray = NDArray[np.float64]
+
+
+@dataclass(frozen=True)
+class Baseline:
+    """Latest financials the shocks are applied to (revenue in USD, as in the spec)."""
+
+    revenue: float = 1_566_000_000.0
+    gross_margin_pct: float = 18.0
+
+
+@dataclass
+class ImpactResult:
+    """Impact arrays with the shape of the evaluated grid or scenario set."""
+
+    margin_impact_pct: FloatArray
+    revenue_impact: FloatArray
+    confidence: FloatArray
+    new_margin_pct: FloatArray
+
+    @property
+    def recommendation(self) -> NDArray[np.str_]:
+        """Recommendation text per point."""
+        return recommend(self.margin_impact_pct)
+
+
+def recommend(margin_impact_pct: ArrayLike) -> NDArray[np.str_]:
+    """Map margin impacts (pp) to recommendation texts, elementwise.
+
+    Raises ValueError for NaN or infinite impacts, which have no recommendation.
+    """
+    impact = np.asarray(margin_impact_pct, dtype=np.float64)
+    if not np.isfinite(impact).all():
+        raise ValueError("margin impacts must be finite")
+    bounds = np.array([bound for bound, _ in RECOMMENDATIONS])
+    texts = np.array([text for _, text in RECOMMENDATIONS])
+    return texts[np.searchsorted(bounds, impact, side="left")]
+
+
+def resolve_commodity(name: str, commodities: Sequence[str]) -> str:
+    """Accept ``cocoa`` as well as ``cocoa_price``."""
+    if name in commodities:
+        return name
+    if f"{name}_price" in commodities:
+        return f"{name}_price"
+    raise KeyError(f"Unknown commodity {name!r}; known: {', '.join(commodities)}")
+
+
+class ImpactEngine:
+    """Evaluate commodity price shocks against a baseline in vectorized form.
+
+    Shock arrays have the commodity axis last, ordered as ``commodities``;
+    values are price changes in percent (``30`` for +30%).
+    """
+
+    def __init__(
+        self,
+        correlations: Mapping[str, Mapping[str, Any]] = CORRELATIONS,
+        baseline: Baseline | None = None,
+    ) -> None:
+        self.baseline = baseline or Baseline()
+        self.commodities = tuple(correlations)
+        metrics = [correlations[c]["impact_on"] for c in self.commodities]
+        unknown = sorted(set(metrics) - set(SUPPORTED_METRICS))
+        if unknown:
+            raise ValueError(f"Unsupported impact metrics: {', '.join(unknown)}")
+        self.coefficients = np.array(
+            [correlations[c]["coefficient"] for c in self.commodities], dtype=np.float64
+        )
+        self.confidences = np.array(
+            [correlations[c]["confidence"] for c in self.commodities], dtype=np.float64
+        )
+        cogs_share = (100.0 - self.baseline.gross_margin_pct) / 100.0
+        self.margin_per_pct = np.where(
+            np.array(metrics) == "cogs", -self.coefficients * cogs_share, self.coefficients
+        )
+
+    def index(self, commodity: str) -> int:
+        """Position of ``commodity`` on the commodity axis."""
+        return self.commodities.index(resolve_commodity(commodity, self.commodities))
+
+    def shock_vector(self, changes: Mapping[str, float]) -> FloatArray:
+        """Turn ``{"cocoa": 30, "wheat": 15}`` into a commodity-axis vector."""
+        vector = np.zeros(len(self.commodities))
+        for commodity, change in changes.items():
+            vector[self.index(commodity)] = change
+        return vector
+
+    def evaluate(self, shocks: ArrayLike) -> ImpactResult:
+        """Combined impact of shock arrays shaped ``(..., len(commodities))``."""
+        shocks = np.asarray(shocks, dtype=np.float64)
+        if shocks.shape[-1:] != (len(self.commodities),):
+            raise ValueError(
+                f"last axis must have {len(self.commodities)} entries, got shape {shocks.shape}"
+            )
+        contributions = shocks * self.margin_per_pct
+        margin = contributions.sum(axis=-1)
+        # Confidence of a combined scenario: confidences weighted by each
+        # commodity's share of the total effect.
+        weights = np.abs(contributions)
+        total = weights.sum(axis=-1)
+        weighted = (weights * self.confidences).sum(axis=-1)
+        confidence = np.divide(
+            weighted, total, out=np.full_like(margin, self.confidences.min()), where=total > 0
+        )
+        return self._result(margin, confidence)
+
+    def evaluate_scenarios(self, scenarios: Sequence[Mapping[str, float]]) -> ImpactResult:
+        """Evaluate named-commodity scenarios, one result entry per scenario."""
+        return self.evaluate(np.stack([self.shock_vector(s) for s in scenarios]))
+
+    def sensitivity(
+        self, changes: ArrayLike, commodities: Sequence[str] | None = None
+    ) -> ImpactResult:
+        """Single-commodity sensitivity: result arrays shaped ``(commodities, changes)``."""
+        changes = np.asarray(changes, dtype=np.float64)
+        selected = [self.index(c) for c in (commodities or self.commodities)]
+        margin = np.outer(self.margin_per_pct[selected], changes)
+        confidence = np.broadcast_to(self.confidences[selected][:, None], margin.shape).copy()
+        return self._result(margin, confidence)
+
+    def surface(
+        self,
+        x_commodity: str,
+        x_changes: ArrayLike,
+        y_commodity: str,
+        y_changes: ArrayLike,
+        fixed: Mapping[str, float] | None = None,
+    ) -> ImpactResult:
+        """Combined-shock surface over two commodities, shaped ``(len(y), len(x))``.
+
+        Other commodities stay at ``fixed`` (default: no change).
+        """
+        x = np.asarray(x_changes, dtype=np.float64)
+        y = np.asarray(y_changes, dtype=np.float64)
+        shocks = np.broadcast_to(
+            self.shock_vector(fixed or {}), (len(y), len(x), len(self.commodities))
+        ).copy()
+        shocks[..., self.index(x_commodity)] = x[None, :]
+        shocks[..., self.index(y_commodity)] = y[:, None]
+        return self.evaluate(shocks)
+
+    def predict(self, commodity: str, price_change_pct: float) -> dict[str, Any]:
+        """Scalar ``predict_commodity_impact`` response for one commodity.
+
+        ``revenue_impact_clp`` keeps the tool interface's field name; its value
+        is in the units of ``Baseline.revenue``.
+        """
+        if not np.isfinite(price_change_pct):
+            raise ValueError(f"price_change_pct must be finite, got {price_change_pct}")
+        result = self.evaluate(self.shock_vector({commodity: price_change_pct}))
+        return {
+            "margin_impact_pct": float(result.margin_impact_pct),
+            "revenue_impact_clp": int(round(float(result.revenue_impact))),
+            "confidence": float(result.confidence),
+            "recommendation": str(result.recommendation),
+        }
+
+    def _result(self, margin: FloatArray, confidence: FloatArray) -> ImpactResult:
+        return ImpactResult(
+            margin_impact_pct=margin,
+            revenue_impact=self.baseline.revenue * margin / 100.0,
+            confidence=confidence,
+            new_margin_pct=self.baseline.gross_margin_pct + margin,
+        )
+
+
+_DEFAULT_ENGINE: ImpactEngine | None = None
+
+
+def predict_impact(commodity: str, price_change_pct: float) -> dict[str, Any]:
+    """Predict the financial impact of one commodity price change (spec interface)."""
+    global _DEFAULT_ENGINE
+    if _DEFAULT_ENGINE is None:
+        _DEFAULT_ENGINE = ImpactEngine()
+    return _DEFAULT_ENGINE.predict(commodity, price_change_pct)
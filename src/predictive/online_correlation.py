@@ -0,0 +1,216 @@
+"""Online correlation estimates for commodity/financial-metric pairs.
+
+Each (commodity, metric) pair keeps running sufficient statistics, updated in
+O(1) per observation with Welford's algorithm: count, means, sums of squared
+deviations and the co-moment. Slope, r² and correlation are derived from them
+on demand, so new FRED observations or quarterly figures refresh the
+``correlation_models`` rows without refitting on the full history. Batches are
+folded in with the pairwise merge of Chan et al., and the state persists as
+JSON.
+"""
+
+import json
+import logging
+import math
+import os
+from collections.abc import Iterable, Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from src.predictive.impact import SUPPORTED_METRICS
+
+logger = logging.getLogger(__name__)
+
+# Pairs with fewer observations are not published.
+MIN_OBSERVATIONS = 3
+
+
+@dataclass
+class PairStats:
+    """Running regression statistics of ``y`` (metric change) on ``x`` (price change)."""
+
+    count: int = 0
+    mean_x: float = 0.0
+    mean_y: float = 0.0
+    m2_x: float = 0.0
+    m2_y: float = 0.0
+    co_moment: float = 0.0
+
+    def update(self, x: float, y: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        dx = x - self.mean_x
+        self.mean_x += dx / self.count
+        dy = y - self.mean_y
+        self.mean_y += dy / self.count
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.co_moment += dx * (y - self.mean_y)
+
+    def merge(self, other: "PairStats") -> None:
+        """Fold in statistics computed over other observations."""
+        if not other.count:
+            return
+        total = self.count + other.count
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.count * other.count / total
+        self.mean_x += dx * other.count / total
+        self.mean_y += dy * other.count / total
+        self.m2_x += other.m2_x + dx * dx * weight
+        self.m2_y += other.m2_y + dy * dy * weight
+        self.co_moment += other.co_moment + dx * dy * weight
+        self.count = total
+
+    @classmethod
+    def from_arrays(cls, x: ArrayLike, y: ArrayLike) -> "PairStats":
+        """Statistics of a batch of paired observations."""
+        xs = np.asarray(x, dtype=np.float64).ravel()
+        ys = np.asarray(y, dtype=np.float64).ravel()
+        if xs.shape != ys.shape:
+            raise ValueError(f"x and y lengths differ: {len(xs)} != {len(ys)}")
+        if not len(xs):
+            return cls()
+        dx, dy = xs - xs.mean(), ys - ys.mean()
+        return cls(
+            count=len(xs),
+            mean_x=float(xs.mean()),
+            mean_y=float(ys.mean()),
+            m2_x=float(dx @ dx),
+            m2_y=float(dy @ dy),
+            co_moment=float(dx @ dy),
+        )
+
+    @property
+    def slope(self) -> float:
+        """Least-squares coefficient: change in y per unit change in x."""
+        return self.co_moment / self.m2_x if self.m2_x > 0 else 0.0
+
+    @property
+    def intercept(self) -> float:
+        """Least-squares intercept."""
+        return self.mean_y - self.slope * self.mean_x
+
+    @property
+    def correlation(self) -> float:
+        """Pearson correlation (0 when either side has no variance)."""
+        denominator = math.sqrt(self.m2_x * self.m2_y)
+        return self.co_moment / denominator if denominator > 0 else 0.0
+
+    @property
+    def r_squared(self) -> float:
+        """Share of y's variance explained by x."""
+        return self.correlation**2
+
+    @property
+    def confidence(self) -> float:
+        """Adjusted r², which discounts fits on few observations."""
+        if self.count < MIN_OBSERVATIONS:
+            return 0.0
+        adjusted = 1 - (1 - self.r_squared) * (self.count - 1) / (self.count - 2)
+        return max(0.0, adjusted)
+
+
+class OnlineCorrelationEstimator:
+    """Incrementally maintained regressions for every (commodity, metric) pair."""
+
+    def __init__(self, pairs: Mapping[tuple[str, str], PairStats] | None = None) -> None:
+        self.pairs: dict[tuple[str, str], PairStats] = dict(pairs or {})
+
+    def stats(self, commodity: str, metric: str) -> PairStats:
+        """Statistics of one pair, created empty on first use."""
+        return self.pairs.setdefault((commodity, metric), PairStats())
+
+    def update(self, commodity: str, metric: str, x: float, y: float) -> None:
+        """Add one observation to a pair."""
+        self.stats(commodity, metric).update(x, y)
+
+    def observe(self, commodity: str, price_change: float, metrics: Mapping[str, float]) -> None:
+        """Add one period: a commodity's price change against several metric changes."""
+        for metric, change in metrics.items():
+            self.update(commodity, metric, price_change, change)
+
+    def update_many(self, commodity: str, metric: str, x: ArrayLike, y: ArrayLike) -> None:
+        """Add a batch of observations to a pair."""
+        self.stats(commodity, metric).merge(PairStats.from_arrays(x, y))
+
+    def to_rows(
+        self,
+        min_observations: int = MIN_OBSERVATIONS,
+        examples: Mapping[str, str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Rows for the ``correlation_models`` table, one per sufficiently observed pair."""
+        examples = examples or {}
+        return [
+            {
+                "commodity": commodity,
+                "impact_metric": metric,
+                "coefficient": round(stats.slope, 4),
+                "r_squared": round(stats.r_squared, 4),
+                "confidence": round(stats.confidence, 4),
+                "historical_example": examples.get(commodity),
+            }
+            for (commodity, metric), stats in sorted(self.pairs.items())
+            if stats.count >= min_observations
+        ]
+
+    def as_correlations(
+        self, min_observations: int = MIN_OBSERVATIONS
+    ) -> dict[str, dict[str, Any]]:
+        """``CORRELATIONS``-shaped mapping for ``ImpactEngine``.
+
+        Each commodity keeps its best-fitting metric among those the engine supports.
+        """
+        best: dict[str, tuple[str, PairStats]] = {}
+        for (commodity, metric), stats in sorted(self.pairs.items()):
+            if metric not in SUPPORTED_METRICS or stats.count < min_observations:
+                continue
+            if commodity not in best or stats.r_squared > best[commodity][1].r_squared:
+                best[commodity] = (metric, stats)
+        return {
+            commodity: {
+                "impact_on": metric,
+                "coefficient": stats.slope,
+                "confidence": stats.confidence,
+            }
+            for commodity, (metric, stats) in best.items()
+        }
+
+    def save(self, path: Path) -> None:
+        """Write the state to ``path`` atomically."""
+        state = [
+            {"commodity": commodity, "metric": metric, **asdict(stats)}
+            for (commodity, metric), stats in sorted(self.pairs.items())
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(state, indent=1), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "OnlineCorrelationEstimator":
+        """Restore a saved state; a missing or unreadable file gives an empty estimator."""
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return cls()
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Ignoring unreadable correlation state %s: %s", path, e)
+            return cls()
+        return cls(
+            {(entry.pop("commodity"), entry.pop("metric")): PairStats(**entry) for entry in state}
+        )
+
+    @classmethod
+    def fit(
+        cls, observations: Iterable[tuple[str, str, float, float]]
+    ) -> "OnlineCorrelationEstimator":
+        """Build an estimator from ``(commodity, metric, x, y)`` observations."""
+        estimator = cls()
+        for commodity, metric, x, y in observations:
+            estimator.update(commodity, metric, x, y)
+        return estimator
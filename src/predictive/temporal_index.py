@@ -0,0 +1,247 @@
+"""As-of joins and period aggregates between event series and financial quarters.
+
+``external_events`` arrive daily or monthly; ``carozzi_financials`` are
+quarterly. ``EventSeries`` precomputes, per event type, sorted dates, prefix
+sums and a segment tree of (max, min, max drawdown), so that for any date range
+the as-of value, mean, end-of-period value and maximum drawdown each cost one
+or two binary searches plus O(log n) tree nodes.
+
+``TemporalIndex`` holds the series and caches aligned feature matrices
+(quarters × features). Every event type carries a version counter bumped when
+events are added, and a cached matrix is reused only while the versions of the
+event types it was built from are unchanged.
+"""
+
+import logging
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES = ("mean", "last", "min", "max", "max_drawdown")
+
+FloatArray = NDArray[np.float64]
+DateArray = NDArray[np.datetime64]
+
+
+def as_dates(values: Any) -> DateArray:
+    """Day-resolution ``datetime64`` array from dates, strings or datetime64 values."""
+    return np.asarray(values, dtype="datetime64[D]")
+
+
+def quarter_bounds(periods: Iterable[tuple[int, int]]) -> tuple[DateArray, DateArray]:
+    """Half-open ``[start, end)`` dates of ``(year, quarter)`` periods."""
+    months = np.array([(year - 1970) * 12 + (quarter - 1) * 3 for year, quarter in periods])
+    starts = months.astype("datetime64[M]")
+    return starts.astype("datetime64[D]"), (starts + 3).astype("datetime64[D]")
+
+
+def _merge_drawdown(
+    left_max: FloatArray, left_dd: FloatArray, right_min: FloatArray, right_dd: FloatArray
+) -> FloatArray:
+    """Drawdown of a left range followed by a right range (peak left, trough right)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cross = np.where(
+            np.isfinite(left_max) & np.isfinite(right_min), 1.0 - right_min / left_max, 0.0
+        )
+    result: FloatArray = np.maximum(np.maximum(left_dd, right_dd), cross)
+    return result
+
+
+class EventSeries:
+    """One event type's observations with prefix sums and a drawdown segment tree."""
+
+    def __init__(self, dates: ArrayLike, values: ArrayLike) -> None:
+        dates = as_dates(dates)
+        values = np.asarray(values, dtype=np.float64)
+        if dates.shape != values.shape:
+            raise ValueError("dates and values must have the same length")
+        order = np.argsort(dates, kind="stable")
+        self.dates = dates[order]
+        self.values = values[order]
+        self._prefix = np.concatenate(([0.0], np.cumsum(self.values)))
+        self._build_tree()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _build_tree(self) -> None:
+        size = 1
+        while size < max(len(self.values), 1):
+            size *= 2
+        self._size = size
+        self._max = np.full(2 * size, -np.inf)
+        self._min = np.full(2 * size, np.inf)
+        self._dd = np.zeros(2 * size)
+        self._max[size : size + len(self.values)] = self.values
+        self._min[size : size + len(self.values)] = self.values
+        level = size
+        while level > 1:
+            parents = np.arange(level // 2, level)
+            left, right = 2 * parents, 2 * parents + 1
+            self._dd[parents] = _merge_drawdown(
+                self._max[left], self._dd[left], self._min[right], self._dd[right]
+            )
+            self._max[parents] = np.maximum(self._max[left], self._max[right])
+            self._min[parents] = np.minimum(self._min[left], self._min[right])
+            level //= 2
+
+    def positions(
+        self, starts: ArrayLike, ends: ArrayLike
+    ) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        """Observation index ranges ``[lo, hi)`` of date ranges ``[start, end)``."""
+        lo = np.searchsorted(self.dates, as_dates(starts), side="left")
+        hi = np.searchsorted(self.dates, as_dates(ends), side="left")
+        return lo, np.maximum(lo, hi)
+
+    def as_of(self, dates: ArrayLike) -> FloatArray:
+        """Latest value on or before each date (NaN before the first observation)."""
+        index = np.searchsorted(self.dates, as_dates(dates), side="right") - 1
+        values = self.values[np.clip(index, 0, None)] if len(self.values) else np.zeros(index.shape)
+        result: FloatArray = np.where(index >= 0, values, np.nan)
+        return result
+
+    def mean(self, starts: ArrayLike, ends: ArrayLike) -> FloatArray:
+        """Mean of observations in each ``[start, end)`` (NaN when empty)."""
+        lo, hi = self.positions(starts, ends)
+        count = hi - lo
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result: FloatArray = np.where(
+                count > 0, (self._prefix[hi] - self._prefix[lo]) / count, np.nan
+            )
+        return result
+
+    def last(self, ends: ArrayLike) -> FloatArray:
+        """End-of-period value: the as-of value on the last day before each ``end``."""
+        return self.as_of(as_dates(ends) - np.timedelta64(1, "D"))
+
+    def extreme(self, starts: ArrayLike, ends: ArrayLike, how: str) -> FloatArray:
+        """Minimum or maximum of observations in each range (NaN when empty)."""
+        slot = 0 if how == "max" else 1
+        return np.array(
+            [
+                self._query(lo, hi)[slot]
+                for lo, hi in zip(*self.positions(starts, ends), strict=True)
+            ]
+        )
+
+    def max_drawdown(self, starts: ArrayLike, ends: ArrayLike) -> FloatArray:
+        """Largest peak-to-trough decline (as a fraction of the peak) within each range."""
+        return np.array(
+            [self._query(lo, hi)[2] for lo, hi in zip(*self.positions(starts, ends), strict=True)]
+        )
+
+    def _query(self, lo: int, hi: int) -> tuple[float, float, float]:
+        """(max, min, max drawdown) of observations ``lo..hi-1``; NaNs when empty."""
+        if lo >= hi:
+            return np.nan, np.nan, np.nan
+        # Nodes are combined in order: left accumulator grows rightwards,
+        # right accumulator grows leftwards.
+        left = (-np.inf, np.inf, 0.0)
+        right = (-np.inf, np.inf, 0.0)
+        lo += self._size
+        hi += self._size
+        while lo < hi:
+            if lo & 1:
+                left = self._combine(left, self._node(lo))
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right = self._combine(self._node(hi), right)
+            lo //= 2
+            hi //= 2
+        return self._combine(left, right)
+
+    def _node(self, i: int) -> tuple[float, float, float]:
+        return float(self._max[i]), float(self._min[i]), float(self._dd[i])
+
+    @staticmethod
+    def _combine(
+        a: tuple[float, float, float], b: tuple[float, float, float]
+    ) -> tuple[float, float, float]:
+        cross = 1.0 - b[1] / a[0] if np.isfinite(a[0]) and np.isfinite(b[1]) else 0.0
+        return max(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2], cross)
+
+
+class TemporalIndex:
+    """Event series by type with a version-checked cache of aligned feature matrices."""
+
+    def __init__(self, cache_size: int = 32) -> None:
+        self.series: dict[str, EventSeries] = {}
+        self.versions: dict[str, int] = {}
+        self.cache_size = cache_size
+        self._cache: OrderedDict[Any, tuple[tuple[int, ...], FloatArray]] = OrderedDict()
+
+    @classmethod
+    def from_store(cls, store: Any, event_types: Sequence[str] | None = None) -> "TemporalIndex":
+        """Build from the ``external_events`` table of a ``TimeSeriesStore``."""
+        table = store.table("external_events")
+        index = cls()
+        for event_type in event_types or table.categories.get("event_type", []):
+            view = table.view(table.rows_for(event_type))
+            index.add_events(event_type, view["event_date"], view["value"])
+        return index
+
+    def add_events(self, event_type: str, dates: ArrayLike, values: ArrayLike) -> None:
+        """Add observations and invalidate matrices built from ``event_type``."""
+        current = self.series.get(event_type)
+        if current is not None:
+            dates = np.concatenate([current.dates, as_dates(dates)])
+            values = np.concatenate([current.values, np.asarray(values, dtype=np.float64)])
+        self.series[event_type] = EventSeries(dates, values)
+        self.versions[event_type] = self.versions.get(event_type, 0) + 1
+
+    def get(self, event_type: str) -> EventSeries:
+        """Series of one event type."""
+        try:
+            return self.series[event_type]
+        except KeyError:
+            raise KeyError(f"No events of type {event_type!r}; known: {', '.join(self.series)}")
+
+    def as_of(self, event_type: str, dates: ArrayLike) -> FloatArray:
+        """Latest value of ``event_type`` on or before each date."""
+        return self.get(event_type).as_of(dates)
+
+    def aggregate(
+        self, event_type: str, starts: ArrayLike, ends: ArrayLike, how: str = "mean"
+    ) -> FloatArray:
+        """``how`` (one of ``AGGREGATES``) over each ``[start, end)`` range."""
+        series = self.get(event_type)
+        if how == "mean":
+            return series.mean(starts, ends)
+        if how == "last":
+            return series.last(ends)
+        if how in ("min", "max"):
+            return series.extreme(starts, ends, how)
+        if how == "max_drawdown":
+            return series.max_drawdown(starts, ends)
+        raise ValueError(f"Unknown aggregate {how!r}; expected one of {', '.join(AGGREGATES)}")
+
+    def feature_matrix(
+        self, periods: Sequence[tuple[int, int]], features: Sequence[tuple[str, str]]
+    ) -> FloatArray:
+        """Quarters × ``(event_type, aggregate)`` matrix, cached until those types change.
+
+        The returned array is read-only because it is shared with the cache.
+        """
+        key = (tuple(map(tuple, periods)), tuple(map(tuple, features)))
+        versions = tuple(self.versions.get(event_type, 0) for event_type, _ in features)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == versions:
+            self._cache.move_to_end(key)
+            return cached[1]
+        starts, ends = quarter_bounds(periods)
+        matrix = np.empty((len(periods), len(features)))
+        for column, (event_type, how) in enumerate(features):
+            matrix[:, column] = self.aggregate(event_type, starts, ends, how)
+        matrix.setflags(write=False)
+        self._cache[key] = (versions, matrix)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        logger.debug("Built %dx%d feature matrix", *matrix.shape)
+        return matrix
@@ -0,0 +1,302 @@
+"""Embedded columnar store for the financial and external-event time series.
+
+Mirrors the ``carozzi_financials`` and ``external_events`` tables of the data
+layer (ARCHITECTURE.md, "Metrics Database") as one ``.npy`` file per column
+plus a ``meta.json``. Tables are opened with ``np.load(mmap_mode="r")``, so
+startup costs a few file opens and slices are views into the mapped files.
+
+Rows are written sorted -- by ``(year, quarter)`` for financials and by
+``(event_type, event_date)`` for events -- and ``meta.json`` records the row
+range of every ``(year, quarter)`` or ``(event_type, year, quarter)`` group, so
+any index prefix or period range resolves to one contiguous slice.
+
+Nullable ``BIGINT`` amounts are stored as float64 with NaN for NULL (exact up to
+2**53); ``VARCHAR`` columns are dictionary-encoded.
+"""
+
+import bisect
+import datetime as dt
+import json
+import logging
+import math
+import os
+import shutil
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = Path("data/processed/timeseries")
+FORMAT_VERSION = 1
+
+# Columns the relational schema manages itself and the store does not keep.
+HOUSEKEEPING_COLUMNS = ("id", "created_at")
+CATEGORY = "category"
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    """Column dtypes, sort order and index of one stored table.
+
+    ``derived`` columns are computed from ``event_date`` on write and are not
+    part of the relational schema.
+    """
+
+    name: str
+    columns: dict[str, str]
+    sort: tuple[str, ...]
+    index: tuple[str, ...]
+    derived: tuple[str, ...] = ()
+
+
+SCHEMAS = {
+    "carozzi_financials": TableSchema(
+        name="carozzi_financials",
+        columns={
+            "year": "int16",
+            "quarter": "int8",
+            "revenue_clp": "float64",
+            "cogs_clp": "float64",
+            "gross_margin_pct": "float64",
+            "net_income_clp": "float64",
+        },
+        sort=("year", "quarter"),
+        index=("year", "quarter"),
+    ),
+    "external_events": TableSchema(
+        name="external_events",
+        columns={
+            "event_date": "datetime64[D]",
+            "event_type": CATEGORY,
+            "value": "float64",
+            "unit": CATEGORY,
+            "source": CATEGORY,
+            "year": "int16",
+            "quarter": "int8",
+        },
+        sort=("event_type", "event_date"),
+        index=("event_type", "year", "quarter"),
+        derived=("year", "quarter"),
+    ),
+}
+
+
+def _as_date(value: Any) -> np.datetime64:
+    if isinstance(value, dt.datetime):
+        value = value.date()
+    return np.datetime64(value, "D")
+
+
+def _encode(
+    schema: TableSchema, rows: Iterable[Mapping[str, Any]]
+) -> tuple[dict[str, Any], dict[str, list[str]]]:
+    """Column arrays (in index order) and category dictionaries for ``rows``."""
+    records = [dict(row) for row in rows]
+    if "event_date" in schema.columns:
+        for row in records:
+            date = _as_date(row["event_date"]).astype(dt.date)
+            row["year"], row["quarter"] = date.year, (date.month - 1) // 3 + 1
+    columns: dict[str, Any] = {}
+    categories: dict[str, list[str]] = {}
+    for name, dtype in schema.columns.items():
+        values: list[Any] = [row.get(name) for row in records]
+        if (name in schema.index or dtype.startswith("int")) and None in values:
+            raise ValueError(f"{schema.name}.{name} must not be NULL")
+        if dtype == CATEGORY:
+            labels = sorted({v for v in values if v is not None})
+            lookup = {label: code for code, label in enumerate(labels)}
+            categories[name] = labels
+            columns[name] = np.array([lookup.get(v, -1) for v in values], dtype=np.int32)
+        elif dtype.startswith("datetime64"):
+            columns[name] = np.array([_as_date(v) for v in values], dtype=dtype)
+        elif dtype.startswith("float"):
+            columns[name] = np.array(
+                [np.nan if v is None else float(v) for v in values], dtype=dtype
+            )
+        else:
+            columns[name] = np.array([int(v) for v in values], dtype=dtype)
+    # np.lexsort sorts on the last key first.
+    order = np.lexsort([columns[name] for name in reversed(schema.sort)])
+    return {name: array[order] for name, array in columns.items()}, categories
+
+
+@dataclass
+class Table:
+    """A stored table opened as read-only memory maps."""
+
+    schema: TableSchema
+    columns: dict[str, NDArray[Any]]
+    categories: dict[str, list[str]]
+    groups: list[tuple[tuple[Any, ...], int, int]]
+    _keys: list[tuple[Any, ...]] = field(default_factory=list, repr=False)
+    _prefixes: dict[tuple[Any, ...], tuple[int, int]] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        self._keys = [key for key, _, _ in self.groups]
+        for key, start, stop in self.groups:
+            for length in range(1, len(key) + 1):
+                prefix = key[:length]
+                first, _ = self._prefixes.get(prefix, (start, stop))
+                self._prefixes[prefix] = (first, stop)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def rows_for(self, *prefix: Any) -> slice:
+        """Row range of an index prefix, e.g. ``("cocoa_price", 2023)``; empty if absent."""
+        if not prefix:
+            return slice(0, len(self))
+        start, stop = self._prefixes.get(tuple(prefix), (0, 0))
+        return slice(start, stop)
+
+    def rows_between(
+        self,
+        *prefix: Any,
+        since: tuple[int, int] | None = None,
+        until: tuple[int, int] | None = None,
+    ) -> slice:
+        """Row range of ``prefix`` whose ``(year, quarter)`` lies in ``[since, until]``."""
+        block = self.rows_for(*prefix)
+        start, stop = block.start, block.stop
+        if since is not None:
+            i = bisect.bisect_left(self._keys, (*prefix, *since))
+            start = self.groups[i][1] if i < len(self.groups) else len(self)
+        if until is not None:
+            i = bisect.bisect_right(self._keys, (*prefix, *until))
+            stop = self.groups[i - 1][2] if i > 0 else 0
+        start, stop = max(start, block.start), min(stop, block.stop)
+        return slice(start, max(start, stop))
+
+    def view(self, rows: slice) -> dict[str, NDArray[Any]]:
+        """Zero-copy column views of a row range."""
+        return {name: array[rows] for name, array in self.columns.items()}
+
+    def decode(self, column: str, codes: NDArray[Any]) -> list[str | None]:
+        """Labels of a dictionary-encoded column."""
+        labels = self.categories[column]
+        return [labels[code] if code >= 0 else None for code in codes.tolist()]
+
+    def iter_rows(self, rows: slice | None = None) -> Iterator[dict[str, Any]]:
+        """Decoded rows as dictionaries (for export or ``fit_shock_model``)."""
+        view = self.view(rows or slice(0, len(self)))
+        decoded: dict[str, list[Any]] = {}
+        for name, array in view.items():
+            if name in self.categories:
+                decoded[name] = self.decode(name, array)
+            elif array.dtype.kind == "M":
+                decoded[name] = array.astype(dt.date).tolist()
+            elif array.dtype.kind == "f":
+                decoded[name] = [None if math.isnan(v) else v for v in array.tolist()]
+            else:
+                decoded[name] = array.tolist()
+        for i in range(len(next(iter(decoded.values()), []))):
+            yield {name: values[i] for name, values in decoded.items()}
+
+
+class TimeSeriesStore:
+    """Directory of columnar tables; one sub-directory per table."""
+
+    def __init__(self, root: Path = DEFAULT_STORE_DIR) -> None:
+        self.root = Path(root)
+        self._tables: dict[str, Table] = {}
+
+    def write(self, table: str, rows: Iterable[Mapping[str, Any]]) -> Table:
+        """Replace ``table`` with ``rows``; readers see the old or the new files, never a mix."""
+        schema = SCHEMAS[table]
+        columns, categories = _encode(schema, rows)
+        groups = self._groups(schema, columns, categories)
+        target = self.root / table
+        staging = self.root / f".{table}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        for name, array in columns.items():
+            np.save(staging / f"{name}.npy", array)
+        meta = {
+            "version": FORMAT_VERSION,
+            "rows": len(next(iter(columns.values()))),
+            "categories": categories,
+            "groups": groups,
+        }
+        (staging / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        retired = self.root / f".{table}.{os.getpid()}.old"
+        if target.exists():
+            os.replace(target, retired)
+        os.replace(staging, target)
+        shutil.rmtree(retired, ignore_errors=True)
+        self._tables.pop(table, None)
+        logger.info("Wrote %d rows to %s", meta["rows"], target)
+        return self.table(table)
+
+    def append(self, table: str, rows: Iterable[Mapping[str, Any]]) -> Table:
+        """Add rows to ``table`` (rewritten in sorted order; the dataset is small)."""
+        existing = list(self.table(table).iter_rows()) if self.exists(table) else []
+        derived = SCHEMAS[table].derived
+        existing = [{k: v for k, v in row.items() if k not in derived} for row in existing]
+        return self.write(table, [*existing, *rows])
+
+    def exists(self, table: str) -> bool:
+        """Whether ``table`` has been written."""
+        return (self.root / table / "meta.json").exists()
+
+    def table(self, table: str) -> Table:
+        """Open ``table`` as memory maps (cached per store instance)."""
+        if table not in self._tables:
+            schema = SCHEMAS[table]
+            directory = self.root / table
+            meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+            if meta["version"] != FORMAT_VERSION:
+                raise ValueError(f"{directory}: unsupported store format {meta['version']}")
+            columns = {
+                name: np.load(directory / f"{name}.npy", mmap_mode="r" if meta["rows"] else None)
+                for name in schema.columns
+            }
+            groups = [(tuple(key), start, stop) for key, start, stop in meta["groups"]]
+            self._tables[table] = Table(schema, columns, meta["categories"], groups)
+        return self._tables[table]
+
+    def event_series(
+        self,
+        event_type: str,
+        since: tuple[int, int] | None = None,
+        until: tuple[int, int] | None = None,
+    ) -> tuple[NDArray[np.datetime64], NDArray[np.float64]]:
+        """Dates and values of one event type between two ``(year, quarter)`` periods."""
+        events = self.table("external_events")
+        view = events.view(events.rows_between(event_type, since=since, until=until))
+        return view["event_date"], view["value"]
+
+    def financial_series(
+        self,
+        column: str,
+        since: tuple[int, int] | None = None,
+        until: tuple[int, int] | None = None,
+    ) -> tuple[NDArray[np.int16], NDArray[np.int8], NDArray[np.float64]]:
+        """Years, quarters and one metric column between two periods."""
+        financials = self.table("carozzi_financials")
+        view = financials.view(financials.rows_between(since=since, until=until))
+        return view["year"], view["quarter"], view[column]
+
+    @staticmethod
+    def _groups(
+        schema: TableSchema, columns: dict[str, Any], categories: dict[str, list[str]]
+    ) -> list[list[Any]]:
+        """``[key, start, stop]`` for every run of equal index keys, in row order."""
+        keys = [
+            [
+                categories[name][code] if name in categories else code
+                for code in columns[name].tolist()
+            ]
+            for name in schema.index
+        ]
+        groups: list[list[Any]] = []
+        for row, key in enumerate(zip(*keys, strict=True)):
+            if groups and tuple(groups[-1][0]) == key:
+                groups[-1][2] = row + 1
+            else:
+                groups.append([list(key), row, row + 1])
+        return groups
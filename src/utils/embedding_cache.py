@@ -0,0 +1,241 @@
+"""Embedding cache keyed by model and chunk text, with deduplicating batches.
+
+Reprocessing a document re-embeds chunks whose text has not changed. Entries
+are keyed by the embedding model ID and the SHA-256 of the chunk text, so an
+unchanged chunk is never sent to the embedding API twice, whichever document
+it came from. Vectors are stored per model as float16 rows appended to
+``vectors.f16`` (half the size of float32; retrieval scores move by ~1e-3),
+with their text hashes in ``keys.txt``; ``meta.json`` is written last so an
+interrupted append is discarded on the next open. Recently used vectors stay
+in memory up to ``max_memory_entries``; the rest are read from a memory map.
+
+``EmbeddingBatcher`` sits in front of the model: it pools the chunks of any
+number of documents, drops duplicates and cached texts, and sends the rest in
+as few requests as ``max_batch_size`` allows.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from src.utils.extraction_cache import CacheStats
+
+logger = logging.getLogger(__name__)
+
+FloatArray = NDArray[np.float32]
+Embedder = Callable[[Sequence[str]], ArrayLike]
+
+DEFAULT_CACHE_DIR = Path("data/processed/embedding_cache")
+DEFAULT_MODEL_ID = "ibm/slate-125m-english-rtrvr-v2"
+# Inputs per embedding request accepted by watsonx.ai.
+DEFAULT_MAX_BATCH_SIZE = 1000
+DEFAULT_MAX_MEMORY_ENTRIES = 10_000
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of a chunk's UTF-8 text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent float16 embeddings of one model with an in-memory LRU.
+
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        model_id: str = DEFAULT_MODEL_ID,
+        root: Path = DEFAULT_CACHE_DIR,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+    ) -> None:
+        self.model_id = model_id
+        self.root = Path(root) / model_id.replace("/", "--")
+        self.max_memory_entries = max_memory_entries
+        self.stats = CacheStats()
+        self.disk_reads = 0
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, FloatArray] = OrderedDict()
+        self._map: NDArray[np.float16] | None = None
+        meta = self._read_meta()
+        self.dim: int | None = meta.get("dim")
+        self.count = int(meta.get("count", 0))
+        self._rows = self._read_keys()
+        self.stats.entries = self.count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, text: object) -> bool:
+        return isinstance(text, str) and text_hash(text) in self._rows
+
+    def get(self, text: str) -> FloatArray | None:
+        """Cached embedding of ``text`` (float32), or None."""
+        return self.get_hashes([text_hash(text)])[0]
+
+    def get_hashes(self, hashes: Sequence[str]) -> list[FloatArray | None]:
+        """Cached embeddings by text hash, counting hits and misses."""
+        found: list[FloatArray | None] = []
+        with self._lock:
+            for digest in hashes:
+                vector = self._memory.get(digest)
+                if vector is not None:
+                    self._memory.move_to_end(digest)
+                elif (row := self._rows.get(digest)) is not None:
+                    vector = self._vectors()[row].astype(np.float32)
+                    self.disk_reads += 1
+                    self._remember(digest, vector)
+                if vector is None:
+                    self.stats.misses += 1
+                else:
+                    self.stats.hits += 1
+                found.append(vector)
+        return found
+
+    def put_many(self, texts: Sequence[str], vectors: ArrayLike) -> None:
+        """Store embeddings; texts already cached are skipped."""
+        self.put_hashes([text_hash(t) for t in texts], vectors)
+
+    def put_hashes(self, hashes: Sequence[str], vectors: ArrayLike) -> None:
+        """Store embeddings by text hash; hashes already cached are skipped."""
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if len(matrix) != len(hashes):
+            raise ValueError(f"{len(hashes)} hashes but {len(matrix)} vectors")
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(
+                    f"{self.model_id} vectors have dim {self.dim}, not {matrix.shape[1]}"
+                )
+            new: dict[str, int] = {}
+            for i, digest in enumerate(hashes):
+                if digest not in self._rows and digest not in new:
+                    new[digest] = i
+            if not new:
+                return
+            rows = matrix[list(new.values())].astype(np.float16)
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._append("vectors.f16", self.count * self.dim * 2, rows.tobytes())
+            self._append("keys.txt", self.count * 65, "".join(f"{d}\n" for d in new).encode())
+            for offset, digest in enumerate(new):
+                self._rows[digest] = self.count + offset
+                # Keep the stored precision so memory and disk hits agree.
+                self._remember(digest, rows[offset].astype(np.float32))
+            self.count += len(new)
+            self.stats.entries = self.count
+            self.stats.bytes = self.count * self.dim * 2
+            self._map = None
+            self._write_meta()
+
+    def _remember(self, digest: str, vector: FloatArray) -> None:
+        self._memory[digest] = vector
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _vectors(self) -> NDArray[np.float16]:
+        if self._map is None:
+            assert self.dim is not None
+            view = np.memmap(
+                self.root / "vectors.f16", dtype=np.float16, mode="r", shape=(self.count, self.dim)
+            )
+            self._map = view.view(np.ndarray)
+        return self._map
+
+    def _append(self, name: str, offset: int, data: bytes) -> None:
+        path = self.root / name
+        # Truncating at the committed size drops any bytes of an interrupted append.
+        with open(path, "r+b" if path.exists() else "wb") as f:
+            f.seek(offset)
+            f.write(data)
+            f.truncate()
+
+    def _read_meta(self) -> dict[str, Any]:
+        try:
+            meta: dict[str, Any] = json.loads((self.root / "meta.json").read_text("utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Ignoring unreadable embedding cache %s: %s", self.root, e)
+            return {}
+        if meta.get("model_id") != self.model_id:
+            logger.warning("Ignoring embedding cache %s written for another model", self.root)
+            return {}
+        return meta
+
+    def _write_meta(self) -> None:
+        meta = {"model_id": self.model_id, "dim": self.dim, "count": self.count}
+        tmp = self.root / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self.root / "meta.json")
+
+    def _read_keys(self) -> dict[str, int]:
+        if not self.count:
+            return {}
+        with open(self.root / "keys.txt", "rb") as f:
+            keys = f.read(self.count * 65).decode().split()
+        return {digest: row for row, digest in enumerate(keys)}
+
+
+class EmbeddingBatcher:
+    """Embed texts through the cache, calling the model only for unseen texts.
+
+    Callable with a list of texts, so it can be passed wherever an embedding
+    function is expected (e.g. ``VectorIndex.add_chunks``).
+    """
+
+    def __init__(
+        self,
+        embed: Embedder,
+        cache: EmbeddingCache,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be positive, got {max_batch_size}")
+        self.embed = embed
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.api_calls = 0
+        self.embedded = 0
+
+    def __call__(self, texts: Sequence[str]) -> FloatArray:
+        return self.encode(texts)
+
+    def encode(self, texts: Sequence[str]) -> FloatArray:
+        """Embeddings of ``texts`` in order, as an (n, dim) float32 array."""
+        return self.encode_documents({"": texts})[""]
+
+    def encode_documents(self, documents: Mapping[str, Sequence[str]]) -> dict[str, FloatArray]:
+        """Embeddings for the chunks of several documents, sharing one pass over the model."""
+        hashes = {doc: [text_hash(t) for t in texts] for doc, texts in documents.items()}
+        texts_by_hash: dict[str, str] = {}
+        for doc, texts in documents.items():
+            texts_by_hash.update(zip(hashes[doc], texts, strict=True))
+        unique = list(texts_by_hash)
+        vectors = dict(zip(unique, self.cache.get_hashes(unique), strict=True))
+        missing = [digest for digest, vector in vectors.items() if vector is None]
+        for start in range(0, len(missing), self.max_batch_size):
+            batch = missing[start : start + self.max_batch_size]
+            embedded = np.asarray(self.embed([texts_by_hash[d] for d in batch]), dtype=np.float32)
+            self.api_calls += 1
+            self.embedded += len(batch)
+            self.cache.put_hashes(batch, embedded)
+            # Return the stored float16 precision, as later cache hits will.
+            stored = embedded.astype(np.float16).astype(np.float32)
+            vectors.update(zip(batch, stored, strict=True))
+        dim = self.cache.dim or 0
+        return {
+            doc: np.array([vectors[d] for d in doc_hashes], dtype=np.float32).reshape(-1, dim)
+            for doc, doc_hashes in hashes.items()
+        }
@@ -0,0 +1,258 @@
+"""Content-addressed on-disk cache for text extraction results.
+
+Entries are keyed by the SHA-256 of the PDF bytes plus the canonicalized
+extraction ``steps`` and ``results_format``, so re-extracting an unchanged
+document with the same configuration returns the stored markdown without
+submitting a job. The cache is bounded in bytes and evicts least recently used
+entries first.
+
+Hashing a PDF that only lives in COS means downloading it, so the cache also
+remembers each remote object's digest by ETag and size (``digests.json``): an
+unchanged object is hashed once, not on every run.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, BinaryIO
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path("data/processed/extraction_cache")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_stream(chunks: Iterable[bytes]) -> str:
+    """Hex SHA-256 of a stream of byte chunks."""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_chunks(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterable[bytes]:
+    """Yield fixed-size chunks from a binary file-like object until EOF."""
+    while chunk := stream.read(chunk_size):
+        yield chunk
+
+
+def sha256_file(path: Path) -> str:
+    """Hex SHA-256 of a file, read in chunks."""
+    with open(path, "rb") as f:
+        return sha256_stream(iter_chunks(f))
+
+
+def cache_key(pdf_sha256: str, steps: dict[str, Any], results_format: str) -> str:
+    """Combine a document digest with its extraction configuration."""
+    canonical = json.dumps(
+        {"pdf_sha256": pdf_sha256, "steps": steps, "results_format": results_format},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters for one cache instance."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ExtractionCache:
+    """Size-bounded LRU cache of extraction output stored under ``root``.
+
+    Layout: ``objects/<2-char prefix>/<key>`` holds the content,
+    ``index.json`` records each entry's size and last access time and
+    ``digests.json`` the remembered digests of remote sources. Safe to share
+    between threads.
+    """
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, dict[str, float]] = OrderedDict()
+        self._digests: dict[str, dict[str, Any]] = {}
+        self._digests_changed = False
+        self._load_index()
+        self._load_digests()
+
+    def get(self, key: str) -> str | None:
+        """Return cached content for ``key`` or None, counting the hit or miss."""
+        with self._lock:
+            entry = self._index.get(key)
+            path = self._object_path(key)
+            if entry is None or not path.exists():
+                if entry is not None:
+                    self._drop(key)
+                self.stats.misses += 1
+                return None
+            entry["last_access"] = time.time()
+            self._index.move_to_end(key)
+        try:
+            content = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            # Evicted by another thread between the index check and the read.
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        with self._lock:
+            self.stats.hits += 1
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        """Store ``content`` under ``key``, evicting old entries to stay within budget."""
+        self._store(key, lambda tmp: tmp.write_text(content, encoding="utf-8"))
+
+    def put_many(self, items: Mapping[str, str]) -> None:
+        """Store several entries, writing the index once for the whole batch."""
+        stored = {}
+        for key, content in items.items():
+            size = self._write_object(key, partial(Path.write_text, data=content, encoding="utf-8"))
+            if size is not None:
+                stored[key] = size
+        if stored:
+            with self._lock:
+                for key, size in stored.items():
+                    self._record(key, size)
+                self._save_index()
+
+    def put_file(self, key: str, source: Path) -> None:
+        """Store a copy of an existing file under ``key``."""
+        self._store(key, lambda tmp: shutil.copyfile(source, tmp))
+
+    def digest(self, source: str, etag: str, size: int) -> str | None:
+        """SHA-256 remembered for ``source`` if it still has this ETag and size."""
+        with self._lock:
+            entry = self._digests.get(source)
+        if entry is None or entry["etag"] != etag or entry["size"] != size:
+            return None
+        return str(entry["sha256"])
+
+    def remember_digest(self, source: str, etag: str, size: int, sha256: str) -> None:
+        """Record the SHA-256 of ``source``'s current version; persisted on ``flush``."""
+        with self._lock:
+            self._digests[source] = {"etag": etag, "size": size, "sha256": sha256}
+            self._digests_changed = True
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def flush(self) -> None:
+        """Persist access times and digests recorded since the last write."""
+        with self._lock:
+            self._save_index()
+            if self._digests_changed:
+                self._write_json("digests.json", self._digests)
+                self._digests_changed = False
+
+    def _store(self, key: str, write: Callable[[Path], object]) -> None:
+        size = self._write_object(key, write)
+        if size is None:
+            return
+        with self._lock:
+            self._record(key, size)
+            self._save_index()
+
+    def _write_object(self, key: str, write: Callable[[Path], object]) -> int | None:
+        """Write an object file atomically; return its size, or None if over budget."""
+        path = self._object_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        tmp = Path(tmp_name)
+        try:
+            write(tmp)
+            size = tmp.stat().st_size
+            if size > self.max_bytes:
+                logger.info("Not caching %s: %d bytes exceeds cache budget", key, size)
+                return None
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return size
+
+    def _record(self, key: str, size: int) -> None:
+        """Add a written object to the index and evict to stay within budget (lock held)."""
+        if key in self._index:
+            self.stats.bytes -= int(self._index[key]["size"])
+            self.stats.entries -= 1
+        self._index[key] = {"size": size, "last_access": time.time()}
+        self._index.move_to_end(key)
+        self.stats.entries += 1
+        self.stats.bytes += size
+        while self.stats.bytes > self.max_bytes and len(self._index) > 1:
+            oldest = next(iter(self._index))
+            self._drop(oldest)
+            self._object_path(oldest).unlink(missing_ok=True)
+            self.stats.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._index.pop(key)
+        self.stats.entries -= 1
+        self.stats.bytes -= int(entry["size"])
+
+    def _object_path(self, key: str) -> Path:
+        return self.root / "objects" / key[:2] / key
+
+    def _load_index(self) -> None:
+        index_path = self.root / "index.json"
+        if not index_path.exists():
+            return
+        try:
+            entries = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Ignoring unreadable cache index %s: %s", index_path, e)
+            return
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]["last_access"]):
+            if self._object_path(key).exists():
+                self._index[key] = entry
+                self.stats.entries += 1
+                self.stats.bytes += int(entry["size"])
+
+    def _load_digests(self) -> None:
+        digests_path = self.root / "digests.json"
+        if not digests_path.exists():
+            return
+        try:
+            self._digests = json.loads(digests_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Ignoring unreadable digest map %s: %s", digests_path, e)
+
+    def _save_index(self) -> None:
+        self._write_json("index.json", self._index)
+
+    def _write_json(self, name: str, data: Mapping[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / name
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
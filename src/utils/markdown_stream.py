@@ -0,0 +1,217 @@
+"""Streaming download and incremental parsing of extraction markdown.
+
+Annual reports extract to megabytes of markdown. Instead of reading a result
+into memory (as bytes, then again as a decoded string), ``tee_lines`` copies a
+COS body to disk chunk by chunk while yielding decoded lines, and the parsers
+below turn any line iterator into headings, paragraphs, tables and sections on
+the fly. Peak memory is bounded by the largest single block, not the document.
+"""
+
+import codecs
+import os
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+from src.utils.extraction_cache import CHUNK_SIZE, iter_chunks
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_PAGE_MARKER = re.compile(r"^<!--\s*page:?\s*(\d+)\s*-->$")
+_SEPARATOR_ROW = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$")
+
+
+@dataclass
+class Heading:
+    """A ``#``-style heading."""
+
+    level: int
+    title: str
+    line: int
+    page: int | None = None
+
+
+@dataclass
+class Paragraph:
+    """Consecutive non-blank, non-table lines."""
+
+    text: str
+    line: int
+    page: int | None = None
+
+
+@dataclass
+class Table:
+    """A pipe table; ``header`` is empty when the table has no separator row."""
+
+    header: list[str]
+    rows: list[list[str]]
+    line: int
+    page: int | None = None
+
+    @property
+    def width(self) -> int:
+        """Number of columns."""
+        return len(self.header) if self.header else max((len(row) for row in self.rows), default=0)
+
+
+Block = Heading | Paragraph | Table
+
+
+@dataclass
+class Section:
+    """A heading and the paragraphs and tables up to the next heading."""
+
+    title: str
+    level: int
+    line: int
+    page: int | None = None
+    paragraphs: list[str] = field(default_factory=list)
+    tables: list[Table] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """Paragraph text of the section."""
+        return "\n\n".join(self.paragraphs)
+
+
+def iter_text(
+    chunks: Iterable[bytes], encoding: str = "utf-8", errors: str = "replace"
+) -> Iterator[str]:
+    """Decode byte chunks incrementally; multi-byte characters may span chunks."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    for chunk in chunks:
+        if text := decoder.decode(chunk):
+            yield text
+    if tail := decoder.decode(b"", final=True):
+        yield tail
+
+
+def iter_lines(texts: Iterable[str]) -> Iterator[str]:
+    """Re-split text chunks into lines (without line terminators)."""
+    pending = ""
+    for text in texts:
+        pending += text
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+def _copy_chunks(stream: BinaryIO, out: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    for chunk in iter_chunks(stream, chunk_size):
+        out.write(chunk)
+        yield chunk
+
+
+def tee_lines(
+    stream: BinaryIO, target: Path, chunk_size: int = CHUNK_SIZE, encoding: str = "utf-8"
+) -> Iterator[str]:
+    """Copy ``stream`` to ``target`` chunk by chunk while yielding its decoded lines.
+
+    Bytes are written as they arrive; ``target`` only appears (atomically) once
+    the stream is exhausted, so an interrupted download leaves no partial file.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.part")
+    try:
+        with open(tmp, "wb") as f:
+            yield from iter_lines(iter_text(_copy_chunks(stream, f, chunk_size), encoding))
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def read_lines(path: Path, encoding: str = "utf-8") -> Iterator[str]:
+    """Lines of a local markdown file, read lazily."""
+    with open(path, encoding=encoding, errors="replace") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+def page_marker(line: str) -> int | None:
+    """Page number of a ``<!-- page N -->`` marker line, else ``None``."""
+    marker = _PAGE_MARKER.match(line.strip())
+    return int(marker.group(1)) if marker else None
+
+
+def _cells(row: str) -> list[str]:
+    return [cell.strip() for cell in row.strip().strip("|").split("|")]
+
+
+def iter_blocks(lines: Iterable[str]) -> Iterator[Block]:
+    """Parse markdown lines into headings, paragraphs and tables as they stream in.
+
+    ``<!-- page N -->`` markers (as written by ``LocalExtractor``) set the
+    ``page`` of the blocks that follow.
+    """
+    page: int | None = None
+    paragraph: list[str] = []
+    paragraph_line = 0
+    table: list[str] = []
+    table_line = 0
+
+    def flush_paragraph() -> Iterator[Block]:
+        if paragraph:
+            yield Paragraph(" ".join(paragraph), paragraph_line, page)
+            paragraph.clear()
+
+    def flush_table() -> Iterator[Block]:
+        if table:
+            if len(table) >= 2 and _SEPARATOR_ROW.match(table[1].strip()):
+                yield Table(_cells(table[0]), [_cells(r) for r in table[2:]], table_line, page)
+            else:
+                yield Table([], [_cells(r) for r in table], table_line, page)
+            table.clear()
+
+    for number, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if line.startswith("|"):
+            yield from flush_paragraph()
+            if not table:
+                table_line = number
+            table.append(line)
+            continue
+        yield from flush_table()
+        if not line:
+            yield from flush_paragraph()
+        elif (marker := page_marker(line)) is not None:
+            yield from flush_paragraph()
+            page = marker
+        elif heading := _HEADING.match(line):
+            yield from flush_paragraph()
+            yield Heading(len(heading.group(1)), heading.group(2), number, page)
+        else:
+            if not paragraph:
+                paragraph_line = number
+            paragraph.append(line)
+    yield from flush_table()
+    yield from flush_paragraph()
+
+
+def iter_tables(lines: Iterable[str]) -> Iterator[Table]:
+    """Only the tables of a markdown stream."""
+    for block in iter_blocks(lines):
+        if isinstance(block, Table):
+            yield block
+
+
+def iter_sections(lines: Iterable[str]) -> Iterator[Section]:
+    """Group a markdown stream into sections, yielding each once it is complete.
+
+    Content before the first heading forms an untitled level-0 section.
+    """
+    section = Section("", 0, 1)
+    for block in iter_blocks(lines):
+        if isinstance(block, Heading):
+            if section.paragraphs or section.tables or section.title:
+                yield section
+            section = Section(block.title, block.level, block.line, block.page)
+        elif isinstance(block, Table):
+            section.tables.append(block)
+        else:
+            section.paragraphs.append(block.text)
+    if section.paragraphs or section.tables or section.title:
+        yield section
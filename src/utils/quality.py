@@ -0,0 +1,332 @@
+"""Single-pass financial keyword scanning and extraction quality scoring.
+
+``KeywordScanner`` compiles every term into one regular expression, longest
+alternative first, and scans lowercased text once regardless of how many terms
+there are. The regex only reports non-overlapping matches, so two tables built
+at compile time credit the rest: terms inside a match (``cost`` in ``costo``,
+``M$`` in ``MM$``) and terms starting inside a match and running past it
+(``pasivo`` after ``CLP`` in ``clpasivo``). Counts therefore equal per-term
+overlapping substring counts.
+
+``QualityAccumulator`` is fed lines as they stream in (e.g. through
+``BatchExtractionRunner(on_line=...)``) and grades the document and each page.
+"""
+
+import re
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.utils.markdown_stream import page_marker, read_lines
+
+FINANCIAL_TERMS = (
+    "ingreso",
+    "revenue",
+    "costo",
+    "cost",
+    "ganancia",
+    "profit",
+    "activo",
+    "asset",
+    "pasivo",
+    "liability",
+    "CLP",
+    "millones",
+    "million",
+    "M$",
+    "MM$",
+    "Carozzi",
+    "estado",
+    "financiero",
+    "financial",
+    "statement",
+)
+
+# (minimum characters, minimum distinct terms) per grade, best first.
+GRADE_THRESHOLDS = (("EXCELLENT", 1000, 6), ("GOOD", 500, 4))
+
+
+def grade(chars: int, distinct_terms: int) -> str:
+    """EXCELLENT, GOOD or POOR from text length and distinct financial terms found."""
+    for name, min_chars, min_terms in GRADE_THRESHOLDS:
+        if chars > min_chars and distinct_terms >= min_terms:
+            return name
+    return "POOR"
+
+
+@dataclass
+class ScanResult:
+    """Hit counts and start offsets per term."""
+
+    counts: Counter[str] = field(default_factory=Counter)
+    positions: dict[str, list[int]] = field(default_factory=dict)
+
+    @property
+    def found(self) -> list[str]:
+        """Terms with at least one hit."""
+        return [term for term, count in self.counts.items() if count]
+
+    def update(self, other: "ScanResult", offset: int = 0) -> None:
+        """Add ``other``'s hits, shifting its positions by ``offset``."""
+        self.counts.update(other.counts)
+        for term, starts in other.positions.items():
+            self.positions.setdefault(term, []).extend(start + offset for start in starts)
+
+
+class KeywordScanner:
+    """Count case-insensitive occurrences of many terms in one pass.
+
+    Matching is by substring, like ``term in text.lower()``; overlapping
+    occurrences all count. Offsets refer to the lowercased text, which differs
+    from the original only for the few characters whose lowercase form is longer.
+    """
+
+    def __init__(self, terms: Sequence[str] = FINANCIAL_TERMS) -> None:
+        if not terms:
+            raise ValueError("at least one term is required")
+        self.terms = list(dict.fromkeys(terms))
+        self._by_key = {term.lower(): term for term in self.terms}
+        keys = sorted(self._by_key, key=len, reverse=True)
+        self.max_length = len(keys[0])
+        # Terms lying entirely inside a match: key -> [(other, offset in key)].
+        self._contained: dict[str, list[tuple[str, int]]] = {
+            key: [
+                (other, start)
+                for other in keys
+                for start in range(len(key) - len(other) + 1)
+                if key.startswith(other, start) and (other, start) != (key, 0)
+            ]
+            for key in keys
+        }
+        # Terms starting inside a match and running past its end (a suffix of
+        # key equals a prefix of other): key -> [(other, overlap length)].
+        self._continued: dict[str, list[tuple[str, int]]] = {
+            key: [
+                (other, k)
+                for other in keys
+                for k in range(1, min(len(key), len(other)))
+                if key.endswith(other[:k])
+            ]
+            for key in keys
+        }
+        # Every term credited by one match of key, with its offset.
+        self._expanded = {
+            key: [(self._by_key[key], 0)]
+            + [(self._by_key[other], at) for other, at in self._contained[key]]
+            for key in keys
+        }
+        self._pattern = re.compile("|".join(re.escape(key) for key in keys))
+
+    def scan(
+        self, text: str, positions: bool = True, result: ScanResult | None = None
+    ) -> ScanResult:
+        """Scan a complete text, adding to ``result`` if given (positions are per text)."""
+        result = result if result is not None else ScanResult()
+        lowered = text.lower()
+        self._scan_into(lowered, 0, len(lowered), result, positions)
+        return result
+
+    def scan_stream(self, chunks: Iterable[str], positions: bool = True) -> ScanResult:
+        """Scan text arriving in chunks; terms spanning chunk boundaries are found.
+
+        Only the last ``2 * (max_length - 1)`` characters are carried between chunks.
+        """
+        result = ScanResult()
+        overlap = 2 * (self.max_length - 1)
+        buffer, base = "", 0
+        for chunk in chunks:
+            buffer += chunk.lower()
+            limit = len(buffer) - overlap
+            if limit <= 0:
+                continue
+            resume = self._scan_into(buffer, base, limit, result, positions)
+            cut = max(limit, resume)
+            buffer, base = buffer[cut:], base + cut
+        self._scan_into(buffer, base, len(buffer), result, positions)
+        return result
+
+    def _scan_into(
+        self, text: str, base: int, limit: int, result: ScanResult, positions: bool
+    ) -> int:
+        """Count matches starting before ``limit``; returns the end of the last one."""
+        resume = 0
+        matched: Counter[str] = Counter()
+        continued = self._continued
+        for match in self._pattern.finditer(text, 0, limit + self.max_length - 1):
+            start = match.start()
+            if start >= limit:
+                break
+            key = match.group()
+            matched[key] += 1
+            resume = start + len(key)
+            if positions:
+                for term, at in self._expanded[key]:
+                    result.positions.setdefault(term, []).append(base + start + at)
+            if continued[key]:
+                for other, k in continued[key]:
+                    if text.startswith(other, resume - k):
+                        term = self._by_key[other]
+                        result.counts[term] += 1
+                        if positions:
+                            result.positions.setdefault(term, []).append(base + resume - k)
+        for key, count in matched.items():
+            for term, _ in self._expanded[key]:
+                result.counts[term] += count
+        return resume
+
+
+@dataclass
+class PageQuality:
+    """Quality metrics of one page (``None`` when the text has no page markers)."""
+
+    page: int | None
+    chars: int = 0
+    words: int = 0
+    tables: int = 0
+    scan: ScanResult = field(default_factory=ScanResult, repr=False)
+
+    @property
+    def terms(self) -> Counter[str]:
+        """Hits per financial term on this page."""
+        return self.scan.counts
+
+    @property
+    def grade(self) -> str:
+        """Grade of this page alone."""
+        return grade(self.chars, len(+self.terms))
+
+
+@dataclass
+class QualityReport:
+    """Document-level quality with a per-page breakdown."""
+
+    chars: int
+    words: int
+    tables: int
+    table_rows: int
+    terms: Counter[str]
+    pages: list[PageQuality]
+    total_terms: int
+
+    @property
+    def found(self) -> list[str]:
+        """Distinct terms found anywhere, most frequent first."""
+        return [term for term, _ in self.terms.most_common() if self.terms[term]]
+
+    @property
+    def grade(self) -> str:
+        """EXCELLENT, GOOD or POOR for the whole document."""
+        return grade(self.chars, len(self.found))
+
+    @property
+    def weak_pages(self) -> list[int]:
+        """Numbered pages graded POOR."""
+        return [p.page for p in self.pages if p.page is not None and p.grade == "POOR"]
+
+
+class QualityAccumulator:
+    """Build a ``QualityReport`` from lines fed one at a time.
+
+    Lines are scanned in batches of about ``batch_chars`` characters; no term
+    contains a newline, so batching never creates or hides a match.
+    """
+
+    def __init__(self, scanner: KeywordScanner | None = None, batch_chars: int = 65536) -> None:
+        self.scanner = scanner or _default_scanner()
+        self.batch_chars = batch_chars
+        self.table_rows = 0
+        self._page = PageQuality(None)
+        self._pages: list[PageQuality] = []
+        self._in_table = False
+        self._batch: list[str] = []
+        self._batch_chars = 0
+
+    def feed(self, line: str) -> None:
+        """Account for one line of markdown (without its terminator)."""
+        number = page_marker(line)
+        if number is not None:
+            self._flush()
+            self._close_page()
+            self._page = PageQuality(number)
+            self._in_table = False
+            return
+        page = self._page
+        page.chars += len(line) + 1
+        page.words += len(line.split())
+        is_row = line.lstrip().startswith("|")
+        if is_row:
+            self.table_rows += 1
+            if not self._in_table:
+                page.tables += 1
+        self._in_table = is_row
+        self._batch.append(line)
+        self._batch_chars += len(line) + 1
+        if self._batch_chars >= self.batch_chars:
+            self._flush()
+
+    def feed_lines(self, lines: Iterable[str]) -> "QualityAccumulator":
+        """Feed many lines; returns ``self`` for chaining."""
+        for line in lines:
+            self.feed(line)
+        return self
+
+    def report(self) -> QualityReport:
+        """Snapshot of everything fed so far."""
+        self._flush()
+        pages = [*self._pages, self._page] if self._has_content(self._page) else list(self._pages)
+        terms: Counter[str] = Counter()
+        for page in pages:
+            terms.update(page.terms)
+        return QualityReport(
+            chars=sum(p.chars for p in pages),
+            words=sum(p.words for p in pages),
+            tables=sum(p.tables for p in pages),
+            table_rows=self.table_rows,
+            terms=terms,
+            pages=pages,
+            total_terms=len(self.scanner.terms),
+        )
+
+    def _flush(self) -> None:
+        if self._batch:
+            self.scanner.scan("\n".join(self._batch), positions=False, result=self._page.scan)
+            self._batch.clear()
+            self._batch_chars = 0
+
+    def _close_page(self) -> None:
+        if self._has_content(self._page):
+            self._pages.append(self._page)
+
+    @staticmethod
+    def _has_content(page: PageQuality) -> bool:
+        return page.chars > 0 or page.page is not None
+
+
+def assess_lines(lines: Iterable[str], scanner: KeywordScanner | None = None) -> QualityReport:
+    """Quality report for a stream of markdown lines."""
+    return QualityAccumulator(scanner).feed_lines(lines).report()
+
+
+def assess_file(path: Path, scanner: KeywordScanner | None = None) -> QualityReport:
+    """Quality report for a markdown file, read lazily."""
+    return assess_lines(read_lines(path), scanner)
+
+
+def iter_reports(
+    paths: Iterable[Path], scanner: KeywordScanner | None = None
+) -> Iterator[tuple[Path, QualityReport]]:
+    """Assess many files with one compiled scanner."""
+    scanner = scanner or _default_scanner()
+    for path in paths:
+        yield path, assess_file(path, scanner)
+
+
+_DEFAULT_SCANNER: KeywordScanner | None = None
+
+
+def _default_scanner() -> KeywordScanner:
+    global _DEFAULT_SCANNER
+    if _DEFAULT_SCANNER is None:
+        _DEFAULT_SCANNER = KeywordScanner()
+    return _DEFAULT_SCANNER
@@ -0,0 +1,353 @@
+"""Embedded IVF vector index over chunked extraction markdown.
+
+A local stand-in for the remote ``procurement-contracts-kb`` and
+``chilean-regulations-kb`` knowledge bases, so clause matching does not pay a
+network round trip per lookup. Extraction markdown is split into chunks per
+section (``chunk_markdown``), embedded by any batch embedding function, and
+stored on disk as raw row-major matrices that are memory-mapped for search:
+
+- ``vectors.bin``: unit-normalized float32 rows, or int8 rows with a float32
+  per-row scale in ``scales.bin`` (4x smaller);
+- ``lists.bin``: the inverted-list (IVF cell) of each row;
+- ``centroids.npy``: cell centroids from spherical k-means;
+- ``chunks.jsonl``: chunk metadata, one line per row;
+- ``meta.json``: row count and byte sizes, written last, so an interrupted
+  append is cut off on the next open.
+
+Appends only extend the files; new rows go to their nearest existing cell.
+Until there are enough rows to train ``n_lists`` cells the index is searched
+exhaustively. Queries are answered in batches: every query is scored against
+the centroids in one matrix product, and each probed cell is scored once for
+all the queries that probe it.
+"""
+
+import json
+import logging
+import os
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from src.utils.markdown_stream import iter_sections
+
+logger = logging.getLogger(__name__)
+
+FloatArray = NDArray[np.float32]
+IntArray = NDArray[np.int64]
+Embedder = Callable[[Sequence[str]], ArrayLike]
+
+DEFAULT_INDEX_DIR = Path("data/processed/vector_index")
+DTYPES = ("float32", "int8")
+# Rows per cell needed before the cells are trained.
+TRAIN_ROWS_PER_LIST = 16
+KMEANS_ITERATIONS = 10
+SCAN_BLOCK_ROWS = 65_536
+
+
+@dataclass
+class Chunk:
+    """A piece of a document small enough to embed."""
+
+    doc_id: str
+    section: str
+    text: str
+    line: int
+    page: int | None = None
+
+    @property
+    def embedding_text(self) -> str:
+        """Text sent to the embedding model (section title plus body)."""
+        return f"{self.section}\n{self.text}" if self.section else self.text
+
+
+def _split(text: str, max_chars: int) -> Iterable[str]:
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars)
+        cut = cut if cut > 0 else max_chars
+        yield text[:cut]
+        text = text[cut:].lstrip()
+    if text:
+        yield text
+
+
+def chunk_markdown(lines: Iterable[str], doc_id: str, max_chars: int = 1000) -> list[Chunk]:
+    """Split extraction markdown into chunks of at most ``max_chars`` per section.
+
+    Paragraphs are packed together up to the limit; longer paragraphs are cut
+    at word boundaries. Table rows become ``cell | cell`` lines.
+    """
+    chunks = []
+    for section in iter_sections(lines):
+        blocks = list(section.paragraphs)
+        for table in section.tables:
+            rows = [table.header, *table.rows] if table.header else table.rows
+            blocks.append("\n".join(" | ".join(row) for row in rows))
+        current = ""
+        for block in blocks:
+            for piece in _split(block, max_chars):
+                if current and len(current) + len(piece) + 2 > max_chars:
+                    chunks.append(Chunk(doc_id, section.title, current, section.line, section.page))
+                    current = ""
+                current = f"{current}\n\n{piece}" if current else piece
+        if current:
+            chunks.append(Chunk(doc_id, section.title, current, section.line, section.page))
+    return chunks
+
+
+def _normalize(vectors: ArrayLike) -> FloatArray:
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    normalized: FloatArray = matrix / np.maximum(norms, 1e-12)
+    return normalized
+
+
+def _top_k(scores: FloatArray, ids: IntArray, k: int) -> tuple[FloatArray, IntArray]:
+    if scores.size > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        scores, ids = scores[keep], ids[keep]
+    order = np.argsort(-scores, kind="stable")
+    return scores[order], ids[order]
+
+
+def _write_at(path: Path, offset: int, data: bytes) -> None:
+    """Write ``data`` at ``offset`` and drop anything after it (an interrupted append)."""
+    with open(path, "r+b" if path.exists() else "wb") as f:
+        f.seek(offset)
+        f.write(data)
+        f.truncate()
+
+
+class VectorIndex:
+    """Appendable, memory-mapped IVF index with cosine similarity.
+
+    Opening an existing directory restores it; ``dim`` and ``dtype`` must then
+    match (or be left as None).
+    """
+
+    def __init__(
+        self,
+        root: Path = DEFAULT_INDEX_DIR,
+        dim: int | None = None,
+        dtype: str = "float32",
+        n_lists: int = 64,
+        n_probe: int = 8,
+        seed: int = 0,
+    ) -> None:
+        self.root = root
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.seed = seed
+        meta = self._read_meta()
+        if meta:
+            if dim is not None and dim != meta["dim"]:
+                raise ValueError(f"index at {root} has dim {meta['dim']}, not {dim}")
+            self.dim, self.dtype = int(meta["dim"]), str(meta["dtype"])
+        else:
+            if dim is None:
+                raise ValueError("dim is required for a new index")
+            if dtype not in DTYPES:
+                raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}")
+            self.dim, self.dtype = dim, dtype
+        self.count = int(meta.get("count", 0))
+        self._metadata_bytes = int(meta.get("metadata_bytes", 0))
+        self.metadata = self._read_metadata()
+        self.centroids: FloatArray | None = None
+        if (root / "centroids.npy").exists():
+            self.centroids = np.load(root / "centroids.npy")
+        self._maps: dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def add(self, vectors: ArrayLike, metadata: Sequence[dict[str, Any]] | None = None) -> IntArray:
+        """Append vectors (and their metadata); return their row ids."""
+        matrix = _normalize(vectors)
+        if matrix.shape[1] != self.dim:
+            raise ValueError(f"expected {self.dim}-dimensional vectors, got {matrix.shape[1]}")
+        metadata = list(metadata) if metadata is not None else [{} for _ in matrix]
+        if len(metadata) != len(matrix):
+            raise ValueError("one metadata entry per vector is required")
+        self.root.mkdir(parents=True, exist_ok=True)
+        start, itemsize = self.count, np.dtype(self.dtype).itemsize
+        stored, scales = self._encode(matrix)
+        _write_at(self.root / "vectors.bin", start * self.dim * itemsize, stored.tobytes())
+        if scales is not None:
+            _write_at(self.root / "scales.bin", start * 4, scales.tobytes())
+        lists = self._assign(matrix) if self.centroids is not None else np.full(len(matrix), -1)
+        _write_at(self.root / "lists.bin", start * 4, lists.astype(np.int32).tobytes())
+        lines = "".join(json.dumps(m, ensure_ascii=False) + "\n" for m in metadata)
+        encoded = lines.encode("utf-8")
+        _write_at(self.root / "chunks.jsonl", self._metadata_bytes, encoded)
+
+        self.count += len(matrix)
+        self._metadata_bytes += len(encoded)
+        self.metadata.extend(metadata)
+        self._maps.clear()
+        self._write_meta()
+        if self.centroids is None and self.count >= TRAIN_ROWS_PER_LIST * self.n_lists:
+            self.train()
+        return np.arange(start, self.count, dtype=np.int64)
+
+    def add_chunks(self, chunks: Sequence[Chunk], embed: Embedder) -> IntArray:
+        """Embed chunks in one batch and append them."""
+        if not chunks:
+            return np.zeros(0, dtype=np.int64)
+        vectors = embed([chunk.embedding_text for chunk in chunks])
+        return self.add(vectors, [asdict(chunk) for chunk in chunks])
+
+    def train(self, iterations: int = KMEANS_ITERATIONS) -> None:
+        """Fit the cells with spherical k-means and reassign every row."""
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(self.count, self.n_lists * 256)
+        sample = self._decode(np.sort(rng.choice(self.count, sample_size, replace=False)))
+        n_lists = min(self.n_lists, len(sample))
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = ~np.bincount(assignment, minlength=n_lists).astype(bool)
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = _normalize(sums)
+        self.centroids = centroids
+        lists = np.concatenate(
+            [
+                self._assign(self._decode(np.arange(lo, min(lo + SCAN_BLOCK_ROWS, self.count))))
+                for lo in range(0, self.count, SCAN_BLOCK_ROWS)
+            ]
+        )
+        _write_at(self.root / "lists.bin", 0, lists.astype(np.int32).tobytes())
+        tmp = self.root / "centroids.tmp.npy"
+        np.save(tmp, centroids)
+        os.replace(tmp, self.root / "centroids.npy")
+        self._maps.clear()
+        logger.info("Trained %d cells over %d vectors", n_lists, self.count)
+
+    def search(
+        self, queries: ArrayLike, k: int = 5, n_probe: int | None = None
+    ) -> tuple[FloatArray, IntArray]:
+        """Top-``k`` cosine scores and row ids per query; ids are -1 where fewer match."""
+        matrix = _normalize(queries)
+        scores = np.full((len(matrix), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(matrix), k), -1, dtype=np.int64)
+        if self.count == 0:
+            return scores, ids
+        found: list[list[tuple[FloatArray, IntArray]]] = [[] for _ in matrix]
+        if self.centroids is None:
+            for lo in range(0, self.count, SCAN_BLOCK_ROWS):
+                rows = np.arange(lo, min(lo + SCAN_BLOCK_ROWS, self.count))
+                block = self._score(matrix, rows)
+                for q in range(len(matrix)):
+                    found[q].append(_top_k(block[q], rows, k))
+        else:
+            probes = min(n_probe or self.n_probe, len(self.centroids))
+            nearest = np.argpartition(-(matrix @ self.centroids.T), probes - 1, axis=1)
+            probed = nearest[:, :probes]
+            order, offsets = self._inverted_lists()
+            for cell in np.unique(probed):
+                rows = order[offsets[cell] : offsets[cell + 1]]
+                if rows.size == 0:
+                    continue
+                queries_here = np.nonzero((probed == cell).any(axis=1))[0]
+                block = self._score(matrix[queries_here], rows)
+                for j, query in enumerate(queries_here.tolist()):
+                    found[query].append((block[j], rows))
+        for q, parts in enumerate(found):
+            if not parts:
+                continue
+            top_scores, top_ids = _top_k(
+                np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]), k
+            )
+            scores[q, : len(top_scores)] = top_scores
+            ids[q, : len(top_ids)] = top_ids
+        return scores, ids
+
+    def query(
+        self, queries: ArrayLike, k: int = 5, n_probe: int | None = None
+    ) -> list[list[dict[str, Any]]]:
+        """Search and return the metadata of each hit with its ``score``."""
+        scores, ids = self.search(queries, k, n_probe)
+        return [
+            [
+                {**self.metadata[i], "score": float(s)}
+                for s, i in zip(row_scores.tolist(), row_ids.tolist(), strict=True)
+                if i >= 0
+            ]
+            for row_scores, row_ids in zip(scores, ids, strict=True)
+        ]
+
+    def _encode(self, matrix: FloatArray) -> tuple[NDArray[Any], FloatArray | None]:
+        if self.dtype == "float32":
+            return matrix, None
+        scales = np.maximum(np.abs(matrix).max(axis=1), 1e-12) / 127
+        quantized = np.round(matrix / scales[:, None]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def _decode(self, rows: NDArray[Any]) -> FloatArray:
+        vectors = np.asarray(self._map("vectors.bin", self.dtype, (self.count, self.dim))[rows])
+        if self.dtype == "float32":
+            decoded: FloatArray = vectors.astype(np.float32, copy=False)
+            return decoded
+        scales = self._map("scales.bin", "float32", (self.count,))[rows]
+        dequantized: FloatArray = vectors.astype(np.float32) * scales[:, None]
+        return dequantized
+
+    def _score(self, queries: FloatArray, rows: NDArray[Any]) -> FloatArray:
+        scores: FloatArray = queries @ self._decode(rows).T
+        return scores
+
+    def _assign(self, matrix: FloatArray) -> IntArray:
+        assert self.centroids is not None
+        assignment: IntArray = np.argmax(matrix @ self.centroids.T, axis=1).astype(np.int64)
+        return assignment
+
+    def _inverted_lists(self) -> tuple[IntArray, IntArray]:
+        if "inverted" not in self._maps:
+            assert self.centroids is not None
+            lists = self._map("lists.bin", "int32", (self.count,))
+            order = np.argsort(lists, kind="stable")
+            offsets = np.searchsorted(lists[order], np.arange(len(self.centroids) + 1))
+            self._maps["inverted"] = (order, offsets)
+        inverted: tuple[IntArray, IntArray] = self._maps["inverted"]
+        return inverted
+
+    def _map(self, name: str, dtype: str, shape: tuple[int, ...]) -> NDArray[Any]:
+        if name not in self._maps:
+            view = np.memmap(self.root / name, dtype=dtype, mode="r", shape=shape)
+            # A plain ndarray view of the mapping skips memmap.__getitem__ overhead.
+            self._maps[name] = view.view(np.ndarray)
+        mapped: NDArray[Any] = self._maps[name]
+        return mapped
+
+    def _read_meta(self) -> dict[str, Any]:
+        try:
+            meta: dict[str, Any] = json.loads((self.root / "meta.json").read_text("utf-8"))
+        except FileNotFoundError:
+            return {}
+        return meta
+
+    def _write_meta(self) -> None:
+        meta = {
+            "dim": self.dim,
+            "dtype": self.dtype,
+            "count": self.count,
+            "metadata_bytes": self._metadata_bytes,
+        }
+        tmp = self.root / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self.root / "meta.json")
+
+    def _read_metadata(self) -> list[dict[str, Any]]:
+        if not self.count:
+            return []
+        with open(self.root / "chunks.jsonl", "rb") as f:
+            data = f.read(self._metadata_bytes)
+        return [json.loads(line) for line in data.decode("utf-8").splitlines()]
@@ -0,0 +1,274 @@
+"""Shared fixtures for unit tests: in-memory COS and watsonx stand-ins, test PDFs."""
+
+import hashlib
+import io
+import itertools
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pymupdf
+import pytest
+
+
+class FakeCOSClient:
+    """Minimal in-memory stand-in for the ``ibm_boto3`` S3 client.
+
+    Supports single-part and multipart uploads with S3-style ETags. Part numbers
+    listed in ``fail_parts`` raise once when uploaded.
+    """
+
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+        self.etags: dict[str, str] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.fail_parts: set[int] = set()
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+        self._upload_ids = itertools.count(1)
+
+    def put_object(self, Bucket: str, Key: str, Body: Any) -> dict[str, Any]:  # noqa: ARG002
+        data = Body.read() if hasattr(Body, "read") else bytes(Body)
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        with self._lock:
+            self.calls.append("put_object")
+            self.objects[Key] = data
+            self.etags[Key] = etag
+        return {"ETag": etag}
+
+    def create_multipart_upload(self, Bucket: str, Key: str) -> dict[str, Any]:  # noqa: ARG002
+        with self._lock:
+            self.calls.append("create_multipart_upload")
+            upload_id = f"upload-{next(self._upload_ids)}"
+            self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(
+        self,
+        Bucket: str,  # noqa: ARG002
+        Key: str,  # noqa: ARG002
+        UploadId: str,
+        PartNumber: int,
+        Body: bytes,
+    ) -> dict[str, Any]:
+        with self._lock:
+            self.calls.append("upload_part")
+            if PartNumber in self.fail_parts:
+                self.fail_parts.discard(PartNumber)
+                raise ConnectionError(f"simulated failure uploading part {PartNumber}")
+            self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {"ETag": f'"{hashlib.md5(Body).hexdigest()}"'}
+
+    def list_parts(
+        self,
+        Bucket: str,  # noqa: ARG002
+        Key: str,  # noqa: ARG002
+        UploadId: str,
+        PartNumberMarker: int = 0,
+        MaxParts: int = 1000,
+    ) -> dict[str, Any]:
+        with self._lock:
+            self.calls.append("list_parts")
+            if UploadId not in self.uploads:
+                raise KeyError(f"NoSuchUpload: {UploadId}")
+            numbers = sorted(n for n in self.uploads[UploadId] if n > PartNumberMarker)
+            page = numbers[:MaxParts]
+            parts = [
+                {
+                    "PartNumber": n,
+                    "ETag": f'"{hashlib.md5(self.uploads[UploadId][n]).hexdigest()}"',
+                    "Size": len(self.uploads[UploadId][n]),
+                }
+                for n in page
+            ]
+        response: dict[str, Any] = {"Parts": parts, "IsTruncated": len(numbers) > MaxParts}
+        if response["IsTruncated"]:
+            response["NextPartNumberMarker"] = page[-1]
+        return response
+
+    def complete_multipart_upload(
+        self,
+        Bucket: str,  # noqa: ARG002
+        Key: str,
+        UploadId: str,
+        MultipartUpload: dict[str, Any],
+    ) -> dict[str, Any]:
+        with self._lock:
+            self.calls.append("complete_multipart_upload")
+            stored = self.uploads.pop(UploadId)
+            numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+            data = b"".join(stored[n] for n in numbers)
+            digests = b"".join(hashlib.md5(stored[n]).digest() for n in numbers)
+            etag = f'"{hashlib.md5(digests).hexdigest()}-{len(numbers)}"'
+            self.objects[Key] = data
+            self.etags[Key] = etag
+        return {"ETag": etag}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str) -> dict[str, Any]:  # noqa: ARG002
+        with self._lock:
+            self.calls.append("abort_multipart_upload")
+            self.uploads.pop(UploadId, None)
+        return {}
+
+    def get_object(self, Bucket: str, Key: str) -> dict[str, Any]:  # noqa: ARG002
+        with self._lock:
+            self.calls.append("get_object")
+            if Key not in self.objects:
+                raise KeyError(f"NoSuchKey: {Key}")
+            data = self.objects[Key]
+        return {"Body": io.BytesIO(data), "ContentLength": len(data)}
+
+    def head_object(self, Bucket: str, Key: str) -> dict[str, Any]:  # noqa: ARG002
+        with self._lock:
+            self.calls.append("head_object")
+            if Key not in self.objects:
+                raise KeyError(f"NoSuchKey: {Key}")
+            data = self.objects[Key]
+            etag = self.etags.get(Key, f'"{hashlib.md5(data).hexdigest()}"')
+        return {"ETag": etag, "ContentLength": len(data)}
+
+    def list_objects_v2(
+        self,
+        Bucket: str,  # noqa: ARG002
+        Prefix: str = "",
+        MaxKeys: int = 1000,
+        ContinuationToken: str | None = None,
+        Delimiter: str | None = None,
+    ) -> dict[str, Any]:
+        with self._lock:
+            self.calls.append("list_objects_v2")
+            keys = sorted(k for k in self.objects if k.startswith(Prefix))
+        # With a delimiter, keys sharing the next path segment roll up into one prefix.
+        entries: list[tuple[str, bool]] = []
+        for key in keys:
+            rest = key[len(Prefix) :]
+            if Delimiter and Delimiter in rest:
+                common = Prefix + rest.split(Delimiter, 1)[0] + Delimiter
+                if not entries or entries[-1] != (common, True):
+                    entries.append((common, True))
+            else:
+                entries.append((key, False))
+        start = int(ContinuationToken) if ContinuationToken else 0
+        page = entries[start : start + MaxKeys]
+        response: dict[str, Any] = {"KeyCount": len(page), "IsTruncated": False}
+        contents = [
+            {"Key": k, "Size": len(self.objects[k]), "ETag": self._etag(k)}
+            for k, is_prefix in page
+            if not is_prefix
+        ]
+        if contents:
+            response["Contents"] = contents
+        if any(is_prefix for _, is_prefix in page):
+            response["CommonPrefixes"] = [{"Prefix": k} for k, is_prefix in page if is_prefix]
+        if start + MaxKeys < len(entries):
+            response["IsTruncated"] = True
+            response["NextContinuationToken"] = str(start + MaxKeys)
+        return response
+
+    def _etag(self, key: str) -> str:
+        return self.etags.get(key) or f'"{hashlib.md5(self.objects[key]).hexdigest()}"'
+
+
+class FakeExtractionClient:
+    """Stand-in for ``TextExtractionsV2`` whose jobs finish after a few polls.
+
+    On completion the job writes ``# <input path>`` as markdown to the output
+    key in the given COS stand-in, mimicking the real service.
+    """
+
+    def __init__(self, cos: FakeCOSClient, polls_to_complete: int = 2) -> None:
+        self.cos = cos
+        self.polls_to_complete = polls_to_complete
+        self.jobs: dict[str, dict[str, Any]] = {}
+        self.fail_inputs: set[str] = set()
+        self.max_in_flight = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def run_job(
+        self,
+        document_reference: dict[str, Any],
+        results_reference: dict[str, Any],
+        steps: dict[str, Any],
+        results_format: str,
+    ) -> dict[str, Any]:
+        with self._lock:
+            job_id = f"job-{next(self._ids)}"
+            self.jobs[job_id] = {
+                "input": document_reference["location"]["path"],
+                "output": results_reference["location"]["path"],
+                "steps": steps,
+                "results_format": results_format,
+                "polls": 0,
+                "state": "submitted",
+            }
+            in_flight = sum(j["state"] not in ("completed", "failed") for j in self.jobs.values())
+            self.max_in_flight = max(self.max_in_flight, in_flight)
+        return {"metadata": {"id": job_id}, "entity": {"status": {"state": "submitted"}}}
+
+    def get_job_details(self, job_id: str) -> dict[str, Any]:
+        with self._lock:
+            job = self.jobs[job_id]
+            job["polls"] += 1
+            if job["state"] in ("completed", "failed"):
+                pass
+            elif job["input"] in self.fail_inputs:
+                job["state"] = "failed"
+            elif job["polls"] >= self.polls_to_complete:
+                job["state"] = "completed"
+                self.cos.objects[job["output"]] = f"# {job['input']}\n".encode()
+            else:
+                job["state"] = "running"
+            status: dict[str, Any] = {"state": job["state"]}
+            if job["state"] == "failed":
+                status["failure"] = {"message": "simulated failure"}
+        return {"metadata": {"id": job_id}, "entity": {"status": status}}
+
+
+@pytest.fixture
+def cos_client() -> FakeCOSClient:
+    """Empty in-memory COS bucket."""
+    return FakeCOSClient()
+
+
+@pytest.fixture
+def extraction_client(cos_client: FakeCOSClient) -> FakeExtractionClient:
+    """Extraction stand-in writing results into ``cos_client``."""
+    return FakeExtractionClient(cos_client)
+
+
+TABLE_ROWS = [
+    ["Cuenta", "2023", "2022"],
+    ["Ingresos", "3.200", "2.900"],
+    ["Costos", "-2.100", "-1.950"],
+]
+
+
+def make_pdf(path: Path, layout: str) -> Path:
+    """Build a PDF from a layout string: ``t`` text page, ``T`` text + table, ``s`` scan."""
+    doc = pymupdf.open()
+    for number, kind in enumerate(layout, start=1):
+        page = doc.new_page()
+        if kind == "s":
+            pixmap = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 60, 80), False)
+            pixmap.set_rect(pixmap.irect, (200, 200, 200))
+            page.insert_image(page.rect, pixmap=pixmap)
+            continue
+        page.insert_text((72, 72), f"Página {number}", fontsize=14)
+        page.insert_text((72, 100), "Estado de resultados consolidado en millones de CLP")
+        if kind == "T":
+            for r, row in enumerate(TABLE_ROWS):
+                for c, cell in enumerate(row):
+                    rect = pymupdf.Rect(72 + c * 120, 150 + r * 20, 192 + c * 120, 170 + r * 20)
+                    page.draw_rect(rect, color=(0, 0, 0), width=0.5)
+                    page.insert_text((rect.x0 + 3, rect.y1 - 6), cell, fontsize=9)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def pdf_factory(tmp_path: Path) -> Callable[[str, str], Path]:
+    """Build test PDFs in ``tmp_path`` from a name and a page layout string."""
+    return lambda name, layout: make_pdf(tmp_path / name, layout)
@@ -0,0 +1,170 @@
+"""Tests for the pooled async HTTP layer using httpx.MockTransport."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.integrations.async_http import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AsyncHTTP,
+    CircuitOpenError,
+    RetryPolicy,
+)
+
+pytestmark = pytest.mark.unit
+
+
+async def no_sleep(seconds):  # noqa: ARG001
+    return None
+
+
+def make_http(handler, **kwargs) -> AsyncHTTP:
+    kwargs.setdefault("sleep", no_sleep)
+    return AsyncHTTP(transport=httpx.MockTransport(handler), seed=1, **kwargs)
+
+
+def test_retries_failure_statuses_for_idempotent_methods_only():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) in (1, 2, 4):
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"ok": True})
+
+    async def scenario():
+        async with make_http(handler) as http:
+            response = await http.get("https://api.stlouisfed.org/fred")
+            post = await http.request("POST", "https://api.stlouisfed.org/fred")
+            return response, post, http.retries
+
+    response, post, retries = asyncio.run(scenario())
+
+    assert response.json() == {"ok": True}
+    assert post.status_code == 503
+    assert calls == ["GET", "GET", "GET", "POST"]
+    assert retries == 2
+
+
+@pytest.mark.parametrize("error", [httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout])
+def test_unsent_requests_are_retried_even_for_posts(error):
+    attempts = []
+
+    def handler(request):
+        attempts.append(request.url.host)
+        if len(attempts) == 1:
+            raise error("request not sent", request=request)
+        if len(attempts) == 3:
+            raise httpx.ReadTimeout("slow", request=request)
+        return httpx.Response(200)
+
+    async def scenario():
+        async with make_http(handler) as http:
+            first = await http.request("POST", "https://hooks.slack.com/x")
+            with pytest.raises(httpx.ReadTimeout):
+                await http.request("POST", "https://hooks.slack.com/x")
+            return first
+
+    assert asyncio.run(scenario()).status_code == 200
+    assert len(attempts) == 3
+
+
+def test_circuit_breaker_opens_and_probes_after_reset():
+    now = [0.0]
+    healthy = [False]
+
+    def handler(request):  # noqa: ARG001
+        return httpx.Response(200 if healthy[0] else 500)
+
+    async def scenario():
+        http = make_http(
+            handler,
+            failure_threshold=3,
+            reset_timeout=10,
+            clock=lambda: now[0],
+            retry=RetryPolicy(attempts=1),
+        )
+        async with http:
+            for _ in range(3):
+                await http.get("https://down.example/x")
+            breaker = http.breaker("down.example")
+            assert breaker.state == OPEN
+            with pytest.raises(CircuitOpenError):
+                await http.get("https://down.example/x")
+            assert (await http.get("https://up.example/x")).status_code == 500
+
+            now[0] = 10
+            assert breaker.state == HALF_OPEN
+            healthy[0] = True
+            assert (await http.get("https://down.example/x")).status_code == 200
+            assert breaker.state == CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_throttling_counts_against_the_breaker():
+    statuses = iter([503, 429, 429])
+
+    def handler(request):  # noqa: ARG001
+        return httpx.Response(next(statuses, 200))
+
+    async def scenario():
+        http = make_http(handler, failure_threshold=3, retry=RetryPolicy(attempts=1))
+        async with http:
+            for _ in range(3):
+                await http.get("https://api.stlouisfed.org/fred")
+            with pytest.raises(CircuitOpenError):
+                await http.get("https://api.stlouisfed.org/fred")
+            return http.breaker("api.stlouisfed.org").failures
+
+    assert asyncio.run(scenario()) == 3
+
+
+def test_per_host_concurrency_limit():
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def handler(request):
+        host = request.url.host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return httpx.Response(200)
+
+    async def scenario():
+        async with make_http(handler, per_host=2) as http:
+            urls = [f"https://{host}/{i}" for host in ("a.example", "b.example") for i in range(6)]
+            return await http.get_many(urls)
+
+    responses = asyncio.run(scenario())
+
+    assert len(responses) == 12
+    assert peak == {"a.example": 2, "b.example": 2}
+
+
+def test_hedged_get_returns_the_faster_attempt():
+    calls = []
+
+    async def handler(request):  # noqa: ARG001
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(2.0)
+            return httpx.Response(200, text="slow")
+        return httpx.Response(200, text="fast")
+
+    async def scenario():
+        async with make_http(handler, hedge_after=0.05) as http:
+            started = time.perf_counter()
+            response = await http.get("https://api.example/series")
+            return response.text, time.perf_counter() - started, http.hedges
+
+    text, elapsed, hedges = asyncio.run(scenario())
+
+    assert text == "fast"
+    assert elapsed < 1.0
+    assert hedges == 1
@@ -0,0 +1,100 @@
+"""Tests for the rolling-origin backtesting harness."""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.predictive.backtest import (
+    BacktestRunner,
+    BacktestSeries,
+    rolling_origin_folds,
+    score,
+)
+from src.utils.extraction_cache import ExtractionCache
+
+pytestmark = pytest.mark.unit
+
+
+def quarters(count: int) -> list[str]:
+    return [f"{2015 + q // 4}Q{q % 4 + 1}" for q in range(count)]
+
+
+def make_series(count: int, commodity: str = "cocoa_price", seed: int = 1) -> BacktestSeries:
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0, 10, count)
+    y = -0.16 * x + rng.normal(0, 0.3, count)
+    return BacktestSeries(commodity, "gross_margin", quarters(count), x, y)
+
+
+def test_rolling_origin_folds():
+    expanding = rolling_origin_folds(10, min_train=6, horizon=2, step=1)
+    sliding = rolling_origin_folds(10, min_train=6, window=4)
+
+    assert [(f.train, f.test) for f in expanding] == [
+        (slice(0, 6), slice(6, 8)),
+        (slice(0, 7), slice(7, 9)),
+        (slice(0, 8), slice(8, 10)),
+    ]
+    assert [f.train for f in sliding] == [slice(2, 6), slice(3, 7), slice(4, 8), slice(5, 9)]
+    with pytest.raises(ValueError):
+        rolling_origin_folds(10, min_train=1)
+
+
+def test_score():
+    scores = score([1.0, 2.0, 3.0], [1.0, 2.0, 5.0])
+
+    assert scores["mae"] == pytest.approx(2 / 3)
+    assert scores["rmse"] == pytest.approx(np.sqrt(4 / 3))
+    assert scores["r2"] == pytest.approx(1 - 4 / 2)
+    assert np.isnan(score([1.0], [2.0])["r2"])
+
+
+def test_linear_models_beat_the_mean_baseline():
+    report = BacktestRunner(min_train=8).run([make_series(36)])
+
+    assert len(report.results) == 3 * 28
+    first = report.results[0]
+    assert (first.model, first.train_periods, first.test_periods) == (
+        "linear",
+        ("2015Q1", "2016Q4"),
+        ["2017Q1"],
+    )
+    summary = report.summary()
+    assert summary["cocoa_price", "gross_margin", "coefficient"]["r2"] > 0.9
+    assert summary["cocoa_price", "gross_margin", "mean"]["r2"] < 0.1
+    assert report.best_models()["cocoa_price", "gross_margin"] in {"linear", "coefficient"}
+
+
+def test_new_quarter_only_fits_new_folds(tmp_path):
+    cache = ExtractionCache(tmp_path / "cache")
+    runner = BacktestRunner(min_train=8, cache=cache)
+    latest = make_series(41)
+    history = [
+        BacktestSeries(
+            "cocoa_price", "gross_margin", latest.periods[:40], latest.x[:40], latest.y[:40]
+        ),
+        make_series(40, "wheat_price", seed=2),
+    ]
+
+    first = runner.run(history)
+    again = BacktestRunner(min_train=8, cache=ExtractionCache(tmp_path / "cache")).run(history)
+    grown = runner.run([latest, history[1]])
+
+    assert first.computed == 2 * 3 * 32
+    assert again.computed == 0
+    assert [r.mae for r in again.results] == [r.mae for r in first.results]
+    assert grown.computed == 3
+    assert len(json.loads((tmp_path / "cache" / "index.json").read_text())) == 2 * 3 * 32 + 3
+    assert {r.test_periods[0] for r in grown.results if not r.cached} == {"2025Q1"}
+
+
+def test_process_pool_matches_inline_run():
+    series = [make_series(20), make_series(20, "wheat_price", seed=3)]
+
+    inline = BacktestRunner(min_train=8).run(series)
+    pooled = BacktestRunner(min_train=8, workers=2).run(series)
+
+    assert [(r.model, r.fold, r.params) for r in pooled.results] == [
+        (r.model, r.fold, r.params) for r in inline.results
+    ]
@@ -0,0 +1,129 @@
+"""Tests for the concurrent batch extraction runner."""
+
+from pathlib import Path
+
+import pytest
+
+from src.integrations.cos_upload import MultipartUploader
+from src.integrations.text_extraction import COSConnection
+from src.orchestration.batch_extraction import (
+    BatchExtractionRunner,
+    discover_cos_inputs,
+    discover_local_inputs,
+    output_key_for,
+)
+
+pytestmark = pytest.mark.unit
+
+CONNECTION = COSConnection("https://cos.example", "key", "secret", "bucket")
+
+
+def make_runner(extraction_client, cos_client, tmp_path: Path, **kwargs) -> BatchExtractionRunner:
+    return BatchExtractionRunner(
+        extraction_client,
+        cos_client,
+        CONNECTION,
+        output_dir=tmp_path,
+        min_poll_interval=0.001,
+        **kwargs,
+    )
+
+
+def test_output_key_mirrors_input_layout():
+    assert output_key_for("financials/EEFF_Anual_2023.pdf") == (
+        "extractions/financials/EEFF_Anual_2023.md"
+    )
+
+
+def test_runs_all_jobs_and_saves_results(extraction_client, cos_client, tmp_path):
+    keys = [f"financials/EEFF_Anual_{year}.pdf" for year in range(2015, 2024)]
+    completed = []
+    runner = make_runner(
+        extraction_client, cos_client, tmp_path, max_concurrency=3, on_complete=completed.append
+    )
+
+    tasks = runner.run(keys)
+
+    assert [t.input_key for t in tasks] == keys
+    assert all(t.succeeded for t in tasks)
+    assert len(completed) == len(keys)
+    assert extraction_client.max_in_flight <= 3
+    saved = (tmp_path / "financials" / "EEFF_Anual_2015.md").read_text(encoding="utf-8")
+    assert saved == "# financials/EEFF_Anual_2015.pdf\n"
+
+
+def test_failed_job_does_not_block_batch(extraction_client, cos_client, tmp_path):
+    extraction_client.fail_inputs.add("contracts/bad.pdf")
+    runner = make_runner(extraction_client, cos_client, tmp_path)
+
+    tasks = runner.run(["contracts/bad.pdf", "contracts/good.pdf"])
+
+    assert tasks[0].state == "failed"
+    assert "simulated failure" in (tasks[0].error or "")
+    assert tasks[1].succeeded
+
+
+def test_discover_cos_inputs_follows_pagination(cos_client):
+    for i in range(5):
+        cos_client.objects[f"financials/{i}.pdf"] = b"%PDF"
+    cos_client.objects["financials/notes.txt"] = b"x"
+    original = cos_client.list_objects_v2
+    cos_client.list_objects_v2 = lambda **kw: original(**{**kw, "MaxKeys": 2})
+
+    keys = discover_cos_inputs(cos_client, "bucket", prefix="financials/")
+
+    assert keys == [f"financials/{i}.pdf" for i in range(5)]
+
+
+def test_discover_local_inputs_uses_upload_layout(tmp_path):
+    (tmp_path / "financials").mkdir()
+    (tmp_path / "financials" / "EEFF_Anual_2022.pdf").write_bytes(b"%PDF")
+
+    keys = discover_local_inputs(str(tmp_path / "financials" / "*.pdf"))
+
+    assert keys == ["financials/EEFF_Anual_2022.pdf"]
+
+
+def test_recursive_globs_key_by_path_below_the_glob_root(tmp_path):
+    for folder in ("financials", "2022/financials", "2023/financials"):
+        (tmp_path / folder).mkdir(parents=True, exist_ok=True)
+        (tmp_path / folder / "EEFF_Anual.pdf").write_bytes(b"%PDF")
+
+    keys = discover_local_inputs(str(tmp_path / "**" / "*.pdf"))
+
+    assert keys == [
+        "2022/financials/EEFF_Anual.pdf",
+        "2023/financials/EEFF_Anual.pdf",
+        "financials/EEFF_Anual.pdf",
+    ]
+    assert discover_local_inputs(str(tmp_path / "*" / "*.pdf")) == ["financials/EEFF_Anual.pdf"]
+
+
+def test_uploads_go_through_the_multipart_uploader(extraction_client, cos_client, tmp_path):
+    pdf = tmp_path / "scan.pdf"
+    pdf.write_bytes(b"%PDF-1.7 " + b"x" * 40)
+    uploader = MultipartUploader(cos_client, "bucket", part_size=16, state_dir=tmp_path / "state")
+    runner = make_runner(extraction_client, cos_client, tmp_path / "out", uploader=uploader)
+
+    [task] = runner.run(["contracts/scan.pdf"], {"contracts/scan.pdf": pdf}, upload=True)
+
+    assert task.succeeded
+    assert cos_client.objects["contracts/scan.pdf"] == pdf.read_bytes()
+    assert cos_client.calls.count("upload_part") == 4
+
+
+def test_results_stream_to_disk_and_line_hook(extraction_client, cos_client, tmp_path):
+    seen = []
+    runner = make_runner(
+        extraction_client,
+        cos_client,
+        tmp_path,
+        on_line=lambda task, line: seen.append((task.input_key, line)),
+    )
+
+    (task,) = runner.run(["financials/EEFF_Anual_2023.pdf"])
+
+    assert task.succeeded
+    assert seen == [("financials/EEFF_Anual_2023.pdf", "# financials/EEFF_Anual_2023.pdf")]
+    assert task.local_path.read_text(encoding="utf-8") == "# financials/EEFF_Anual_2023.pdf\n"
+    assert task.chars == len("# financials/EEFF_Anual_2023.pdf\n")
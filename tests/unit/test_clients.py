@@ -0,0 +1,127 @@
+"""Tests for the shared client registry and IAM token cache."""
+
+import threading
+import time
+
+import httpx
+import pytest
+
+from src.integrations.clients import ClientRegistry, IAMTokenManager
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def iam_transport(requests: list[httpx.Request], expires_in: int = 3600, clock=time.time):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        now = clock()
+        return httpx.Response(
+            200,
+            json={
+                "access_token": f"token-{len(requests)}",
+                "token_type": "Bearer",
+                "expires_in": expires_in,
+                "expiration": now + expires_in,
+            },
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_token_is_cached_until_refresh_margin():
+    clock = FakeClock()
+    requests: list[httpx.Request] = []
+    http = httpx.Client(transport=iam_transport(requests, clock=clock))
+    manager = IAMTokenManager(
+        "key", http_client=http, refresh_margin=60, background_refresh=False, clock=clock
+    )
+
+    assert manager.get_token() == "token-1"
+    clock.now += 3000
+    assert manager.get_token() == "token-1"
+    assert len(requests) == 1
+    assert b"apikey=key" in requests[0].content
+
+    clock.now += 541  # inside the 60 s margin before expiry
+    assert manager.get_token() == "token-2"
+    assert manager.fetch_count == 2
+
+
+def test_concurrent_callers_share_one_token_request():
+    requests: list[httpx.Request] = []
+    http = httpx.Client(transport=iam_transport(requests))
+    manager = IAMTokenManager("key", http_client=http, background_refresh=False)
+
+    tokens: list[str] = []
+    threads = [
+        threading.Thread(target=lambda: tokens.append(manager.get_token())) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tokens == ["token-1"] * 8
+    assert len(requests) == 1
+
+
+def test_background_refresh_replaces_token_before_expiry():
+    requests: list[httpx.Request] = []
+    http = httpx.Client(transport=iam_transport(requests, expires_in=2))
+    # Margin of 1 s on a 2 s token schedules the refresh after the 1 s minimum delay.
+    manager = IAMTokenManager("key", http_client=http, refresh_margin=1)
+    try:
+        assert manager.get_token() == "token-1"
+        deadline = time.monotonic() + 5
+        while manager.fetch_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert manager.fetch_count >= 2
+    finally:
+        manager.close()
+
+
+def test_failed_token_request_raises():
+    http = httpx.Client(transport=httpx.MockTransport(lambda _: httpx.Response(400)))
+    manager = IAMTokenManager("bad", http_client=http, background_refresh=False)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        manager.get_token()
+
+
+def test_registry_builds_each_client_once_across_threads():
+    built: list[str] = []
+    lock = threading.Lock()
+
+    def cos_factory(env):
+        with lock:
+            built.append(env["COS_ENDPOINT"])
+        time.sleep(0.01)
+        return object()
+
+    registry = ClientRegistry(
+        env={"COS_ENDPOINT": "https://cos.example"},
+        cos_factory=cos_factory,
+        extraction_factory=lambda _env: object(),
+    )
+    clients: list[object] = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(registry.cos_client())) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert built == ["https://cos.example"]
+    assert all(client is clients[0] for client in clients)
+    assert registry.extraction_client() is registry.extraction_client()
+    assert registry.token_manager() is registry.token_manager()
+    registry.close()
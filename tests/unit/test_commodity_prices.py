@@ -0,0 +1,208 @@
+"""Tests for the cached, rate-limited FRED client against a local HTTP stub."""
+
+import asyncio
+import json
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+from src.integrations.async_http import AsyncHTTP, RetryPolicy
+from src.integrations.commodity_prices import (
+    FRED_OBSERVATIONS_URL,
+    CommodityPriceClient,
+    SeriesCache,
+    TokenBucket,
+)
+
+pytestmark = pytest.mark.unit
+
+HISTORY = {
+    "PCOCOUSDM": [("2024-01-01", "4228.1"), ("2024-02-01", "5644.9"), ("2024-03-01", ".")],
+    "PWHEAMTUSDM": [("2024-01-01", "275.4"), ("2024-02-01", "263.0")],
+}
+# Series the stub answers with 503 Service Unavailable.
+FAILING = {"PSOILUSDM"}
+
+
+class FredStub(BaseHTTPRequestHandler):
+    requests: list[dict[str, str]] = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/fred/series/observations":
+            self.send_error(404)
+            return
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        FredStub.requests.append(query)
+        if query["series_id"] in FAILING:
+            self.send_error(503)
+            return
+        start = query.get("observation_start", "0000")
+        observations = [
+            {"date": day, "value": value}
+            for day, value in HISTORY.get(query["series_id"], [])
+            if day >= start
+        ]
+        body = json.dumps({"observations": observations}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fred():
+    FredStub.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FredStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/fred/series/observations"
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(url, tmp_path, clock=None, **kwargs):
+    clock = clock or [0.0]
+    return CommodityPriceClient(
+        api_key="test",
+        cache=SeriesCache(tmp_path),
+        base_url=url,
+        clock=lambda: clock[0],
+        **kwargs,
+    )
+
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        bucket.acquire()
+
+    assert slept == [pytest.approx(0.5), pytest.approx(0.5)]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+
+def test_reads_are_served_from_the_cache(fred, tmp_path):
+    clock = [0.0]
+    with make_client(fred, tmp_path, clock) as client:
+        assert client.get_cocoa_price() == pytest.approx(5644.9)
+        assert client.latest("PCOCOUSDM") == (date(2024, 2, 1), 5644.9)
+        assert client.observations("cocoa_price", since=date(2024, 2, 1)) == [
+            (date(2024, 2, 1), 5644.9)
+        ]
+
+        assert len(FredStub.requests) == 1
+        assert "observation_start" not in FredStub.requests[0]
+        assert (tmp_path / "PCOCOUSDM.csv").read_text().splitlines() == [
+            "date,value",
+            "2024-01-01,4228.1",
+            "2024-02-01,5644.9",
+        ]
+
+
+def test_incremental_fetch_after_max_age(fred, tmp_path):
+    clock = [0.0]
+    with make_client(fred, tmp_path, clock, max_age=60) as client:
+        client.refresh(["cocoa_price"])
+        HISTORY["PCOCOUSDM"].append(("2024-04-01", "9876.5"))
+        try:
+            clock[0] = 30
+            assert client.refresh(["cocoa_price"]) == {}
+            clock[0] = 61
+            assert client.refresh(["cocoa_price"]) == {"PCOCOUSDM": 1}
+        finally:
+            HISTORY["PCOCOUSDM"].pop()
+
+    assert FredStub.requests[-1]["observation_start"] == "2024-02-02"
+    restored = SeriesCache(tmp_path)
+    assert restored.last_date("PCOCOUSDM") == date(2024, 4, 1)
+    assert restored.append("PCOCOUSDM", [(date(2024, 1, 1), 1.0)]) == 0
+
+
+def test_batched_refresh_spends_one_token_per_series(fred, tmp_path):
+    bucket = TokenBucket(rate=1e-6, capacity=2)
+    with make_client(fred, tmp_path, bucket=bucket) as client:
+        added = client.refresh(["cocoa_price", "PCOCOUSDM", "wheat_price"])
+
+        assert added == {"PCOCOUSDM": 2, "PWHEAMTUSDM": 2}
+        assert sorted(r["series_id"] for r in FredStub.requests) == ["PCOCOUSDM", "PWHEAMTUSDM"]
+        assert bucket.try_acquire() > 0
+        rows = client.event_rows("wheat_price", unit="USD/mt")
+
+    assert rows[0] == {
+        "event_date": date(2024, 1, 1),
+        "event_type": "wheat_price",
+        "value": 275.4,
+        "unit": "USD/mt",
+        "source": "FRED:PWHEAMTUSDM",
+    }
+
+
+def test_http_errors_leave_the_cache_unchanged(fred, tmp_path):
+    with make_client(fred.replace("observations", "missing"), tmp_path) as broken:
+        assert broken.refresh(["cocoa_price"]) == {}
+        assert "404" in broken.errors["PCOCOUSDM"]
+    assert not (tmp_path / "PCOCOUSDM.csv").exists()
+
+    with make_client(fred, tmp_path) as client:
+        assert client.refresh(["UNKNOWN"]) == {"UNKNOWN": 0}
+        with pytest.raises(LookupError, match="UNKNOWN"):
+            client.latest("UNKNOWN")
+
+
+def test_reads_fall_back_to_the_cache_when_fred_fails(fred, tmp_path):
+    clock = [0.0]
+    SeriesCache(tmp_path).append("PSOILUSDM", [(date(2024, 1, 1), 1010.5)])
+    retry = RetryPolicy(attempts=2, backoff=0.0)
+    with make_client(fred, tmp_path, clock, max_age=60, retry=retry) as client:
+        assert client.latest("vegetable_oil_price") == (date(2024, 1, 1), 1010.5)
+        assert "503" in client.errors["PSOILUSDM"]
+        added = client.refresh(["vegetable_oil_price", "wheat_price"], force=True)
+        clock[0] = 30
+        client.latest("vegetable_oil_price")
+
+    assert added == {"PWHEAMTUSDM": 2}
+    # Two reads and one refresh, each retried once.
+    assert [r["series_id"] for r in FredStub.requests].count("PSOILUSDM") == 4
+
+
+def test_reads_do_not_wait_for_a_token(fred, tmp_path):
+    def sleep(seconds):
+        raise AssertionError(f"read slept {seconds}s")
+
+    SeriesCache(tmp_path).append("PCOCOUSDM", [(date(2024, 1, 1), 4228.1)])
+    bucket = TokenBucket(rate=1e-6, capacity=1, sleep=sleep)
+    assert bucket.try_acquire() == 0.0
+    with make_client(fred, tmp_path, bucket=bucket) as client:
+        assert client.get_cocoa_price() == pytest.approx(4228.1)
+    assert FredStub.requests == []
+
+
+def test_refresh_async_shares_the_callers_http_client(tmp_path):
+    def handler(request):
+        series_id = request.url.params["series_id"]
+        observations = [{"date": day, "value": value} for day, value in HISTORY[series_id]]
+        return httpx.Response(200, json={"observations": observations})
+
+    client = make_client(FRED_OBSERVATIONS_URL, tmp_path)
+
+    async def scenario():
+        async with AsyncHTTP(transport=httpx.MockTransport(handler)) as http:
+            return await client.refresh_async(["cocoa_price", "wheat_price"], http=http)
+
+    assert asyncio.run(scenario()) == {"PCOCOUSDM": 2, "PWHEAMTUSDM": 2}
+    assert client.request_count == 2
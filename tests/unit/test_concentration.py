@@ -0,0 +1,131 @@
+"""Tests for the incremental supplier concentration index."""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.orchestration.concentration import ActiveContract, ConcentrationIndex
+from src.orchestration.guardrails import ESCALATE, PASS, check_supplier_concentration
+
+pytestmark = pytest.mark.unit
+
+
+def cocoa_index() -> ConcentrationIndex:
+    return ConcentrationIndex(
+        [
+            ActiveContract("c1", "cocoa", "76.111.111-1", 600_000, date(2025, 6, 30)),
+            ActiveContract("c2", "cocoa", "76.222.222-2", 300_000),
+            ActiveContract("c3", "cocoa", "76.111.111-1", 100_000, date(2025, 3, 31)),
+            ActiveContract("w1", "wheat", "76.333.333-3", 500_000),
+        ]
+    )
+
+
+def brute_share(index: ConcentrationIndex, commodity: str, supplier: str) -> float:
+    contracts = [c for c in index.contracts.values() if c.commodity == commodity]
+    total = sum(c.amount for c in contracts)
+    return 100 * sum(c.amount for c in contracts if c.supplier == supplier) / total
+
+
+def test_shares_and_what_ifs():
+    index = cocoa_index()
+
+    assert index.share("cocoa", "76.111.111-1") == pytest.approx(70.0)
+    assert index.share("wheat", "76.333.333-3") == pytest.approx(100.0)
+    assert index.share("soy", "anyone") == 0.0
+    assert index.what_if("cocoa", "76.222.222-2", 1_000_000) == pytest.approx(65.0)
+    assert index.what_if("cocoa", "76.111.111-1", 0, replaces="c1") == pytest.approx(25.0)
+    assert index.top_suppliers("cocoa") == [
+        ("76.111.111-1", pytest.approx(70.0)),
+        ("76.222.222-2", pytest.approx(30.0)),
+    ]
+
+
+def test_amend_expire_and_remove_keep_totals_exact():
+    index = cocoa_index()
+
+    index.amend("c2", amount=900_000, expires=date(2025, 1, 31))
+    assert index.share("cocoa", "76.222.222-2") == pytest.approx(
+        brute_share(index, "cocoa", "76.222.222-2")
+    )
+
+    expired = index.expire(date(2025, 3, 31))
+    assert [c.contract_id for c in expired] == ["c2", "c3"]
+    assert index.share("cocoa", "76.111.111-1") == pytest.approx(100.0)
+    assert index.expire(date(2025, 3, 31)) == []
+
+    index.remove("c1")
+    assert index.commodity_totals["cocoa"] == pytest.approx(0.0)
+    assert index.top_suppliers("cocoa") == []
+    with pytest.raises(ValueError, match="already indexed"):
+        index.add(ActiveContract("w1", "wheat", "x", 1.0))
+
+
+def test_rejected_amendment_keeps_the_contract():
+    index = cocoa_index()
+
+    with pytest.raises(ValueError, match="negative amount"):
+        index.amend("c2", amount=-1.0)
+
+    assert index.contracts["c2"].amount == 300_000
+    assert index.commodity_totals["cocoa"] == pytest.approx(1_000_000)
+    assert index.share("cocoa", "76.222.222-2") == pytest.approx(30.0)
+
+
+@pytest.mark.parametrize("amount", [float("nan"), float("inf"), -float("inf")])
+def test_non_finite_amounts_are_rejected(amount):
+    index = cocoa_index()
+
+    with pytest.raises(ValueError, match="non-finite amount"):
+        index.add(ActiveContract("c9", "cocoa", "76.111.111-1", amount))
+    with pytest.raises(ValueError, match="non-finite amount"):
+        index.amend("c2", amount=amount)
+
+    assert "c9" not in index.contracts
+    assert index.contracts["c2"].amount == 300_000
+    assert index.commodity_totals["cocoa"] == pytest.approx(1_000_000)
+
+
+def test_rfq_batch_what_ifs():
+    index = cocoa_index()
+    lines = [
+        ("cocoa", "76.222.222-2", 1_000_000),
+        ("cocoa", "76.222.222-2", 500_000),
+        ("wheat", "76.444.444-4", 500_000),
+        ("soy", "76.555.555-5", 10),
+    ]
+
+    alone = index.what_if_batch(lines)
+    together = index.what_if_batch(lines, together=True)
+
+    np.testing.assert_allclose(alone, [index.what_if(*line) for line in lines])
+    np.testing.assert_allclose(together, [72.0, 72.0, 50.0, 100.0])
+    assert index.what_if_batch([]).shape == (0,)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = cocoa_index()
+    path = tmp_path / "index.json"
+
+    index.save(path)
+    restored = ConcentrationIndex.load(path)
+
+    assert restored.contracts == index.contracts
+    assert restored.commodity_totals == index.commodity_totals
+    assert [c.contract_id for c in restored.expire(date(2025, 12, 31))] == ["c3", "c1"]
+    path.write_text("{oops")
+    assert len(ConcentrationIndex.load(path)) == 0
+    assert len(ConcentrationIndex.load(tmp_path / "missing.json")) == 0
+
+
+def test_risk_check_uses_the_index_when_the_share_is_not_given():
+    index = cocoa_index()
+    contract = {"commodity": "cocoa", "supplier_rut": "76.222.222-2", "value_usd": 100_000}
+
+    assert check_supplier_concentration(contract, index=index).status == PASS
+    outcome = check_supplier_concentration({**contract, "value_usd": 2_000_000}, index=index)
+    assert outcome.status == ESCALATE
+    assert outcome.details["share_pct"] == pytest.approx(230 / 3)
+    given = check_supplier_concentration({**contract, "supplier_share_pct": 10.0}, index=index)
+    assert given.status == PASS
@@ -0,0 +1,67 @@
+"""Tests for the paginated COS listing generators."""
+
+import pytest
+
+from src.integrations.cos_listing import (
+    iter_bucket,
+    iter_common_prefixes,
+    iter_objects,
+    iter_objects_parallel,
+)
+
+pytestmark = pytest.mark.unit
+
+PREFIXES = ["contracts/", "financials/", "regulations/", "generated_reports/"]
+
+
+@pytest.fixture
+def document_store(cos_client):
+    for prefix in PREFIXES:
+        for i in range(25):
+            cos_client.objects[f"{prefix}doc_{i:03d}.pdf"] = b"%PDF"
+    cos_client.objects["README.txt"] = b"store"
+    return cos_client
+
+
+def test_iter_objects_follows_continuation_tokens(document_store):
+    keys = [obj["Key"] for obj in iter_objects(document_store, "bucket", "contracts/", page_size=7)]
+
+    assert keys == [f"contracts/doc_{i:03d}.pdf" for i in range(25)]
+    assert document_store.calls.count("list_objects_v2") == 4
+
+
+def test_iter_objects_is_lazy(document_store):
+    objects = iter_objects(document_store, "bucket", page_size=10)
+    next(objects)
+
+    assert document_store.calls.count("list_objects_v2") == 1
+
+
+def test_common_prefixes(document_store):
+    assert sorted(iter_common_prefixes(document_store, "bucket")) == sorted(PREFIXES)
+
+
+def test_parallel_listing_covers_every_prefix(document_store):
+    keys = {
+        obj["Key"] for obj in iter_objects_parallel(document_store, "bucket", PREFIXES, page_size=4)
+    }
+
+    assert len(keys) == 100
+    assert all(key.endswith(".pdf") for key in keys)
+
+
+def test_parallel_listing_propagates_errors(document_store):
+    def broken(**_kwargs):
+        raise PermissionError("AccessDenied")
+
+    document_store.list_objects_v2 = broken
+
+    with pytest.raises(PermissionError):
+        list(iter_objects_parallel(document_store, "bucket", PREFIXES))
+
+
+def test_iter_bucket_fans_out_over_subdirectories(document_store):
+    keys = [obj["Key"] for obj in iter_bucket(document_store, "bucket", page_size=3)]
+
+    assert keys[0] == "README.txt"
+    assert len(keys) == 101 and len(set(keys)) == 101
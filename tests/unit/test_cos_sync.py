@@ -0,0 +1,70 @@
+"""Tests for skip-unchanged COS sync."""
+
+import os
+
+import pytest
+
+from src.integrations import cos_sync
+from src.integrations.cos_sync import COSSync, SyncManifest, covering_prefixes
+from src.integrations.cos_upload import MultipartUploader
+
+pytestmark = pytest.mark.unit
+
+PART = 1024
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    files = []
+    for name, size in [("EEFF_Anual_2022.pdf", 300), ("EEFF_Anual_2023.pdf", PART * 3 + 5)]:
+        path = tmp_path / "financials" / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(os.urandom(size))
+        files.append((path, f"financials/{name}"))
+    return files
+
+
+def make_sync(cos_client, tmp_path) -> COSSync:
+    uploader = MultipartUploader(cos_client, "bucket", part_size=PART, state_dir=tmp_path / "state")
+    return COSSync(uploader, SyncManifest(tmp_path / "manifest.json"))
+
+
+def test_covering_prefixes_merges_nested_directories():
+    keys = ["contracts/a.pdf", "contracts/templates/b.pdf", "financials/c.pdf"]
+    assert covering_prefixes(keys) == ["contracts/", "financials/"]
+
+
+def test_second_run_uploads_nothing(cos_client, tmp_path, corpus):
+    first = make_sync(cos_client, tmp_path).sync(corpus)
+    assert len(first.plan.upload) == 2 and not first.failed
+
+    second = make_sync(cos_client, tmp_path).sync(corpus)
+
+    assert second.plan.upload == []
+    assert len(second.plan.unchanged) == 2
+    assert second.listing_calls == 1
+    assert cos_client.calls.count("put_object") == 1
+    assert cos_client.calls.count("create_multipart_upload") == 1
+
+
+def test_changed_content_with_same_size_is_uploaded(cos_client, tmp_path, corpus):
+    make_sync(cos_client, tmp_path).sync(corpus)
+    path, key = corpus[0]
+    path.write_bytes(os.urandom(path.stat().st_size))
+
+    report = make_sync(cos_client, tmp_path).sync(corpus)
+
+    assert report.plan.upload == [(path, key, "content changed")]
+    assert cos_client.objects[key] == path.read_bytes()
+
+
+def test_cached_manifest_skips_listing_and_hashing(cos_client, tmp_path, corpus, monkeypatch):
+    make_sync(cos_client, tmp_path).sync(corpus)
+    hashed = []
+    monkeypatch.setattr(cos_sync, "expected_etag", lambda *args: hashed.append(args) or "unused")
+
+    report = make_sync(cos_client, tmp_path).sync(corpus, refresh=False)
+
+    assert report.listing_calls == 0
+    assert report.plan.upload == []
+    assert hashed == []
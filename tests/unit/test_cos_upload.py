@@ -0,0 +1,95 @@
+"""Tests for the streaming multipart COS uploader."""
+
+import os
+import threading
+
+import pytest
+
+from src.integrations.cos_upload import MultipartUploader
+
+pytestmark = pytest.mark.unit
+
+PART = 1024
+
+
+def make_file(tmp_path, name: str, size: int):
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return path
+
+
+def make_uploader(cos_client, tmp_path, **kwargs) -> MultipartUploader:
+    return MultipartUploader(
+        cos_client, "bucket", part_size=PART, state_dir=tmp_path / "state", **kwargs
+    )
+
+
+def test_small_file_uses_single_put(cos_client, tmp_path):
+    path = make_file(tmp_path, "small.pdf", PART // 2)
+
+    result = make_uploader(cos_client, tmp_path).upload_file(path, "contracts/small.pdf")
+
+    assert result.succeeded and result.parts == 1
+    assert cos_client.objects["contracts/small.pdf"] == path.read_bytes()
+    assert "create_multipart_upload" not in cos_client.calls
+
+
+def test_multipart_upload_bounds_parts_in_flight(cos_client, tmp_path):
+    path = make_file(tmp_path, "big.pdf", PART * 10 + 17)
+    active, peak = 0, 0
+    lock = threading.Lock()
+    original = cos_client.upload_part
+
+    def tracking_upload_part(**kwargs):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        try:
+            return original(**kwargs)
+        finally:
+            with lock:
+                active -= 1
+
+    cos_client.upload_part = tracking_upload_part
+
+    result = make_uploader(cos_client, tmp_path, max_workers=3).upload_file(path, "big.pdf")
+
+    assert result.succeeded and result.parts == 11
+    assert cos_client.objects["big.pdf"] == path.read_bytes()
+    assert cos_client.etags["big.pdf"].endswith('-11"')
+    assert peak <= 3
+    assert not list((tmp_path / "state").glob("*.json"))
+
+
+def test_interrupted_upload_resumes_from_completed_parts(cos_client, tmp_path):
+    path = make_file(tmp_path, "scan.pdf", PART * 5)
+    uploader = make_uploader(cos_client, tmp_path, max_workers=1)
+    cos_client.fail_parts.add(3)
+
+    first = uploader.upload_file(path, "financials/scan.pdf")
+    assert not first.succeeded
+    assert "financials/scan.pdf" not in cos_client.objects
+
+    calls_before = cos_client.calls.count("upload_part")
+    second = uploader.upload_file(path, "financials/scan.pdf")
+
+    assert second.succeeded
+    assert second.resumed_parts == 4
+    assert cos_client.calls.count("upload_part") - calls_before == 1
+    assert cos_client.objects["financials/scan.pdf"] == path.read_bytes()
+
+
+def test_upload_files_reports_each_file(cos_client, tmp_path):
+    items = [
+        (make_file(tmp_path, f"{i}.pdf", PART * i + 1), f"financials/{i}.pdf") for i in range(4)
+    ]
+    reported = []
+
+    results = make_uploader(cos_client, tmp_path).upload_files(items, on_complete=reported.append)
+
+    assert [r.key for r in results] == [key for _, key in items]
+    assert all(r.succeeded for r in results)
+    assert len(reported) == 4
+    for path, key in items:
+        assert cos_client.objects[key] == path.read_bytes()
@@ -0,0 +1,105 @@
+"""Tests for the embedding cache and deduplicating batcher."""
+
+import numpy as np
+import pytest
+
+from src.utils.embedding_cache import EmbeddingBatcher, EmbeddingCache, text_hash
+from src.utils.vector_index import VectorIndex, chunk_markdown
+
+pytestmark = pytest.mark.unit
+
+DIM = 8
+
+
+class StubModel:
+    """Deterministic pseudo-embeddings that record every request."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return np.array(
+            [np.random.default_rng(int(text_hash(t)[:8], 16)).normal(size=DIM) for t in texts]
+        )
+
+
+def test_cache_round_trip_in_float16(tmp_path):
+    cache = EmbeddingCache("ibm/slate-125m-english-rtrvr-v2", tmp_path)
+    vectors = np.array([[0.1] * DIM, [1 / 3] * DIM])
+
+    cache.put_many(["clause a", "clause b"], vectors)
+    cache.put_many(["clause a"], vectors[:1] * 2)
+
+    assert len(cache) == 2
+    assert "clause a" in cache and "clause c" not in cache
+    assert (
+        tmp_path / "ibm--slate-125m-english-rtrvr-v2" / "vectors.f16"
+    ).stat().st_size == 2 * DIM * 2
+    reopened = EmbeddingCache("ibm/slate-125m-english-rtrvr-v2", tmp_path)
+    np.testing.assert_allclose(reopened.get("clause b"), vectors[1], rtol=1e-3)
+    np.testing.assert_array_equal(reopened.get("clause a"), cache.get("clause a"))
+    assert reopened.get("clause c") is None
+    assert (reopened.stats.hits, reopened.stats.misses, reopened.disk_reads) == (2, 1, 2)
+    with pytest.raises(ValueError, match="dim"):
+        cache.put_many(["clause c"], np.zeros((1, DIM + 1)))
+
+
+def test_models_do_not_share_entries(tmp_path):
+    EmbeddingCache("model-a", tmp_path).put_many(["text"], np.ones((1, DIM)))
+
+    assert EmbeddingCache("model-b", tmp_path).get("text") is None
+    assert EmbeddingCache("model-a", tmp_path).get("text") is not None
+
+
+def test_lru_keeps_recent_vectors_in_memory(tmp_path):
+    cache = EmbeddingCache("m", tmp_path, max_memory_entries=2)
+    cache.put_many(["a", "b", "c"], np.eye(3, DIM))
+
+    assert cache.stats.evictions == 1
+    cache.get("b")
+    cache.get("c")
+    assert cache.disk_reads == 0
+    np.testing.assert_array_equal(cache.get("a"), np.eye(3, DIM)[0])
+    assert cache.disk_reads == 1
+    cache.get("b")
+    assert cache.disk_reads == 2
+
+
+def test_batcher_dedupes_across_documents_and_fills_batches(tmp_path):
+    model = StubModel()
+    batcher = EmbeddingBatcher(model, EmbeddingCache("m", tmp_path), max_batch_size=3)
+    documents = {
+        "contract-1": ["price clause", "termination", "force majeure", "termination"],
+        "contract-2": ["price clause", "penalties", "governing law", "jurisdiction"],
+    }
+
+    vectors = batcher.encode_documents(documents)
+
+    assert [len(b) for b in model.batches] == [3, 3]
+    assert batcher.embedded == 6
+    assert vectors["contract-1"].shape == (4, DIM)
+    np.testing.assert_array_equal(vectors["contract-1"][0], vectors["contract-2"][0])
+    np.testing.assert_array_equal(vectors["contract-1"][1], vectors["contract-1"][3])
+
+    again = batcher.encode(documents["contract-2"])
+    assert batcher.api_calls == 2
+    np.testing.assert_array_equal(again, vectors["contract-2"])
+    assert batcher.encode([]).shape == (0, DIM)
+
+
+def test_reindexing_reuses_cached_embeddings(tmp_path):
+    markdown = "# Price\n\nIndexed to cocoa futures.\n\n# Termination\n\nNinety days notice.\n"
+    model = StubModel()
+    batcher = EmbeddingBatcher(model, EmbeddingCache("m", tmp_path / "cache"))
+    chunks = chunk_markdown(markdown.splitlines(), "contract-1")
+
+    first = VectorIndex(tmp_path / "v1", dim=DIM)
+    first.add_chunks(chunks, batcher)
+    rebuilt = VectorIndex(tmp_path / "v2", dim=DIM)
+    rebuilt.add_chunks(chunks, batcher)
+
+    assert len(model.batches) == 1
+    query = batcher.encode([chunks[1].embedding_text])
+    assert first.query(query, k=1)[0][0]["section"] == "Termination"
+    assert rebuilt.query(query, k=1) == first.query(query, k=1)
@@ -0,0 +1,136 @@
+"""Tests for the content-addressed extraction cache."""
+
+from pathlib import Path
+
+import pytest
+
+from src.integrations.text_extraction import DEFAULT_STEPS, COSConnection
+from src.orchestration.batch_extraction import BatchExtractionRunner
+from src.utils.extraction_cache import ExtractionCache, cache_key, sha256_file
+
+pytestmark = pytest.mark.unit
+
+
+def test_key_ignores_step_ordering_but_not_content():
+    steps_a = {"ocr": {"enabled": True, "languages": ["en", "es"]}, "table_processing": {}}
+    steps_b = {"table_processing": {}, "ocr": {"languages": ["en", "es"], "enabled": True}}
+
+    assert cache_key("abc", steps_a, "markdown") == cache_key("abc", steps_b, "markdown")
+    assert cache_key("abc", steps_a, "markdown") != cache_key("abc", steps_a, "json")
+    assert cache_key("abc", steps_a, "markdown") != cache_key("abd", steps_a, "markdown")
+
+
+def test_hit_miss_counters_and_persistence(tmp_path):
+    cache = ExtractionCache(tmp_path)
+    assert cache.get("k1") is None
+    cache.put("k1", "# EEFF 2023")
+
+    assert cache.get("k1") == "# EEFF 2023"
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    reopened = ExtractionCache(tmp_path)
+    assert reopened.get("k1") == "# EEFF 2023"
+    assert reopened.stats.entries == 1
+
+
+def test_object_evicted_during_read_counts_as_miss(tmp_path, monkeypatch):
+    cache = ExtractionCache(tmp_path)
+    cache.put("k1", "# EEFF 2023")
+    original = Path.read_text
+
+    def evicted(path, *args, **kwargs):
+        if path.name == "k1":
+            raise FileNotFoundError(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", evicted)
+
+    assert cache.get("k1") is None
+    assert (cache.stats.hits, cache.stats.misses) == (0, 1)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ExtractionCache(tmp_path, max_bytes=25)
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    cache.get("a")
+    cache.put("c", "z" * 10)
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.stats.evictions == 1
+    assert cache.stats.bytes == 20
+
+
+def test_put_many_writes_the_index_once(tmp_path, monkeypatch):
+    cache = ExtractionCache(tmp_path, max_bytes=25)
+    saves = []
+    monkeypatch.setattr(cache, "_save_index", lambda: saves.append(cache.stats.entries))
+
+    cache.put_many({"a": "x" * 10, "b": "y" * 10, "c": "z" * 10, "big": "w" * 30})
+
+    assert saves == [2]
+    assert "a" not in cache and "big" not in cache
+    assert cache.get("c") == "z" * 10
+
+
+def test_runner_skips_submission_on_cache_hit(extraction_client, cos_client, tmp_path):
+    pdf = tmp_path / "EEFF_Anual_2023.pdf"
+    pdf.write_bytes(b"%PDF-1.7 annual report")
+    cos_client.objects["financials/EEFF_Anual_2023.pdf"] = pdf.read_bytes()
+    cache = ExtractionCache(tmp_path / "cache")
+    lines = []
+    runner = BatchExtractionRunner(
+        extraction_client,
+        cos_client,
+        COSConnection("https://cos.example", "key", "secret", "bucket"),
+        output_dir=tmp_path / "out",
+        min_poll_interval=0.001,
+        cache=cache,
+        on_line=lambda task, line: lines.append((task.state, line)),
+    )
+
+    first = runner.run(["financials/EEFF_Anual_2023.pdf"])
+    second = runner.run(
+        ["financials/EEFF_Anual_2023.pdf"], sources={"financials/EEFF_Anual_2023.pdf": pdf}
+    )
+
+    assert first[0].state == "downloaded"
+    assert second[0].state == "cached"
+    assert second[0].succeeded
+    assert second[0].chars == first[0].chars > 0
+    assert [line for state, line in lines if state == "completed"] == [
+        line for state, line in lines if state == "pending"
+    ]
+    assert len(extraction_client.jobs) == 1
+    assert cache.stats.hits == 1
+    assert second[0].cache_key == cache_key(sha256_file(pdf), DEFAULT_STEPS, "markdown")
+
+
+def test_cos_inputs_are_hashed_once_per_version(extraction_client, cos_client, tmp_path):
+    key = "financials/EEFF_Anual_2023.pdf"
+    cos_client.put_object(Bucket="bucket", Key=key, Body=b"%PDF-1.7 annual report")
+
+    def run():
+        runner = BatchExtractionRunner(
+            extraction_client,
+            cos_client,
+            COSConnection("https://cos.example", "key", "secret", "bucket"),
+            output_dir=tmp_path / "out",
+            min_poll_interval=0.001,
+            cache=ExtractionCache(tmp_path / "cache"),
+        )
+        cos_client.calls.clear()
+        return runner.run([key])[0]
+
+    assert run().state == "downloaded"
+    # A fresh cache instance reads the persisted digest: no download to hash it.
+    cached = run()
+    assert cached.state == "cached"
+    assert cos_client.calls == ["head_object"]
+
+    cos_client.put_object(Bucket="bucket", Key=key, Body=b"%PDF-1.7 restated report")
+    changed = run()
+    assert changed.state == "downloaded"
+    assert changed.cache_key != cached.cache_key
+    assert cos_client.calls[:2] == ["head_object", "get_object"]
@@ -0,0 +1,160 @@
+"""Tests for the asyncio guardrails engine."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.integrations.rut import RUTValidator, demo_lookup
+from src.orchestration.guardrails import (
+    BLOCK,
+    CANCELLED,
+    ERROR,
+    ESCALATE,
+    PASS,
+    TIMEOUT,
+    Check,
+    CheckOutcome,
+    GuardrailsEngine,
+    approval_tier,
+    default_checks,
+)
+
+pytestmark = pytest.mark.unit
+
+CONTRACT = {
+    "value_usd": 2_300_000,
+    "supplier_rut": "12.345.678-5",
+    "supplier_share_pct": 100.0,
+    "commodity": "cocoa",
+}
+
+
+def sleeper(seconds: float, status: str = PASS):
+    async def check(contract):  # noqa: ARG001
+        await asyncio.sleep(seconds)
+        return CheckOutcome(status, approvers=("board",) if status == BLOCK else ())
+
+    return check
+
+
+@pytest.mark.parametrize(
+    ("value", "tier"),
+    [
+        (49_999, "auto"),
+        (50_000, "manager"),
+        (500_000, "manager"),
+        (5_000_000, "director"),
+        (5e6 + 1, "board"),
+    ],
+)
+def test_approval_tiers(value, tier):
+    assert approval_tier(value)[0] == tier
+
+
+def test_default_checks_on_the_cocoa_contract():
+    audited = []
+    engine = GuardrailsEngine(audit=lambda contract, report: audited.append((contract, report)))
+
+    report = engine.validate_sync(CONTRACT)
+
+    assert report.decision == ESCALATE
+    assert [r.status for r in report.results.values()] == [ESCALATE, ESCALATE, PASS, ESCALATE]
+    assert report.approvers == ["director", "risk_committee"]
+    prediction = report.results["predictive"].details["prediction"]
+    assert prediction["margin_impact_pct"] == pytest.approx(-4.8)
+    response = report.to_dict()
+    assert response["financial"]["tier"] == "director"
+    assert response["escalation"]["approvers"] == ["director", "risk_committee"]
+    assert audited == [(CONTRACT, report)]
+
+
+def test_checks_run_concurrently_with_latencies():
+    engine = GuardrailsEngine([Check(f"c{i}", sleeper(0.1), timeout=1.0) for i in range(4)])
+
+    started = time.perf_counter()
+    report = engine.validate_sync({})
+    elapsed = time.perf_counter() - started
+
+    assert report.approved
+    assert elapsed < 0.3
+    assert all(r.latency_ms >= 90 for r in report.results.values())
+    assert engine.latency_stats()["c0"]["count"] == 1
+
+
+def test_block_cancels_remaining_checks():
+    engine = GuardrailsEngine(
+        [
+            Check("financial", sleeper(0.01, BLOCK), timeout=1.0),
+            Check("predictive", sleeper(5.0), timeout=10.0, required=False),
+        ]
+    )
+
+    started = time.perf_counter()
+    report = engine.validate_sync({})
+
+    assert time.perf_counter() - started < 1.0
+    assert report.short_circuited
+    assert report.decision == BLOCK
+    assert report.results["predictive"].status == CANCELLED
+    assert report.approvers == ["board"]
+
+
+def test_timeouts_and_errors_follow_check_policy():
+    def broken(contract):
+        raise RuntimeError(f"db down ({len(contract)} fields)")
+
+    engine = GuardrailsEngine(
+        [
+            Check("optional", sleeper(1.0), timeout=0.05, required=False),
+            Check("broken", broken, timeout=1.0),
+        ]
+    )
+    report = engine.validate_sync({})
+
+    assert report.results["optional"].status == TIMEOUT
+    assert report.results["optional"].decision == PASS
+    assert report.results["broken"].status == ERROR
+    assert report.decision == ESCALATE
+    assert report.reasons == ["broken: RuntimeError: db down (0 fields)"]
+
+    slow_required = GuardrailsEngine([Check("risk", sleeper(1.0), timeout=0.05)])
+    assert slow_required.validate_sync({}).decision == ESCALATE
+
+
+def test_only_blocking_checks_leave_the_loop_thread():
+    threads = {}
+
+    def record(name, seconds=0.0):
+        def check(contract):  # noqa: ARG001
+            threads[name] = threading.get_ident()
+            time.sleep(seconds)
+            return CheckOutcome(PASS)
+
+        return check
+
+    engine = GuardrailsEngine(
+        [
+            Check("inline", record("inline"), timeout=1.0),
+            Check("io", record("io", seconds=0.3), timeout=0.05, blocking=True),
+        ]
+    )
+    report = engine.validate_sync({})
+
+    assert threads["inline"] == threading.get_ident()
+    assert threads["io"] != threading.get_ident()
+    assert report.results["inline"].status == PASS
+    assert report.results["io"].status == TIMEOUT
+
+
+def test_default_checks_across_validate_sync_calls():
+    engine = GuardrailsEngine(default_checks(validator=RUTValidator(demo_lookup)))
+
+    blocked = engine.validate_sync({**CONTRACT, "value_usd": 12_000_000})
+    report = engine.validate_sync(CONTRACT)
+
+    assert blocked.decision == BLOCK
+    assert blocked.short_circuited
+    assert [r.status for r in report.results.values()] == [ESCALATE, ESCALATE, PASS, ESCALATE]
+    assert report.results["compliance"].details["supplier"]["status"] == "active"
@@ -0,0 +1,73 @@
+"""Tests for the vectorized commodity impact engine."""
+
+import numpy as np
+import pytest
+
+from src.predictive.impact import ImpactEngine, predict_impact, recommend
+
+pytestmark = pytest.mark.unit
+
+
+def test_spec_example_cocoa_plus_30():
+    result = predict_impact("cocoa", 30)
+
+    assert result["margin_impact_pct"] == pytest.approx(-4.8)
+    assert result["revenue_impact_clp"] == -75_168_000
+    assert result["confidence"] == pytest.approx(0.85)
+    assert result["recommendation"] == "High risk - diversify suppliers, consider hedging"
+
+
+def test_sensitivity_matches_scalar_predictions():
+    engine = ImpactEngine()
+    changes = np.linspace(-50, 50, 21)
+
+    grid = engine.sensitivity(changes)
+
+    assert grid.margin_impact_pct.shape == (2, 21)
+    for row, commodity in enumerate(engine.commodities):
+        for column, change in enumerate(changes):
+            scalar = engine.predict(commodity, float(change))
+            assert grid.margin_impact_pct[row, column] == pytest.approx(scalar["margin_impact_pct"])
+            assert grid.recommendation[row, column] == scalar["recommendation"]
+
+
+def test_combined_scenarios_add_up():
+    engine = ImpactEngine()
+    wheat_margin = -0.24 * 0.82 * 15
+
+    result = engine.evaluate_scenarios(
+        [{"cocoa": 30}, {"wheat": 15}, {"cocoa": 30, "wheat": 15}, {}]
+    )
+
+    expected = [-4.8, wheat_margin, -4.8 + wheat_margin, 0.0]
+    np.testing.assert_allclose(result.margin_impact_pct, expected)
+    np.testing.assert_allclose(result.new_margin_pct, 18.0 + np.array(expected))
+    weights = np.array([4.8, -wheat_margin])
+    assert result.confidence[2] == pytest.approx(weights @ [0.85, 0.78] / weights.sum())
+    assert result.confidence[3] == pytest.approx(0.78)
+
+
+def test_surface_shape_and_axes():
+    engine = ImpactEngine()
+    x, y = np.arange(0, 50, 10), np.arange(0, 30, 10)
+
+    surface = engine.surface("cocoa", x, "wheat", y)
+
+    assert surface.margin_impact_pct.shape == (3, 5)
+    np.testing.assert_allclose(surface.margin_impact_pct[0], -0.16 * x)
+    np.testing.assert_allclose(surface.margin_impact_pct[:, 0], -0.24 * 0.82 * y)
+
+
+def test_invalid_input_is_rejected():
+    engine = ImpactEngine()
+
+    with pytest.raises(KeyError, match="soy"):
+        engine.predict("soy", 10)
+    with pytest.raises(ValueError, match="last axis"):
+        engine.evaluate(np.zeros((4, 3)))
+    with pytest.raises(ValueError, match="revenue"):
+        ImpactEngine({"oil": {"impact_on": "revenue", "coefficient": 1, "confidence": 1}})
+    with pytest.raises(ValueError, match="finite"):
+        engine.predict("cocoa", float("nan"))
+    with pytest.raises(ValueError, match="finite"):
+        recommend([-5.0, np.inf])
@@ -0,0 +1,103 @@
+"""Tests for the asyncio extraction job tracker."""
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from src.integrations.job_tracker import ExtractionJobError, ExtractionJobTracker, percentile
+
+pytestmark = pytest.mark.unit
+
+
+class TimedJobsClient:
+    """Jobs complete a fixed number of seconds after they are registered."""
+
+    def __init__(self, durations: dict[str, float]) -> None:
+        self.started = {job_id: time.monotonic() for job_id in durations}
+        self.durations = durations
+        self.polls: dict[str, int] = dict.fromkeys(durations, 0)
+
+    def get_job_details(self, job_id: str) -> dict[str, Any]:
+        self.polls[job_id] += 1
+        done = time.monotonic() - self.started[job_id] >= self.durations[job_id]
+        return {"entity": {"status": {"state": "completed" if done else "running"}}}
+
+
+def test_percentile_interpolates():
+    assert percentile([], 0.5) is None
+    assert percentile([1.0, 3.0], 0.5) == 2.0
+    assert percentile([5.0, 1.0, 2.0, 4.0, 3.0], 0.95) == pytest.approx(4.8)
+
+
+def test_tracks_many_jobs_from_one_loop(extraction_client):
+    async def scenario():
+        tracker = ExtractionJobTracker(extraction_client, min_interval=0.001, max_interval=0.01)
+        job_ids = [
+            extraction_client.run_job(
+                {"location": {"path": f"in/{i}.pdf"}},
+                {"location": {"path": f"out/{i}.md"}},
+                {},
+                "markdown",
+            )["metadata"]["id"]
+            for i in range(5)
+        ]
+        seen = []
+        futures = [tracker.track(job_id, callback=seen.append) for job_id in job_ids]
+        statuses = await asyncio.gather(*futures)
+        await tracker.aclose()
+        return tracker, statuses, seen
+
+    tracker, statuses, seen = asyncio.run(scenario())
+
+    assert all(status["state"] == "completed" for status in statuses)
+    assert len(seen) == 5
+    stats = tracker.latency_stats()
+    assert stats["count"] == 5
+    assert stats["p50"] is not None and stats["p95"] >= stats["p50"]
+
+
+def test_failed_job_raises_through_future(extraction_client):
+    extraction_client.fail_inputs.add("in/bad.pdf")
+    job_id = extraction_client.run_job(
+        {"location": {"path": "in/bad.pdf"}}, {"location": {"path": "out/bad.md"}}, {}, "markdown"
+    )["metadata"]["id"]
+
+    async def scenario():
+        tracker = ExtractionJobTracker(extraction_client, min_interval=0.001, max_interval=0.01)
+        try:
+            await tracker.wait(job_id)
+        finally:
+            await tracker.aclose()
+
+    with pytest.raises(ExtractionJobError) as excinfo:
+        asyncio.run(scenario())
+    assert excinfo.value.state == "failed"
+
+
+def test_seeded_durations_defer_first_poll():
+    client = TimedJobsClient({"a": 0.15, "b": 0.15})
+
+    async def scenario():
+        tracker = ExtractionJobTracker(
+            client, min_interval=0.005, max_interval=1.0, seed_durations=[0.15]
+        )
+        await asyncio.gather(tracker.wait("a"), tracker.wait("b"))
+        await tracker.aclose()
+
+    asyncio.run(scenario())
+
+    # Without history a 5ms fixed interval would poll ~30 times per job.
+    assert max(client.polls.values()) <= 3
+
+
+def test_job_times_out():
+    client = TimedJobsClient({"slow": 60.0})
+
+    async def scenario():
+        tracker = ExtractionJobTracker(client, min_interval=0.005, max_interval=0.01, timeout=0.05)
+        await tracker.wait("slow")
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(scenario())
@@ -0,0 +1,123 @@
+"""Tests for the local PyMuPDF extractor and its remote OCR fallback."""
+
+import pymupdf
+import pytest
+
+from src.integrations.local_extraction import (
+    BatchRemoteExtractor,
+    LocalExtractor,
+    PageExtraction,
+    ocr_runs,
+    text_quality,
+)
+from src.integrations.text_extraction import COSConnection
+from src.orchestration.batch_extraction import BatchExtractionRunner
+
+pytestmark = pytest.mark.unit
+
+
+class RecordingRemote:
+    def __init__(self) -> None:
+        self.page_counts: list[int] = []
+
+    def __call__(self, paths):
+        markdown = []
+        for path in paths:
+            with pymupdf.open(path) as doc:
+                self.page_counts.append(doc.page_count)
+            markdown.append(f"OCR {path.stem}")
+        return markdown
+
+
+def test_text_quality_scores_density_and_glyphs():
+    assert text_quality("") == 0.0
+    assert text_quality("Ingresos de actividades ordinarias: 3.200 MM$ (2023)") == pytest.approx(
+        1.0
+    )
+    assert text_quality("�" * 20) == 0.0
+    assert text_quality("Página 1", image_coverage=0.95) < 0.1
+
+
+def test_born_digital_pdf_never_calls_remote(pdf_factory):
+    pdf = pdf_factory("eeff.pdf", "Tt")
+    remote = RecordingRemote()
+
+    result = LocalExtractor(remote=remote).extract(pdf)
+
+    assert remote.page_counts == []
+    assert result.local_ratio == 1.0
+    assert "|Cuenta|2023|2022|" in result.markdown
+    assert "|Ingresos|3.200|2.900|" in result.markdown
+    # Table cells are not repeated as loose paragraphs.
+    assert "Ingresos 3.200" not in result.markdown
+    assert result.markdown.index("Página 1") < result.markdown.index("Página 2")
+
+
+def test_only_ocr_runs_are_sent_and_merged_in_page_order(pdf_factory):
+    pdf = pdf_factory("mixed.pdf", "tsstst")
+    remote = RecordingRemote()
+
+    result = LocalExtractor(remote=remote, page_markers=True).extract(pdf)
+
+    assert remote.page_counts == [2, 1]
+    assert result.remote_pages == [2, 3, 5]
+    markdown = result.markdown
+    positions = [
+        markdown.index(marker)
+        for marker in (
+            "Página 1",
+            "OCR 0000_mixed_p2-3",
+            "Página 4",
+            "OCR 0001_mixed_p5-5",
+            "Página 6",
+        )
+    ]
+    assert positions == sorted(positions)
+    assert "<!-- page 3 -->" in markdown
+
+
+def test_failed_remote_keeps_pages_flagged(pdf_factory):
+    pdf = pdf_factory("scan.pdf", "ts")
+
+    result = LocalExtractor(remote=lambda paths: [None] * len(paths)).extract(pdf)
+
+    assert result.remote_pages == []
+    assert result.pages[1].needs_ocr
+    assert result.errors == ["pages 2-2: remote extraction failed"]
+
+
+def test_ocr_runs_groups_contiguous_pages():
+    flags = [False, True, True, False, True]
+    pages = [PageExtraction(i, "", 0.0, flag) for i, flag in enumerate(flags, start=1)]
+    assert ocr_runs(pages) == [(2, 3), (5, 5)]
+
+
+def test_batch_remote_extractor_runs_sub_pdfs_through_runner(
+    extraction_client, cos_client, pdf_factory, tmp_path
+):
+    pdf = pdf_factory("EEFF_2015.pdf", "tss")
+    runner = BatchExtractionRunner(
+        extraction_client,
+        cos_client,
+        COSConnection("https://cos.example", "key", "secret", "bucket"),
+        output_dir=tmp_path / "out",
+        min_poll_interval=0.001,
+    )
+
+    remote = BatchRemoteExtractor(runner)
+    result = LocalExtractor(remote=remote).extract(pdf)
+
+    assert result.remote_pages == [2, 3]
+    key = next(k for k in cos_client.objects if k.startswith("ocr_pages/"))
+    assert key.endswith("/p2-3.pdf")
+    assert f"# {key}" in result.markdown
+
+    # Same sub-PDF name, different content: e.g. another document or a concurrent run.
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    scan = pdf_factory("a/0000_EEFF_2015_p2-3.pdf", "s")
+    text = pdf_factory("b/0000_EEFF_2015_p2-3.pdf", "t")
+    markdown = remote([scan, text])
+
+    assert remote.key(scan) != remote.key(text)
+    assert [m.strip() for m in markdown] == [f"# {remote.key(scan)}", f"# {remote.key(text)}"]
@@ -0,0 +1,100 @@
+"""Tests for streaming download and incremental markdown parsing."""
+
+import io
+
+import pytest
+
+from src.utils.markdown_stream import (
+    Heading,
+    Paragraph,
+    Table,
+    iter_blocks,
+    iter_lines,
+    iter_sections,
+    iter_tables,
+    iter_text,
+    tee_lines,
+)
+
+pytestmark = pytest.mark.unit
+
+REPORT = """# Estados Financieros Consolidados
+Empresas Carozzi S.A.
+al 31 de diciembre de 2023
+
+## Estado de Resultados
+
+| Cuenta | 2023 | 2022 |
+|---|---|---|
+| Ingresos | 3.200 | 2.900 |
+| Costos | -2.100 | -1.950 |
+
+<!-- page 2 -->
+## Notas
+Cifras en millones de pesos (MM$).
+"""
+
+
+def test_multibyte_characters_split_across_chunks():
+    data = "Año económico — ñandú\nsegunda línea".encode()
+    chunks = [data[i : i + 3] for i in range(0, len(data), 3)]
+
+    assert list(iter_lines(iter_text(chunks))) == ["Año económico — ñandú", "segunda línea"]
+
+
+def test_blocks_are_parsed_from_a_line_stream():
+    blocks = list(iter_blocks(REPORT.splitlines()))
+
+    assert [type(block) for block in blocks] == [
+        Heading,
+        Paragraph,
+        Heading,
+        Table,
+        Heading,
+        Paragraph,
+    ]
+    assert blocks[1].text == "Empresas Carozzi S.A. al 31 de diciembre de 2023"
+    table = blocks[3]
+    assert table.header == ["Cuenta", "2023", "2022"]
+    assert table.rows == [["Ingresos", "3.200", "2.900"], ["Costos", "-2.100", "-1.950"]]
+    assert (table.line, table.width, table.page) == (7, 3, None)
+    assert blocks[4].page == 2
+
+
+def test_sections_and_tables_are_yielded_lazily():
+    def lines():
+        yield from REPORT.splitlines()
+        raise AssertionError("stream read past the first table")
+
+    tables = iter_tables(lines())
+    assert next(tables).rows[0][0] == "Ingresos"
+
+    sections = list(iter_sections(REPORT.splitlines()))
+    assert [(s.title, s.level, len(s.tables)) for s in sections] == [
+        ("Estados Financieros Consolidados", 1, 0),
+        ("Estado de Resultados", 2, 1),
+        ("Notas", 2, 0),
+    ]
+    assert sections[2].text == "Cifras en millones de pesos (MM$)."
+
+
+def test_tee_lines_writes_file_while_streaming(tmp_path):
+    target = tmp_path / "out" / "EEFF.md"
+    lines = tee_lines(io.BytesIO(REPORT.encode()), target, chunk_size=16)
+
+    first = next(lines)
+    assert first == "# Estados Financieros Consolidados"
+    assert not target.exists()
+
+    assert len(list(lines)) == len(REPORT.splitlines()) - 1
+    assert target.read_text(encoding="utf-8") == REPORT
+    assert list(target.parent.iterdir()) == [target]
+
+
+def test_abandoned_download_leaves_no_file(tmp_path):
+    target = tmp_path / "EEFF.md"
+    lines = tee_lines(io.BytesIO(REPORT.encode()), target, chunk_size=16)
+    next(lines)
+    lines.close()
+
+    assert list(tmp_path.iterdir()) == []
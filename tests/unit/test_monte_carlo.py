@@ -0,0 +1,103 @@
+"""Tests for the Monte Carlo margin-impact simulator."""
+
+import numpy as np
+import pytest
+
+from src.predictive.monte_carlo import (
+    DRIVERS,
+    MonteCarloSimulator,
+    RunningQuantiles,
+    ShockModel,
+    fit_shock_model,
+)
+
+pytestmark = pytest.mark.unit
+
+COV = np.array(
+    [
+        [0.0064, 0.0017, 0.0014, 0.0007, 0.0005],
+        [0.0017, 0.0049, 0.0021, 0.0013, 0.0004],
+        [0.0014, 0.0021, 0.0036, 0.0011, 0.0004],
+        [0.0007, 0.0013, 0.0011, 0.0081, 0.0003],
+        [0.0005, 0.0004, 0.0004, 0.0003, 0.0009],
+    ]
+)
+
+
+def history(months: int, seed: int = 7) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    returns = rng.multivariate_normal(np.zeros(len(DRIVERS)), COV, months)
+    levels = 100 * np.exp(np.cumsum(returns, axis=0))
+    return [
+        {"event_date": f"{2000 + m // 12}-{m % 12 + 1:02d}-01", "event_type": d, "value": v}
+        for m, row in enumerate(levels)
+        for d, v in zip(DRIVERS, row, strict=True)
+    ]
+
+
+@pytest.fixture
+def model():
+    return ShockModel(DRIVERS, np.zeros(len(DRIVERS)), COV, observations=100)
+
+
+def test_fit_recovers_covariance_from_events():
+    rows = history(5000)
+    rows.append({"event_date": "1999-01-01", "event_type": "cocoa_price", "value": 1.0})
+
+    fitted = fit_shock_model(rows)
+
+    assert fitted.drivers == DRIVERS
+    assert fitted.observations == 4999
+    np.testing.assert_allclose(fitted.cov, COV, atol=6e-4)
+
+    with pytest.raises(ValueError, match="at least 3"):
+        fit_shock_model(history(2))
+
+
+def test_runs_are_reproducible_across_workers(model):
+    single = MonteCarloSimulator(model, batch_size=20_000, seed=11)
+    pooled = MonteCarloSimulator(model, batch_size=20_000, seed=11, workers=2)
+
+    batches = list(single.iter_batches(50_000))
+
+    assert [len(b) for b in batches] == [20_000, 20_000, 10_000]
+    for a, b in zip(batches, pooled.iter_batches(50_000), strict=True):
+        np.testing.assert_array_equal(a, b)
+    assert single.run(50_000) == pooled.run(50_000)
+    assert single.run(50_000) != MonteCarloSimulator(model, batch_size=20_000, seed=12).run(50_000)
+
+
+def test_stream_reports_partial_results_early(model):
+    summaries = list(MonteCarloSimulator(model, batch_size=10_000, seed=3).stream(35_000))
+
+    assert [s.paths for s in summaries] == [10_000, 20_000, 30_000, 35_000]
+    assert [s.done for s in summaries] == [False, False, False, True]
+    first, last = summaries[0].quantiles, summaries[-1].quantiles
+    assert first[0.05] < first[0.5] < first[0.95]
+    assert abs(first[0.5] - last[0.5]) < 0.2
+
+
+def test_running_quantiles_track_exact_quantiles():
+    values = np.random.default_rng(5).standard_t(4, 200_000)
+    stats = RunningQuantiles(bins=4096)
+    for batch in np.array_split(values, 20):
+        stats.update(batch)
+
+    levels = [0.01, 0.25, 0.5, 0.75, 0.99]
+    approx = stats.quantiles(levels)
+
+    np.testing.assert_allclose(list(approx.values()), np.quantile(values, levels), atol=0.02)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.std == pytest.approx(values.std(ddof=1))
+    assert stats.below_zero == (values < 0).sum()
+
+
+def test_margin_impact_uses_engine_exposures():
+    single = ShockModel(("cocoa_price",), np.array([np.log(1.3)]), np.zeros((1, 1)))
+
+    summary = MonteCarloSimulator(single, batch_size=1000, seed=1).run(2000)
+
+    assert summary.mean == pytest.approx(-4.8)
+    assert summary.std == pytest.approx(0.0, abs=1e-9)
+    assert summary.probability_of_loss == 1.0
@@ -0,0 +1,92 @@
+"""Tests for the online correlation estimator."""
+
+import numpy as np
+import pytest
+
+from src.predictive.impact import ImpactEngine
+from src.predictive.online_correlation import OnlineCorrelationEstimator, PairStats
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def sample():
+    rng = np.random.default_rng(9)
+    x = rng.normal(0, 10, 500)
+    return x, -0.16 * x + rng.normal(0, 0.5, 500)
+
+
+def test_incremental_updates_match_batch_regression(sample):
+    x, y = sample
+    stats = PairStats()
+    for xi, yi in zip(x, y, strict=True):
+        stats.update(xi, yi)
+
+    slope, intercept = np.polyfit(x, y, 1)
+    assert stats.count == 500
+    assert stats.slope == pytest.approx(slope)
+    assert stats.intercept == pytest.approx(intercept)
+    assert stats.correlation == pytest.approx(np.corrcoef(x, y)[0, 1])
+    assert stats.m2_x == pytest.approx(x.var() * len(x))
+
+
+def test_merging_batches_equals_sequential_updates(sample):
+    x, y = sample
+    merged = PairStats()
+    for xs, ys in zip(np.array_split(x, 7), np.array_split(y, 7), strict=True):
+        merged.merge(PairStats.from_arrays(xs, ys))
+
+    sequential = PairStats.from_arrays(x, y)
+    for field in ("count", "mean_x", "mean_y", "m2_x", "m2_y", "co_moment"):
+        assert getattr(merged, field) == pytest.approx(getattr(sequential, field))
+
+    with pytest.raises(ValueError, match="lengths differ"):
+        PairStats.from_arrays([1, 2], [1])
+
+
+def test_rows_and_correlations_for_the_impact_engine(sample):
+    x, y = sample
+    estimator = OnlineCorrelationEstimator()
+    estimator.update_many("cocoa_price", "gross_margin", x, y)
+    estimator.update_many("cocoa_price", "revenue", x, np.zeros_like(x))
+    estimator.observe("wheat_price", 10.0, {"cogs": 2.4})
+
+    rows = estimator.to_rows(examples={"cocoa_price": "2023: Cocoa +50% → Margin -8%"})
+
+    assert [(r["commodity"], r["impact_metric"]) for r in rows] == [
+        ("cocoa_price", "gross_margin"),
+        ("cocoa_price", "revenue"),
+    ]
+    assert rows[0]["coefficient"] == pytest.approx(-0.16, abs=0.005)
+    assert rows[0]["r_squared"] > 0.9
+    assert rows[0]["historical_example"].startswith("2023")
+
+    correlations = estimator.as_correlations()
+    assert set(correlations) == {"cocoa_price"}
+    engine = ImpactEngine(correlations)
+    assert engine.predict("cocoa", 30)["margin_impact_pct"] == pytest.approx(-4.8, abs=0.15)
+
+
+def test_state_round_trips_through_json(tmp_path, sample):
+    x, y = sample
+    path = tmp_path / "state" / "correlations.json"
+    estimator = OnlineCorrelationEstimator()
+    estimator.update_many("cocoa_price", "gross_margin", x[:300], y[:300])
+    estimator.save(path)
+
+    restored = OnlineCorrelationEstimator.load(path)
+    restored.update_many("cocoa_price", "gross_margin", x[300:], y[300:])
+
+    full = PairStats.from_arrays(x, y)
+    assert restored.stats("cocoa_price", "gross_margin").slope == pytest.approx(full.slope)
+    assert OnlineCorrelationEstimator.load(tmp_path / "missing.json").pairs == {}
+    path.write_text("{not json", encoding="utf-8")
+    assert OnlineCorrelationEstimator.load(path).pairs == {}
+
+
+def test_degenerate_pairs_do_not_divide_by_zero():
+    stats = PairStats()
+    stats.update(1.0, 2.0)
+    stats.update(1.0, 3.0)
+
+    assert (stats.slope, stats.correlation, stats.confidence) == (0.0, 0.0, 0.0)
@@ -0,0 +1,96 @@
+"""Tests for the single-pass keyword scanner and quality scoring."""
+
+import pytest
+
+from src.utils.quality import (
+    FINANCIAL_TERMS,
+    KeywordScanner,
+    QualityAccumulator,
+    assess_file,
+    grade,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def substring_counts(text: str, terms=FINANCIAL_TERMS) -> dict[str, int]:
+    """Reference: overlapping case-insensitive substring counts per term."""
+    lowered, counts = text.lower(), {}
+    for term in terms:
+        key, start, n = term.lower(), 0, 0
+        while (start := lowered.find(key, start) + 1) > 0:
+            n += 1
+        if n:
+            counts[term] = n
+    return counts
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Los Costos de ventas en MM$ y M$",
+        "Ingresos ordinarios; costo; COST; cost-of-sales",
+        "CLPasivo clpasivo CLP pasivo",
+        "Estado de situación financiera — Financial statement of Empresas Carozzi",
+        "mm$mm$m$",
+    ],
+)
+def test_scanner_matches_substring_semantics(text):
+    result = KeywordScanner().scan(text)
+
+    assert dict(+result.counts) == substring_counts(text)
+    for term, starts in result.positions.items():
+        for start in starts:
+            assert text.lower().startswith(term.lower(), start)
+
+
+def test_stream_scan_finds_terms_across_chunk_boundaries():
+    text = "Ingresos en millones de CLP; pasivos y activos del estado financiero. " * 20
+    chunks = [text[i : i + 5] for i in range(0, len(text), 5)]
+    scanner = KeywordScanner()
+
+    streamed = scanner.scan_stream(chunks)
+
+    assert dict(+streamed.counts) == substring_counts(text)
+    assert streamed.positions == scanner.scan(text).positions
+
+
+def test_grades_follow_length_and_distinct_terms():
+    assert grade(1001, 6) == "EXCELLENT"
+    assert grade(1001, 5) == "GOOD"
+    assert grade(501, 4) == "GOOD"
+    assert grade(400, 20) == "POOR"
+
+
+def test_accumulator_scores_each_page():
+    rich = "Estado de resultados: ingresos, costos y ganancia en millones de CLP (MM$). " * 20
+    lines = [
+        "<!-- page 1 -->",
+        rich,
+        "| Cuenta | 2023 |",
+        "|---|---|",
+        "| Activo | 10 |",
+        "<!-- page 2 -->",
+        "Índice",
+    ]
+
+    report = QualityAccumulator(batch_chars=64).feed_lines(lines).report()
+
+    assert [page.page for page in report.pages] == [1, 2]
+    assert report.pages[0].grade == "EXCELLENT"
+    assert report.pages[0].tables == 1
+    assert report.table_rows == 3
+    assert report.weak_pages == [2]
+    assert report.grade == "EXCELLENT"
+    assert report.terms["ingreso"] == 20
+
+
+def test_assess_file_streams_from_disk(tmp_path):
+    path = tmp_path / "EEFF.md"
+    path.write_text("# Estado financiero\n\nIngresos en MM$\n", encoding="utf-8")
+
+    report = assess_file(path)
+
+    assert set(report.found) == {"estado", "financiero", "ingreso", "MM$", "M$"}
+    assert report.pages[0].page is None
+    assert report.grade == "POOR"
@@ -0,0 +1,167 @@
+"""Tests for the compiled approval rules."""
+
+import numpy as np
+import pytest
+
+from src.orchestration.guardrails import GuardrailsEngine, default_checks
+from src.orchestration.rules import (
+    BLOCK,
+    ESCALATE,
+    PASS,
+    REVIEW,
+    PolicyError,
+    RulesEngine,
+    default_engine,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def rule(*bands: dict, name: str = "value", field: str = "value_usd") -> dict:
+    return {"name": name, "field": field, "missing": REVIEW, "bands": list(bands)}
+
+
+def policy(*bands: dict) -> dict:
+    return {"version": 1, "rules": [rule(*bands)]}
+
+
+def test_repository_policy_boundaries():
+    engine = default_engine()
+    cases = {
+        49_999.99: ("auto", PASS),
+        50_000: ("manager", ESCALATE),
+        500_000: ("manager", ESCALATE),
+        500_000.01: ("director", ESCALATE),
+        5_000_000: ("director", ESCALATE),
+        5_000_000.01: ("board", BLOCK),
+    }
+    for value, (band, status) in cases.items():
+        match = engine.evaluate_rule("approval_tier", {"value_usd": value})
+        assert (match.band, match.status) == (band, status)
+
+    decision = engine.evaluate({"value_usd": 2_300_000, "supplier_share_pct": 75})
+    assert decision.status == ESCALATE
+    assert decision.approvers == ["director", "risk_committee"]
+    assert decision.matches["supplier_concentration"].reason == (
+        "supplier concentration 75% exceeds 60%"
+    )
+    assert engine.evaluate({"value_usd": 10, "supplier_share_pct": 60}).status == PASS
+
+
+def test_batch_matches_scalar_evaluation():
+    engine = default_engine()
+    rng = np.random.default_rng(7)
+    values = rng.choice([50_000, 500_000, 5_000_000, 0], 2000) + rng.integers(-2, 3, 2000)
+    shares = rng.uniform(0, 100, 2000)
+    contracts = [
+        {"value_usd": float(v), "supplier_share_pct": float(s)}
+        for v, s in zip(values, shares, strict=True)
+    ]
+    contracts[3] = {"supplier_share_pct": 10.0}
+
+    batch = engine.evaluate_batch(contracts)
+
+    assert batch.statuses.tolist() == [engine.evaluate(c).status for c in contracts]
+    assert batch.band_labels("approval_tier")[3] is None
+    assert batch.statuses[3] == REVIEW
+    assert sum(batch.counts().values()) == 2000
+    columns = engine.evaluate_batch({"value_usd": values, "supplier_share_pct": shares})
+    np.testing.assert_array_equal(
+        np.delete(columns.status_codes, 3), np.delete(batch.status_codes, 3)
+    )
+
+
+def test_non_numeric_values_go_to_review_in_batch_and_scalar():
+    engine = default_engine()
+    contracts = [
+        {"value_usd": "n/a", "supplier_share_pct": 10.0},
+        {"value_usd": "250000", "supplier_share_pct": "unknown"},
+        {"value_usd": 20_000, "supplier_share_pct": 10.0},
+    ]
+
+    batch = engine.evaluate_batch(contracts)
+    columns = engine.evaluate_batch(
+        {
+            "value_usd": np.array(["n/a", "250000", 20_000], dtype=object),
+            "supplier_share_pct": [10.0, "unknown", 10.0],
+        }
+    )
+
+    expected = [engine.evaluate(c).status for c in contracts]
+    assert expected == [REVIEW, ESCALATE, PASS]
+    assert batch.statuses.tolist() == expected
+    assert columns.statuses.tolist() == expected
+    assert batch.band_labels("approval_tier")[0] is None
+    assert columns.band_labels("supplier_concentration")[1] is None
+
+
+def test_reviewer_only_sees_undecided_contracts():
+    asked = []
+
+    def reviewer(contract, rule):
+        asked.append((dict(contract), rule))
+        return PASS
+
+    engine = RulesEngine.from_policy(
+        policy({"name": "low", "status": PASS}, {"name": "odd", "from": 100, "status": REVIEW}),
+        reviewer=reviewer,
+    )
+
+    assert engine.evaluate({"value_usd": 5}).status == PASS
+    match = engine.evaluate_rule("value", {"value_usd": 100})
+    assert (match.band, match.status) == ("odd", PASS)
+    assert match.reason == "value; decided by reviewer"
+    assert engine.evaluate({}).status == PASS
+    assert asked == [({"value_usd": 100}, "value"), ({}, "value")]
+
+
+def test_malformed_policies_are_rejected(tmp_path):
+    with pytest.raises(PolicyError, match="first band"):
+        RulesEngine.from_policy(policy({"name": "a", "from": 1, "status": PASS}))
+    with pytest.raises(PolicyError, match="must increase"):
+        RulesEngine.from_policy(
+            policy(
+                {"name": "a", "status": PASS},
+                {"name": "b", "above": 10, "status": ESCALATE},
+                {"name": "c", "from": 10, "status": BLOCK},
+            )
+        )
+    with pytest.raises(PolicyError, match="unknown status"):
+        RulesEngine.from_policy(policy({"name": "a", "status": "maybe"}))
+    with pytest.raises(PolicyError, match="version"):
+        RulesEngine.from_policy({"rules": []})
+
+    path = tmp_path / "policy.toml"
+    path.write_text(
+        'version = 1\n[[rules]]\nname = "value"\nfield = "value_usd"\n'
+        '[[rules.bands]]\nname = "all"\nstatus = "block"\n'
+    )
+    assert RulesEngine.load(path).evaluate({"value_usd": 1}).status == BLOCK
+
+
+def test_guardrails_use_the_supplied_policy():
+    strict = RulesEngine.from_policy(
+        {
+            "version": 1,
+            "rules": [
+                rule(
+                    {"name": "auto", "status": PASS},
+                    {"name": "board", "above": 1000, "status": BLOCK},
+                    name="approval_tier",
+                ),
+                rule(
+                    {"name": "ok", "status": PASS},
+                    name="supplier_concentration",
+                    field="supplier_share_pct",
+                ),
+            ],
+        }
+    )
+    engine = GuardrailsEngine(default_checks(strict)[:2])
+
+    report = engine.validate_sync({"value_usd": 1001, "supplier_share_pct": 99})
+
+    assert report.decision == BLOCK
+    assert report.results["financial"].details == {"tier": "board"}
+    assert engine.validate_sync({"value_usd": 1000, "supplier_share_pct": 99}).approved
+    assert GuardrailsEngine(default_checks()[:1]).validate_sync({}).decision == ESCALATE
@@ -0,0 +1,164 @@
+"""Tests for RUT validation with cached, batched lookups."""
+
+import asyncio
+
+import pytest
+
+from src.integrations.rut import (
+    RUTValidator,
+    check_digit,
+    demo_lookup,
+    format_rut,
+    is_valid_rut,
+    parse_rut,
+)
+from src.orchestration.guardrails import (
+    CANCELLED,
+    ESCALATE,
+    PASS,
+    GuardrailsEngine,
+    check_compliance,
+    default_checks,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class CountingLookup:
+    """Batch lookup that records every call and can be made to fail."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.batches: list[list[str]] = []
+        self.fail = False
+
+    async def __call__(self, ruts):
+        self.batches.append(list(ruts))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("registry unavailable")
+        return await demo_lookup(ruts)
+
+
+def test_check_digit_and_formats():
+    assert check_digit(12_345_678) == "5"
+    assert check_digit(10_123_456) == "8"
+    assert check_digit(6) == "K"
+    assert parse_rut(" 12345678-5 ") == (12_345_678, "5")
+    assert parse_rut("12.345.678k") == (12_345_678, "K")
+    assert parse_rut("12,345,678-5") is None
+    assert format_rut(7_654_321, "6") == "7.654.321-6"
+    assert is_valid_rut("12.345.678-5")
+    assert not is_valid_rut("10.123.456-K")
+
+
+def test_malformed_ruts_never_reach_the_lookup():
+    lookup = CountingLookup()
+    validator = RUTValidator(lookup)
+
+    results = asyncio.run(validator.validate_many(["10.123.456-K", "abc", "12.345.678-4"]))
+
+    assert [r["error"] for r in results] == [
+        "invalid check digit",
+        "malformed RUT",
+        "invalid check digit",
+    ]
+    assert lookup.batches == []
+
+
+def test_concurrent_requests_are_coalesced_and_cached():
+    clock = [0.0]
+    lookup = CountingLookup(delay=0.01)
+    validator = RUTValidator(lookup, ttl=100, negative_ttl=10, batch_size=2, clock=lambda: clock[0])
+
+    async def scenario():
+        first = await validator.validate_many(
+            ["12.345.678-5", "12345678-5", "7.654.321-6", "11.111.111-1", "12.345.678-5"]
+        )
+        second = await validator.validate_many(["12.345.678-5", "7654321-6"])
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert [r["valid"] for r in first] == [True, True, False, False, True]
+    assert first[0]["data"]["name"] == "Cocoa Import Ltd"
+    assert lookup.batches == [["12.345.678-5", "7.654.321-6"], ["11.111.111-1"]]
+    assert second[1] == {"valid": False, "rut": "7.654.321-6", "error": "RUT not found"}
+    assert validator.cache_hits == 2
+
+    clock[0] = 50.0
+    asyncio.run(validator.validate_many(["12.345.678-5", "7.654.321-6"]))
+    assert lookup.batches[-1] == ["7.654.321-6"]
+
+
+def test_lookup_failures_are_not_cached():
+    lookup = CountingLookup()
+    lookup.fail = True
+    validator = RUTValidator(lookup)
+
+    async def scenario():
+        return await asyncio.gather(
+            validator.validate("12.345.678-5"),
+            validator.validate("12.345.678-5"),
+            return_exceptions=True,
+        )
+
+    errors = asyncio.run(scenario())
+    assert all(isinstance(e, ConnectionError) for e in errors)
+    assert len(lookup.batches) == 1
+
+    lookup.fail = False
+    assert asyncio.run(validator.validate("12.345.678-5"))["valid"]
+    assert len(lookup.batches) == 2
+
+
+@pytest.mark.parametrize("started", [False, True])
+def test_cancelled_lookup_releases_waiters(started):
+    lookup = CountingLookup(delay=10.0)
+    validator = RUTValidator(lookup)
+
+    async def scenario():
+        waiter = asyncio.ensure_future(validator.validate("12.345.678-5"))
+        await asyncio.sleep(0)
+        validator._flush()
+        while started and not lookup.batches:
+            await asyncio.sleep(0.001)
+        for task in list(validator._tasks):
+            task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(waiter, timeout=1.0)
+        lookup.delay = 0.0
+        return await asyncio.wait_for(validator.validate("12.345.678-5"), timeout=1.0)
+
+    assert asyncio.run(scenario())["valid"]
+    assert len(lookup.batches) == (2 if started else 1)
+
+
+def test_compliance_checks_verify_the_rut():
+    assert check_compliance({"supplier_rut": "12.345.678-5"}).status == PASS
+    outcome = check_compliance({"supplier_rut": "10.123.456-K"})
+    assert outcome.status == ESCALATE
+    assert outcome.reason == "supplier RUT 10.123.456-K: invalid check digit"
+
+    checks = default_checks(validator=RUTValidator(CountingLookup()))
+    engine = GuardrailsEngine([c for c in checks if c.name == "compliance"])
+    known = engine.validate_sync({"supplier_rut": "12345678-5"})
+    assert known.results["compliance"].details == {
+        "supplier": {"name": "Cocoa Import Ltd", "status": "active"}
+    }
+    unknown = engine.validate_sync({"supplier_rut": "7.654.321-6"})
+    assert unknown.reasons == ["compliance: supplier RUT 7.654.321-6: RUT not found"]
+
+
+def test_validator_survives_a_short_circuited_run():
+    lookup = CountingLookup()
+    engine = GuardrailsEngine(default_checks(validator=RUTValidator(lookup)))
+    contract = {"supplier_rut": "12.345.678-5", "supplier_share_pct": 10.0, "commodity": "cocoa"}
+
+    blocked = engine.validate_sync({**contract, "value_usd": 12_000_000})
+    assert blocked.short_circuited
+    assert blocked.results["compliance"].status == CANCELLED
+    report = engine.validate_sync({**contract, "value_usd": 100_000})
+
+    assert report.results["compliance"].status == PASS
+    assert lookup.batches == [["12.345.678-5"]]
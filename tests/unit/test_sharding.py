@@ -0,0 +1,100 @@
+"""Tests for page-range sharding and markdown reassembly."""
+
+import pytest
+
+from src.integrations.text_extraction import COSConnection
+from src.orchestration.batch_extraction import BatchExtractionRunner
+from src.orchestration.sharding import ShardedExtractor, shard_ranges, stitch_markdown
+
+pytestmark = pytest.mark.unit
+
+HEADER = "| Cuenta | 2023 | 2022 |\n|---|---|---|\n"
+
+
+def test_shard_ranges_are_balanced_and_cover_every_page():
+    assert shard_ranges(12) == [(1, 12)]
+    assert shard_ranges(100) == [(i, i + 9) for i in range(1, 101, 10)]
+    ranges = shard_ranges(25, pages_per_shard=10)
+    assert ranges == [(1, 9), (10, 17), (18, 25)]
+    assert shard_ranges(0) == []
+
+
+def test_stitch_merges_table_with_repeated_header():
+    first = "# Balance\n\n" + HEADER + "| Caja | 10 | 9 |\n"
+    second = HEADER + "| Deudores | 20 | 18 |\n\nNotas al balance\n"
+
+    assert stitch_markdown([first, second]) == (
+        "# Balance\n\n" + HEADER + "| Caja | 10 | 9 |\n| Deudores | 20 | 18 |\n\nNotas al balance\n"
+    )
+
+
+def test_stitch_keeps_promoted_row_as_data():
+    first = HEADER + "| Caja | 10 | 9 |\n"
+    second = "| Deudores | 20 | 18 |\n|---|---|---|\n| Existencias | 30 | 25 |\n"
+
+    assert stitch_markdown([first, second]) == (
+        HEADER + "| Caja | 10 | 9 |\n| Deudores | 20 | 18 |\n| Existencias | 30 | 25 |\n"
+    )
+
+
+def test_stitch_leaves_unrelated_tables_apart():
+    first = HEADER + "| Caja | 10 | 9 |\n"
+    second = "| Nota | Detalle |\n|---|---|\n| 1 | Políticas |\n"
+
+    assert stitch_markdown([first, "", second]) == first + "\n" + second
+
+
+def test_large_pdf_is_sharded_and_reassembled_in_page_order(
+    extraction_client, cos_client, pdf_factory, tmp_path
+):
+    sources = {
+        "licitaciones/bases.pdf": pdf_factory("bases.pdf", "t" * 25),
+        "contracts/short.pdf": pdf_factory("short.pdf", "tt"),
+    }
+    runner = BatchExtractionRunner(
+        extraction_client,
+        cos_client,
+        COSConnection("https://cos.example", "key", "secret", "bucket"),
+        output_dir=tmp_path / "out",
+        max_concurrency=4,
+        min_poll_interval=0.001,
+    )
+
+    big, short = ShardedExtractor(runner, pages_per_shard=10).extract(sources)
+
+    assert big.succeeded and short.succeeded
+    assert big.ranges == [(1, 9), (10, 17), (18, 25)]
+    # All four jobs (three shards plus the short document) run at once.
+    assert extraction_client.max_in_flight == 4
+    assert big.local_path.read_text(encoding="utf-8") == (
+        "# shards/licitaciones/bases/p0001-0009.pdf\n\n"
+        "# shards/licitaciones/bases/p0010-0017.pdf\n\n"
+        "# shards/licitaciones/bases/p0018-0025.pdf\n"
+    )
+    # A document that is not split runs under its own key, without a copy in shards/.
+    assert short.ranges == [(1, 2)]
+    assert [t.input_key for t in short.tasks] == ["contracts/short.pdf"]
+    assert not any(key.startswith("shards/contracts/") for key in cos_client.objects)
+    assert short.local_path.read_text(encoding="utf-8") == "# contracts/short.pdf\n"
+
+
+def test_unreadable_pdf_fails_with_an_error(extraction_client, cos_client, pdf_factory, tmp_path):
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    runner = BatchExtractionRunner(
+        extraction_client,
+        cos_client,
+        COSConnection("https://cos.example", "key", "secret", "bucket"),
+        output_dir=tmp_path / "out",
+        min_poll_interval=0.001,
+    )
+
+    bad, good = ShardedExtractor(runner).extract(
+        {"contracts/broken.pdf": broken, "contracts/short.pdf": pdf_factory("short.pdf", "t")}
+    )
+
+    assert not bad.succeeded
+    assert bad.ranges == [] and bad.tasks == []
+    assert bad.error is not None and bad.error.startswith("could not open PDF")
+    assert good.succeeded
+    assert len(extraction_client.jobs) == 1
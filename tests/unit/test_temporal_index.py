@@ -0,0 +1,104 @@
+"""Tests for the as-of temporal index."""
+
+import numpy as np
+import pytest
+
+from src.predictive.temporal_index import EventSeries, TemporalIndex, quarter_bounds
+from src.predictive.timeseries_store import TimeSeriesStore
+
+pytestmark = pytest.mark.unit
+
+
+def monthly(start: str, values) -> tuple[np.ndarray, np.ndarray]:
+    dates = np.arange(np.datetime64(start, "M"), np.datetime64(start, "M") + len(values))
+    return dates.astype("datetime64[D]"), np.asarray(values, dtype=float)
+
+
+def brute_drawdown(values) -> float:
+    peak, worst = -np.inf, 0.0
+    for v in values:
+        peak = max(peak, v)
+        worst = max(worst, 1 - v / peak)
+    return worst
+
+
+def test_quarter_bounds():
+    starts, ends = quarter_bounds([(2023, 1), (2023, 4)])
+
+    assert starts.tolist() == list(np.array(["2023-01-01", "2023-10-01"], dtype="datetime64[D]"))
+    assert ends[1] == np.datetime64("2024-01-01")
+
+
+def test_as_of_and_period_aggregates():
+    series = EventSeries(*monthly("2023-01", [10, 12, 8, 9, 11, 15]))
+    starts, ends = quarter_bounds([(2022, 4), (2023, 1), (2023, 2)])
+
+    assert series.as_of(["2022-12-31", "2023-02-15", "2030-01-01"]).tolist()[1:] == [12.0, 15.0]
+    assert np.isnan(series.as_of("2022-12-31"))
+    np.testing.assert_allclose(series.mean(starts, ends), [np.nan, 10.0, 35 / 3])
+    np.testing.assert_allclose(series.last(ends), [np.nan, 8.0, 15.0])
+    np.testing.assert_allclose(series.max_drawdown(starts, ends), [np.nan, 1 - 8 / 12, 0.0])
+    np.testing.assert_allclose(series.extreme(starts, ends, "min"), [np.nan, 8.0, 9.0])
+
+
+def test_segment_tree_matches_brute_force():
+    rng = np.random.default_rng(4)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.1, 137)))
+    dates = np.datetime64("2015-01-01") + np.arange(137)
+    series = EventSeries(dates[::-1], values[::-1])
+
+    for lo, hi in rng.integers(0, 138, (200, 2)):
+        lo, hi = sorted((int(lo), int(hi)))
+        top, bottom, drawdown = series._query(lo, hi)
+        if lo == hi:
+            assert np.isnan(drawdown)
+            continue
+        assert top == values[lo:hi].max()
+        assert bottom == values[lo:hi].min()
+        assert drawdown == pytest.approx(brute_drawdown(values[lo:hi]))
+
+
+def test_feature_matrix_is_cached_until_new_events_arrive():
+    index = TemporalIndex()
+    index.add_events("cocoa_price", *monthly("2023-01", [10, 12, 8, 9, 11, 15]))
+    index.add_events("wheat_price", *monthly("2023-01", [5, 5, 5, 6, 6, 6]))
+    periods = [(2023, 1), (2023, 2), (2023, 3)]
+    features = [("cocoa_price", "mean"), ("cocoa_price", "max_drawdown"), ("wheat_price", "last")]
+
+    matrix = index.feature_matrix(periods, features)
+
+    assert matrix.shape == (3, 3)
+    assert not matrix.flags.writeable
+    assert index.feature_matrix(periods, features) is matrix
+    np.testing.assert_allclose(matrix[:, 2], [5.0, 6.0, 6.0])
+
+    index.add_events("soy_price", *monthly("2023-01", [1.0]))
+    assert index.feature_matrix(periods, features) is matrix
+
+    index.add_events("cocoa_price", *monthly("2023-07", [20, 18, 19]))
+    updated = index.feature_matrix(periods, features)
+    assert updated is not matrix
+    assert updated[2, 0] == pytest.approx(19.0)
+    assert updated[2, 1] == pytest.approx(0.1)
+
+    with pytest.raises(ValueError, match="Unknown aggregate"):
+        index.aggregate("cocoa_price", *quarter_bounds(periods), how="median")
+    with pytest.raises(KeyError, match="oil"):
+        index.as_of("oil_price", "2023-01-01")
+
+
+def test_from_store(tmp_path):
+    store = TimeSeriesStore(tmp_path)
+    dates, values = monthly("2023-01", [3000, 3100, 2900])
+    store.write(
+        "external_events",
+        [
+            {"event_date": d, "event_type": "cocoa_price", "value": v}
+            for d, v in zip(dates.tolist(), values, strict=True)
+        ],
+    )
+
+    index = TemporalIndex.from_store(store)
+
+    assert index.as_of("cocoa_price", "2023-03-31") == 2900.0
+    assert index.versions == {"cocoa_price": 1}
@@ -0,0 +1,144 @@
+"""Tests for the embedded columnar time-series store."""
+
+import datetime as dt
+import re
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.predictive.timeseries_store import (
+    CATEGORY,
+    HOUSEKEEPING_COLUMNS,
+    SCHEMAS,
+    TimeSeriesStore,
+)
+
+pytestmark = pytest.mark.unit
+
+ARCHITECTURE = Path(__file__).parents[2] / "docs" / "SPECIFICATIONS" / "ARCHITECTURE.md"
+
+# Store dtypes that can hold each SQL type.
+COMPATIBLE = {
+    "INT": ("int8", "int16", "int32", "int64"),
+    "BIGINT": ("int64", "float64"),
+    "DECIMAL": ("float64",),
+    "VARCHAR": (CATEGORY,),
+    "DATE": ("datetime64[D]",),
+}
+
+
+def ddl_columns(table: str) -> dict[str, str]:
+    """Columns and base SQL types of the last ``CREATE TABLE`` for ``table``."""
+    bodies = re.findall(
+        rf"CREATE TABLE {table} \((.*?)\n\);", ARCHITECTURE.read_text(encoding="utf-8"), re.S
+    )
+    columns = {}
+    for line in bodies[-1].splitlines():
+        definition = line.split("--")[0].strip()
+        if definition:
+            name, sql_type = definition.split()[:2]
+            columns[name] = re.match(r"[A-Z]+", sql_type).group()
+    return columns
+
+
+def events(event_type: str, start_year: int, values: list[float]) -> list[dict]:
+    return [
+        {
+            "event_date": dt.date(start_year + month // 12, month % 12 + 1, 1),
+            "event_type": event_type,
+            "value": value,
+            "unit": "USD/t",
+            "source": "FRED",
+        }
+        for month, value in enumerate(values)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimeSeriesStore(tmp_path / "timeseries")
+    store.write(
+        "external_events",
+        events("wheat_price", 2022, [200.0 + m for m in range(24)])
+        + events("cocoa_price", 2022, [2500.0 + 10 * m for m in range(24)]),
+    )
+    store.write(
+        "carozzi_financials",
+        [
+            {"year": 2023, "quarter": q, "revenue_clp": 900e9 + q, "gross_margin_pct": 18.0}
+            for q in (4, 3, 2, 1)
+        ]
+        + [{"year": 2022, "quarter": 4, "revenue_clp": None, "gross_margin_pct": 17.5}],
+    )
+    return store
+
+
+@pytest.mark.parametrize("table", ["carozzi_financials", "external_events"])
+def test_schema_matches_relational_ddl(table):
+    schema = SCHEMAS[table]
+    ddl = {k: v for k, v in ddl_columns(table).items() if k not in HOUSEKEEPING_COLUMNS}
+    stored = {k: v for k, v in schema.columns.items() if k not in schema.derived}
+
+    assert set(stored) == set(ddl)
+    for column, sql_type in ddl.items():
+        assert stored[column] in COMPATIBLE[sql_type], column
+
+
+def test_tables_open_as_memory_maps_with_zero_copy_slices(store):
+    reopened = TimeSeriesStore(store.root)
+    events_table = reopened.table("external_events")
+
+    dates, values = reopened.event_series("cocoa_price", since=(2022, 2), until=(2022, 3))
+
+    assert isinstance(events_table.columns["value"], np.memmap)
+    assert np.shares_memory(values, events_table.columns["value"])
+    assert values.tolist() == [2530.0, 2540.0, 2550.0, 2560.0, 2570.0, 2580.0]
+    assert dates[0] == np.datetime64("2022-04-01")
+
+
+def test_index_prefixes_and_period_ranges(store):
+    events_table = store.table("external_events")
+
+    assert events_table.rows_for("cocoa_price") == slice(0, 24)
+    assert events_table.rows_for("wheat_price", 2023) == slice(36, 48)
+    assert events_table.rows_for("wheat_price", 2023, 2) == slice(39, 42)
+    assert events_table.rows_for("soy_price") == slice(0, 0)
+    assert events_table.rows_between("wheat_price", since=(2023, 4)) == slice(45, 48)
+    assert events_table.rows_between("cocoa_price", since=(2030, 1)).stop == 24
+    empty = events_table.rows_between("cocoa_price", until=(2020, 1))
+    assert empty.start == empty.stop
+
+
+def test_financials_sorted_with_nulls(store):
+    years, quarters, revenue = store.financial_series("revenue_clp", since=(2022, 4))
+
+    assert list(zip(years.tolist(), quarters.tolist(), strict=True))[:2] == [(2022, 4), (2023, 1)]
+    assert np.isnan(revenue[0])
+    rows = list(store.table("carozzi_financials").iter_rows())
+    assert rows[0]["revenue_clp"] is None
+    assert rows[1]["revenue_clp"] == 900e9 + 1
+
+    with pytest.raises(ValueError, match="must not be NULL"):
+        store.write("carozzi_financials", [{"year": 2024, "quarter": None}])
+
+
+def test_append_rewrites_in_index_order(store):
+    store.append("external_events", events("cocoa_price", 2024, [2800.0]))
+
+    events_table = store.table("external_events")
+    assert events_table.rows_for("cocoa_price") == slice(0, 25)
+    row = next(events_table.iter_rows(events_table.rows_for("cocoa_price", 2024)))
+    assert row == {
+        "event_date": dt.date(2024, 1, 1),
+        "event_type": "cocoa_price",
+        "value": 2800.0,
+        "unit": "USD/t",
+        "source": "FRED",
+        "year": 2024,
+        "quarter": 1,
+    }
+    assert sorted(p.name for p in store.root.iterdir()) == [
+        "carozzi_financials",
+        "external_events",
+    ]
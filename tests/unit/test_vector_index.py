@@ -0,0 +1,138 @@
+"""Tests for the embedded IVF vector index with stub embeddings."""
+
+import hashlib
+import re
+
+import numpy as np
+import pytest
+
+from src.utils.vector_index import VectorIndex, chunk_markdown
+
+pytestmark = pytest.mark.unit
+
+DIM = 64
+
+CONTRACT = """\
+# Supply Agreement
+
+Supplier shall deliver cocoa beans monthly to the Nos plant.
+
+## Price Adjustment
+
+Prices are indexed to the ICE cocoa futures settlement price.
+Adjustments apply quarterly with a cap of ten percent.
+
+## Termination
+
+Either party may terminate with ninety days written notice.
+
+| Clause | Penalty |
+|---|---|
+| Late delivery | 2% per week |
+"""
+
+
+def embed(texts) -> np.ndarray:
+    """Hashed bag-of-words vectors, stable across runs."""
+    vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in re.findall(r"\w+", text.lower()):
+            vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % DIM] += 1
+    return vectors
+
+
+def clustered(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, DIM))
+    return centers[rng.integers(0, 20, n)] + 0.3 * rng.normal(size=(n, DIM))
+
+
+def brute_force(data: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    data = data / np.linalg.norm(data, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.argsort(-(queries @ data.T), axis=1)[:, :k]
+
+
+def test_chunk_markdown_by_section():
+    chunks = chunk_markdown(CONTRACT.splitlines(), "contract-1", max_chars=80)
+
+    assert [c.section for c in chunks] == [
+        "Supply Agreement",
+        "Price Adjustment",
+        "Price Adjustment",
+        "Termination",
+        "Termination",
+    ]
+    assert all(len(c.text) <= 80 for c in chunks)
+    assert chunks[-1].text == "Clause | Penalty\nLate delivery | 2% per week"
+    assert chunks[1].embedding_text.startswith("Price Adjustment\nPrices are indexed")
+
+
+def test_small_index_is_searched_exhaustively(tmp_path):
+    index = VectorIndex(tmp_path, dim=DIM, n_lists=8)
+    index.add_chunks(chunk_markdown(CONTRACT.splitlines(), "contract-1"), embed)
+
+    hits = index.query(embed(["terminate with written notice", "cocoa futures price index"]), k=2)
+
+    assert not index.trained
+    assert hits[0][0]["section"] == "Termination"
+    assert hits[1][0]["section"] == "Price Adjustment"
+    assert hits[0][0]["score"] >= hits[0][1]["score"]
+    scores, ids = index.search(embed(["anything"]), k=10)
+    assert ids[0, len(index) :].tolist() == [-1] * (10 - len(index))
+
+
+@pytest.mark.parametrize(("dtype", "min_recall"), [("float32", 0.95), ("int8", 0.9)])
+def test_ivf_recall_against_brute_force(tmp_path, dtype, min_recall):
+    data = clustered(2000)
+    queries = clustered(50, seed=1)
+    index = VectorIndex(tmp_path, dim=DIM, dtype=dtype, n_lists=16, n_probe=8)
+    for part in np.array_split(data, 4):
+        index.add(part)
+
+    _, ids = index.search(queries, k=10)
+
+    assert index.trained
+    expected = brute_force(data, queries, 10)
+    recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(ids, expected, strict=True)])
+    assert recall >= min_recall
+    single = np.vstack([index.search(q, k=10)[1] for q in queries[:5]])
+    np.testing.assert_array_equal(single, ids[:5])
+
+
+def test_reopen_append_and_discard_torn_writes(tmp_path):
+    data = clustered(300)
+    index = VectorIndex(tmp_path, dim=DIM, n_lists=4)
+    index.add(data[:200], [{"row": i} for i in range(200)])
+    assert index.trained
+    with open(tmp_path / "vectors.bin", "ab") as f:
+        f.write(b"\x00" * 100)
+
+    reopened = VectorIndex(tmp_path)
+    assert len(reopened) == 200
+    ids = reopened.add(data[200:], [{"row": i} for i in range(200, 300)])
+
+    assert ids.tolist() == list(range(200, 300))
+    assert (tmp_path / "vectors.bin").stat().st_size == 300 * DIM * 4
+    final = VectorIndex(tmp_path, dim=DIM)
+    hits = final.query(data[[5, 250]], k=1, n_probe=4)
+    assert [h[0]["row"] for h in hits] == [5, 250]
+    with pytest.raises(ValueError, match="dim"):
+        VectorIndex(tmp_path, dim=DIM + 1)
+
+
+def test_int8_storage_is_a_quarter_of_float32(tmp_path):
+    data = clustered(100)
+    small = VectorIndex(tmp_path / "int8", dim=DIM, dtype="int8")
+    small.add(data)
+    large = VectorIndex(tmp_path / "f32", dim=DIM)
+    large.add(data)
+
+    assert (tmp_path / "int8" / "vectors.bin").stat().st_size * 4 == (
+        tmp_path / "f32" / "vectors.bin"
+    ).stat().st_size
+    small_scores, small_ids = small.search(data[:3], k=1)
+    assert small_ids[:, 0].tolist() == [0, 1, 2]
+    np.testing.assert_allclose(small_scores[:, 0], 1.0, atol=1e-3)
+    with pytest.raises(ValueError, match="dtype"):
+        VectorIndex(tmp_path / "bad", dim=DIM, dtype="float16")